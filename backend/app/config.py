@@ -1,5 +1,7 @@
 """Essential configuration settings for interfacing with Firebase and Semantic Scholar API's."""
 
+from typing import Literal
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -13,7 +15,53 @@ class Settings(BaseSettings):
         FIREBASE_API_KEY (str): Firebase API key
         FIREBASE_ADMIN_SDK_KEY (str): Firebase admin sdk key
         SEMANTIC_SCHOLAR_API_URL (str): Semantic Scholar authentication URL
+        SEMANTIC_SCHOLAR_RECOMMENDATIONS_URL (str): Semantic Scholar recommendations endpoint
         OPENAI_API_KEY (str): OpenAI API key
+        SEMANTIC_SCHOLAR_MAX_CONCURRENCY (int): Maximum number of concurrent
+            requests to the Semantic Scholar API
+        SEMANTIC_SCHOLAR_RATE_LIMIT (float): Initial request rate (per second)
+        SEMANTIC_SCHOLAR_MIN_RATE_LIMIT (float): Lower bound for the adaptive rate
+        SEMANTIC_SCHOLAR_MAX_RATE_LIMIT (float): Upper bound for the adaptive rate
+        SEMANTIC_SCHOLAR_BURST (int): Token bucket capacity
+        SEMANTIC_SCHOLAR_MAX_RETRIES (int): Retries for rate-limited requests
+        SEMANTIC_SCHOLAR_RECORD_DIR (str | None): Record upstream responses to this directory
+        SEMANTIC_SCHOLAR_HEDGE_PERCENTILE (float | None): Latency percentile after which a
+            duplicate (hedged) request is sent; None disables hedging
+        SEMANTIC_SCHOLAR_HEDGE_MIN_DELAY (float): Minimum delay (s) before hedging a request
+        SEMANTIC_SCHOLAR_BREAKER_ERROR_RATE (float): Upstream error rate (0-1) that opens
+            the circuit breaker
+        SEMANTIC_SCHOLAR_BREAKER_MIN_REQUESTS (int): Requests observed before the breaker can open
+        SEMANTIC_SCHOLAR_BREAKER_WINDOW (int): Number of recent requests the error rate covers
+        SEMANTIC_SCHOLAR_BREAKER_COOLDOWN (float): Seconds the breaker stays open before probing
+        PAPER_CACHE_PATH (str): Path of the SQLite paper cache
+        PAPER_CACHE_TTL (int): Time-to-live (s) for cached paper metadata
+        PAPER_CACHE_RELATION_TTL (int): Time-to-live (s) for cached citation/reference lists
+        GRAPH_DEEP_FETCH (bool): Page through the citations/references of highly cited papers
+        GRAPH_DEEP_FETCH_MAX_PAGES (int): Maximum pages fetched per highly cited paper
+        GRAPH_MAX_DEPTH (int): Maximum number of hops a graph can be expanded
+        GRAPH_LEVEL_WIDTH (int): Maximum number of new nodes added per hop
+        GRAPH_MAX_NODES (int): Node budget of a single graph
+        GRAPH_MAX_EDGES (int): Edge budget of a single graph
+        GRAPH_SNAPSHOT_PATH (str): Path of the SQLite graph snapshot store
+        GRAPH_SNAPSHOT_TTL (int): Age (s) after which a snapshot is rebuilt from scratch
+        GRAPH_SNAPSHOT_REFRESH_INTERVAL (int): Age (s) after which a served snapshot
+            is refreshed in the background
+        GRAPH_STREAM_INTERVAL (float): Seconds between the frames of a streamed graph build
+        GRAPH_MAX_NUM_NODES (int): Largest num_nodes a graph request may ask for
+        GRAPH_MAX_RELATION_LIMIT (int): Largest max_citations/max_references a graph
+            request may ask for
+        GRAPH_REQUEST_BUDGET (int): Upstream requests a single graph build (or a
+            whole batch of builds) may be estimated to cost
+        GRAPH_OVER_BUDGET (str): What to do with graph requests over budget:
+            'reject' them or 'downscale' their depth and num_nodes
+        GRAPH_MAX_BATCH_SEEDS (int): Maximum number of seed papers of a batch graph request
+        GRAPH_PATH_MAX_DEPTH (int): Maximum number of hops of a path between two papers
+        GRAPH_PATH_MAX_NODES (int): Maximum number of papers a path search may fetch
+        GRAPH_MAX_COMMUNITIES (int): Maximum number of nodes of a coarse community view
+        GRAPH_VIEW_MAX_NODES (int): Maximum number of nodes of an expanded community
+        PAPER_DATA_SOURCE (str): Where paper data comes from: 'api' or 'mirror'
+        PAPER_MIRROR_PATH (str): Directory of the local Semantic Scholar mirror
+        PAPER_DETAILS_MAX_IDS (int): Maximum number of papers of a paper details request
     """
 
     FIREBASE_AUTH_URL: str
@@ -21,6 +69,47 @@ class Settings(BaseSettings):
     FIREBASE_ADMIN_SDK_KEY: str
     SEMANTIC_SCHOLAR_API_URL: str
     OPENAI_API_KEY: str
+    SEMANTIC_SCHOLAR_RECOMMENDATIONS_URL: str = (
+        "https://api.semanticscholar.org/recommendations/v1/papers"
+    )
+    SEMANTIC_SCHOLAR_MAX_CONCURRENCY: int = 4
+    SEMANTIC_SCHOLAR_RATE_LIMIT: float = 1.0
+    SEMANTIC_SCHOLAR_MIN_RATE_LIMIT: float = 0.2
+    SEMANTIC_SCHOLAR_MAX_RATE_LIMIT: float = 10.0
+    SEMANTIC_SCHOLAR_BURST: int = 5
+    SEMANTIC_SCHOLAR_MAX_RETRIES: int = 3
+    SEMANTIC_SCHOLAR_RECORD_DIR: str | None = None
+    SEMANTIC_SCHOLAR_HEDGE_PERCENTILE: float | None = 95
+    SEMANTIC_SCHOLAR_HEDGE_MIN_DELAY: float = 0.05
+    SEMANTIC_SCHOLAR_BREAKER_ERROR_RATE: float = 0.5
+    SEMANTIC_SCHOLAR_BREAKER_MIN_REQUESTS: int = 20
+    SEMANTIC_SCHOLAR_BREAKER_WINDOW: int = 50
+    SEMANTIC_SCHOLAR_BREAKER_COOLDOWN: float = 30
+    PAPER_CACHE_PATH: str = "paper_cache.sqlite3"
+    PAPER_CACHE_TTL: int = 7 * 24 * 3600
+    PAPER_CACHE_RELATION_TTL: int = 24 * 3600
+    GRAPH_DEEP_FETCH: bool = True
+    GRAPH_DEEP_FETCH_MAX_PAGES: int = 10
+    GRAPH_MAX_DEPTH: int = 3
+    GRAPH_LEVEL_WIDTH: int = 100
+    GRAPH_MAX_NODES: int = 500
+    GRAPH_MAX_EDGES: int = 5000
+    GRAPH_SNAPSHOT_PATH: str = "graph_snapshots.sqlite3"
+    GRAPH_SNAPSHOT_TTL: int = 30 * 24 * 3600
+    GRAPH_SNAPSHOT_REFRESH_INTERVAL: int = 3600
+    GRAPH_STREAM_INTERVAL: float = 0.25
+    GRAPH_MAX_NUM_NODES: int = 100
+    GRAPH_MAX_RELATION_LIMIT: int = 1000
+    GRAPH_REQUEST_BUDGET: int = 250
+    GRAPH_OVER_BUDGET: Literal["reject", "downscale"] = "downscale"
+    GRAPH_MAX_BATCH_SEEDS: int = 10
+    GRAPH_PATH_MAX_DEPTH: int = 6
+    GRAPH_PATH_MAX_NODES: int = 1000
+    GRAPH_MAX_COMMUNITIES: int = 30
+    GRAPH_VIEW_MAX_NODES: int = 200
+    PAPER_DATA_SOURCE: Literal["api", "mirror"] = "api"
+    PAPER_MIRROR_PATH: str = "mirror"
+    PAPER_DETAILS_MAX_IDS: int = 100
 
     model_config = SettingsConfigDict(env_file="app/.env")
 
@@ -0,0 +1,156 @@
+"""Persistent SQLite store of built citation and reference graphs."""
+
+import sqlite3
+import threading
+import time
+
+from app.config import settings
+from app.schemas.graph import GraphResponse
+
+
+class GraphSnapshotStore:
+    """
+    Stores built `GraphResponse` snapshots on disk, keyed by the seed paper
+    and build parameters, together with when each was last refreshed.
+
+    The database file is only opened by `open` (at app startup) or on first
+    use. Its methods are blocking, so async callers run them in a worker
+    thread.
+
+    Attributes:
+        path (str): Path of the SQLite database file
+        ttl (int): Age in seconds after which a snapshot is no longer served
+    """
+
+    def __init__(self, path: str, ttl: int):
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def open(self) -> sqlite3.Connection:
+        """
+        Open the database file, creating it if needed, unless it is already open.
+        Called at app startup, and otherwise on first use.
+
+        Returns:
+            sqlite3.Connection: The open connection
+        """
+        with self._lock:
+            if self._conn is not None:
+                return self._conn
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            with conn:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+                conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS snapshots (
+                        key TEXT PRIMARY KEY,
+                        data TEXT NOT NULL,
+                        refreshed_at REAL NOT NULL
+                    )
+                    """
+                )
+                conn.execute(
+                    "DELETE FROM snapshots WHERE refreshed_at < ?",
+                    (time.time() - self.ttl,),
+                )
+            self._conn = conn
+            return conn
+
+    def close(self):
+        """Close the database file, if it is open."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+            self._conn = None
+
+    @staticmethod
+    def key(paper_id: str, *params) -> str:
+        """
+        Snapshot key of a seed paper and its build parameters.
+
+        Args:
+            paper_id (str): The seed paper's ID
+            *params: The build parameters (e.g. num_nodes, deep_fetch, depth)
+
+        Returns:
+            str: The key
+        """
+        return ":".join(str(part) for part in (paper_id, *params))
+
+    def get(self, key: str) -> tuple[GraphResponse, float] | None:
+        """
+        Look up a snapshot.
+
+        Args:
+            key (str): The snapshot key
+
+        Returns:
+            tuple[GraphResponse, float] | None: The graphs and the time they
+                were last refreshed, or None if there is no live snapshot
+        """
+        snapshot = self.get_json(key)
+        if snapshot is None:
+            return None
+        return GraphResponse.model_validate_json(snapshot[0]), snapshot[1]
+
+    def get_json(self, key: str) -> tuple[str, float] | None:
+        """Look up a snapshot as its stored JSON, without parsing it (see `get`)."""
+        conn = self.open()
+        with self._lock:
+            row = conn.execute(
+                "SELECT data, refreshed_at FROM snapshots WHERE key = ? AND refreshed_at >= ?",
+                (key, time.time() - self.ttl),
+            ).fetchone()
+        return None if row is None else (row[0], row[1])
+
+    def exists(self, key: str) -> bool:
+        """Whether there is a live snapshot, without loading it."""
+        conn = self.open()
+        with self._lock:
+            row = conn.execute(
+                "SELECT 1 FROM snapshots WHERE key = ? AND refreshed_at >= ?",
+                (key, time.time() - self.ttl),
+            ).fetchone()
+        return row is not None
+
+    def put(self, key: str, graphs: GraphResponse):
+        """
+        Store (or replace) a snapshot, marking it as refreshed now.
+
+        Args:
+            key (str): The snapshot key
+            graphs (GraphResponse): The built graphs
+        """
+        conn = self.open()
+        with self._lock, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO snapshots VALUES (?, ?, ?)",
+                (key, graphs.model_dump_json(), time.time()),
+            )
+
+    def update(self, key: str, graphs: GraphResponse):
+        """Replace the graphs of a snapshot without marking it as refreshed."""
+        conn = self.open()
+        with self._lock, conn:
+            conn.execute(
+                "UPDATE snapshots SET data = ? WHERE key = ?",
+                (graphs.model_dump_json(), key),
+            )
+
+    def touch(self, key: str):
+        """Mark a snapshot as refreshed now without changing it."""
+        conn = self.open()
+        with self._lock, conn:
+            conn.execute(
+                "UPDATE snapshots SET refreshed_at = ? WHERE key = ?",
+                (time.time(), key),
+            )
+
+
+# Opened at app startup (see `app.main.lifespan`)
+graph_snapshots = GraphSnapshotStore(
+    settings.GRAPH_SNAPSHOT_PATH, ttl=settings.GRAPH_SNAPSHOT_TTL
+)
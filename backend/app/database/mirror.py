@@ -0,0 +1,193 @@
+"""Read access to a local Semantic Scholar mirror built by `app.database.mirror_ingest`."""
+
+import json
+import os
+import sqlite3
+import threading
+
+import numpy as np
+
+from app.config import settings
+
+
+class PaperMirror:
+    """
+    Serves paper data from a local mirror of the Semantic Scholar bulk datasets,
+    in the same shapes as the Semantic Scholar API responses.
+
+    Paper metadata lives in an indexed SQLite database (with an FTS5 index on
+    title and abstract for search). The citation graph is stored as two CSR
+    adjacency structures (offsets + neighbour indices) in `.npy` files that
+    are memory-mapped, so neighbour lookups are array slices that never load
+    the whole graph into memory.
+
+    Attributes:
+        path (str): Directory containing the mirror files
+        max_related (int): Maximum number of nested citations/references per
+                           paper, keeping the most cited (like the API's cap)
+    """
+
+    RELATIONS = ("citations", "references")
+
+    def __init__(self, path: str, max_related: int = 1000):
+        self.path = path
+        self.max_related = max_related
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            os.path.join(path, "papers.sqlite3"), check_same_thread=False
+        )
+        self.citation_counts = self._load("citation_counts")
+        self.offsets = {
+            relation: self._load(f"{relation}.offsets") for relation in self.RELATIONS
+        }
+        self.indices = {
+            relation: self._load(f"{relation}.indices") for relation in self.RELATIONS
+        }
+
+    def _load(self, name: str) -> np.ndarray:
+        """Memory-map one of the mirror's arrays."""
+        return np.load(os.path.join(self.path, f"{name}.npy"), mmap_mode="r")
+
+    def _rows(self, column: str, values: list) -> dict:
+        """
+        Load paper rows by paper ID or row index.
+
+        Args:
+            column (str): Either 'paper_id' or 'idx'
+            values (list): The values to look up
+
+        Returns:
+            dict: The rows (idx, paper_id, data) keyed by the looked up value
+        """
+        rows = {}
+        for i in range(0, len(values), 500):
+            chunk = values[i : i + 500]
+            placeholders = ",".join("?" * len(chunk))
+            with self._lock:
+                for idx, paper_id, data in self._conn.execute(
+                    f"SELECT idx, paper_id, data FROM papers WHERE {column} IN ({placeholders})",
+                    chunk,
+                ):
+                    rows[paper_id if column == "paper_id" else idx] = (
+                        idx,
+                        paper_id,
+                        data,
+                    )
+        return rows
+
+    def neighbours(self, idx: int, relation: str) -> np.ndarray:
+        """
+        Row indices of the papers citing (or referenced by) a paper.
+
+        Args:
+            idx (int): Row index of the paper
+            relation (str): Either 'citations' or 'references'
+
+        Returns:
+            np.ndarray: The neighbour row indices (a view into the memory map)
+        """
+        offsets = self.offsets[relation]
+        return self.indices[relation][offsets[idx] : offsets[idx + 1]]
+
+    def top_neighbours(self, idx: int, relation: str, top_k: int) -> np.ndarray:
+        """
+        Row indices of the top_k most cited neighbours, most cited first.
+
+        Args:
+            idx (int): Row index of the paper
+            relation (str): Either 'citations' or 'references'
+            top_k (int): Number of neighbours to keep
+
+        Returns:
+            np.ndarray: The neighbour row indices
+        """
+        neighbours = np.asarray(self.neighbours(idx, relation))
+        counts = self.citation_counts[neighbours]
+        if len(neighbours) > top_k:
+            keep = np.argpartition(-counts, top_k - 1)[:top_k]
+            neighbours, counts = neighbours[keep], counts[keep]
+        return neighbours[np.argsort(-counts, kind="stable")]
+
+    def get_papers(
+        self, paper_ids: list[str], key="both", top_k: int | None = None
+    ) -> list[dict | None]:
+        """
+        Look up papers as `/paper/batch` would return them.
+
+        Args:
+            paper_ids (list[str]): List of paper ID's
+            key (str): Which nested lists to include: 'both', 'citations' or
+                'references' (none with 'details' or 'none', see `PaperBatchFetcher`)
+            top_k (int | None): Maximum nested list length (defaults to max_related)
+
+        Returns:
+            list[dict | None]: The papers in input order (None for unknown papers)
+        """
+        relations = {
+            "both": self.RELATIONS,
+            "citations": ("citations",),
+            "references": ("references",),
+            "details": (),
+            "none": (),
+        }[key]
+        top_k = top_k or self.max_related
+        rows = self._rows("paper_id", list(dict.fromkeys(paper_ids)))
+        nested = {
+            (paper_id, relation): self.top_neighbours(idx, relation, top_k)
+            for paper_id, (idx, _, _) in rows.items()
+            for relation in relations
+        }
+        related_ids = sorted(
+            {int(i) for neighbours in nested.values() for i in neighbours}
+        )
+        related_rows = self._rows("idx", related_ids)
+        related = {idx: json.loads(data) for idx, (_, _, data) in related_rows.items()}
+        for paper in related.values():
+            paper.pop("tldr", None)
+        papers = []
+        for paper_id in paper_ids:
+            if paper_id not in rows:
+                papers.append(None)
+                continue
+            paper = json.loads(rows[paper_id][2])
+            for relation in relations:
+                paper[relation] = [
+                    related[int(i)]
+                    for i in nested[(paper_id, relation)]
+                    if int(i) in related
+                ]
+            papers.append(paper)
+        return papers
+
+    def search(self, query: str, limit: int = 5) -> list[dict]:
+        """
+        Full-text search over titles and abstracts, best match first.
+
+        Args:
+            query (str): The search query string
+            limit (int): Maximum number of results to return
+
+        Returns:
+            list[dict]: The matching papers, shaped like `/paper/search` results
+        """
+        # Quote each term so user input cannot inject FTS5 query syntax
+        terms = " ".join(f'"{term}"' for term in query.replace('"', " ").split())
+        if not terms:
+            return []
+        with self._lock:
+            rows = self._conn.execute(
+                """
+                SELECT papers.data FROM papers_fts
+                JOIN papers ON papers.idx = papers_fts.rowid
+                WHERE papers_fts MATCH ? ORDER BY rank LIMIT ?
+                """,
+                (terms, limit),
+            ).fetchall()
+        return [json.loads(data) for (data,) in rows]
+
+
+paper_mirror = (
+    PaperMirror(settings.PAPER_MIRROR_PATH)
+    if settings.PAPER_DATA_SOURCE == "mirror"
+    else None
+)
@@ -0,0 +1,271 @@
+"""
+Build a local Semantic Scholar mirror from the bulk dataset files.
+
+Usage:
+    python -m app.database.mirror_ingest --out mirror \
+        --papers 'papers/*.jsonl.gz' --citations 'citations/*.jsonl.gz' \
+        [--abstracts 'abstracts/*.jsonl.gz'] [--tldrs 'tldrs/*.jsonl.gz']
+
+Shards may be plain or gzipped JSONL. The output directory can then be served
+by setting PAPER_DATA_SOURCE=mirror and PAPER_MIRROR_PATH to it.
+"""
+
+import argparse
+import glob
+import gzip
+import json
+import os
+import sqlite3
+from collections.abc import Iterator
+
+import numpy as np
+
+
+def iter_records(pattern: str) -> Iterator[dict]:
+    """
+    Iterate over the JSON records of every shard matching a glob pattern.
+
+    Args:
+        pattern (str): Glob pattern of the JSONL shards
+
+    Yields:
+        dict: Each record
+    """
+    for path in sorted(glob.glob(pattern)):
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rt", encoding="utf-8") as shard:
+            for line in shard:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def paper_payload(record: dict) -> dict:
+    """
+    Convert a bulk `papers` record into the Semantic Scholar API paper shape.
+
+    Args:
+        record (dict): A record of the `papers` dataset
+
+    Returns:
+        dict: The paper in API shape (without nested citations/references)
+    """
+    external_ids = record.get("externalids") or {}
+    # The bulk records only carry the paperId (SHA) as the tail of their URL
+    paper_id = record.get("paperId") or (record.get("url") or "").rsplit("/", 1)[-1]
+    venue = (record.get("journal") or {}).get("name") or record.get("venue")
+    return {
+        "paperId": paper_id or None,
+        "externalIds": external_ids,
+        "title": record.get("title"),
+        "authors": [
+            {"authorId": author.get("authorId"), "name": author.get("name")}
+            for author in record.get("authors") or []
+        ],
+        "abstract": None,
+        "year": record.get("year"),
+        "referenceCount": record.get("referencecount"),
+        "citationCount": record.get("citationcount"),
+        "publicationVenue": {"name": venue} if venue else None,
+        "openAccessPdf": None,
+        "publicationDate": record.get("publicationdate"),
+        "tldr": None,
+    }
+
+
+def ingest_papers(conn: sqlite3.Connection, pattern: str) -> np.ndarray:
+    """
+    Load the `papers` shards into the database.
+
+    Args:
+        conn (sqlite3.Connection): The mirror database
+        pattern (str): Glob pattern of the `papers` shards
+
+    Returns:
+        np.ndarray: The corpus ID of each row index
+    """
+    corpus_ids = []
+    rows = []
+    for record in iter_records(pattern):
+        payload = paper_payload(record)
+        if not payload["paperId"] or record.get("corpusid") is None:
+            continue
+        rows.append(
+            (
+                len(corpus_ids),
+                payload["paperId"],
+                record["corpusid"],
+                payload["citationCount"] or 0,
+                json.dumps(payload),
+            )
+        )
+        corpus_ids.append(record["corpusid"])
+        if len(rows) >= 10000:
+            conn.executemany("INSERT INTO papers VALUES (?, ?, ?, ?, ?)", rows)
+            rows = []
+    conn.executemany("INSERT INTO papers VALUES (?, ?, ?, ?, ?)", rows)
+    conn.commit()
+    return np.asarray(corpus_ids, dtype=np.int64)
+
+
+def update_papers(conn: sqlite3.Connection, pattern: str, apply) -> None:
+    """
+    Merge an auxiliary dataset (abstracts, tldrs) into the stored payloads.
+
+    Args:
+        conn (sqlite3.Connection): The mirror database
+        pattern (str): Glob pattern of the dataset shards
+        apply (Callable[[dict, dict], None]): Updates a payload in place from a record
+    """
+    for record in iter_records(pattern):
+        row = conn.execute(
+            "SELECT idx, data FROM papers WHERE corpus_id = ?", (record["corpusid"],)
+        ).fetchone()
+        if row is None:
+            continue
+        payload = json.loads(row[1])
+        apply(payload, record)
+        conn.execute(
+            "UPDATE papers SET data = ? WHERE idx = ?", (json.dumps(payload), row[0])
+        )
+    conn.commit()
+
+
+def apply_abstract(payload: dict, record: dict) -> None:
+    """Merge an `abstracts` record into a paper payload."""
+    payload["abstract"] = record.get("abstract")
+    open_access_url = (record.get("openaccessinfo") or {}).get("url")
+    if open_access_url:
+        payload["openAccessPdf"] = {"url": open_access_url}
+
+
+def apply_tldr(payload: dict, record: dict) -> None:
+    """Merge a `tldrs` record into a paper payload."""
+    if record.get("text"):
+        payload["tldr"] = {"model": record.get("model"), "text": record["text"]}
+
+
+def build_adjacency(
+    out: str, pattern: str, corpus_ids: np.ndarray, chunk_size=1_000_000
+) -> None:
+    """
+    Build the CSR citation and reference adjacency arrays from `citations` shards.
+
+    Corpus IDs are mapped to row indices in vectorized chunks, and edges are
+    spilled to a temporary file so only the final arrays need to fit in memory.
+
+    Args:
+        out (str): Output directory
+        pattern (str): Glob pattern of the `citations` shards
+        corpus_ids (np.ndarray): The corpus ID of each row index
+        chunk_size (int): Number of edges mapped per chunk
+    """
+    order = np.argsort(corpus_ids)
+    sorted_ids = corpus_ids[order]
+    num_papers = len(corpus_ids)
+    index_dtype = np.int32 if num_papers < 2**31 else np.int64
+    edges_path = os.path.join(out, "edges.tmp")
+
+    def to_index(ids: np.ndarray) -> np.ndarray:
+        positions = np.clip(np.searchsorted(sorted_ids, ids), 0, max(num_papers - 1, 0))
+        found = sorted_ids[positions] == ids if num_papers else np.zeros(len(ids), bool)
+        return np.where(found, order[positions], -1)
+
+    def flush(pairs: list, edges_file) -> None:
+        array = np.asarray(pairs, dtype=np.int64).reshape(-1, 2)
+        citing, cited = to_index(array[:, 0]), to_index(array[:, 1])
+        known = (citing >= 0) & (cited >= 0)
+        np.stack([citing[known], cited[known]], axis=1).astype(index_dtype).tofile(
+            edges_file
+        )
+
+    with open(edges_path, "wb") as edges_file:
+        pairs = []
+        for record in iter_records(pattern):
+            if (
+                record.get("citingcorpusid") is None
+                or record.get("citedcorpusid") is None
+            ):
+                continue
+            pairs.append((record["citingcorpusid"], record["citedcorpusid"]))
+            if len(pairs) >= chunk_size:
+                flush(pairs, edges_file)
+                pairs = []
+        flush(pairs, edges_file)
+
+    edges = np.fromfile(edges_path, dtype=index_dtype).reshape(-1, 2)
+    # Each citing -> cited edge is a citation of the cited paper and a
+    # reference of the citing paper
+    for relation, owner, neighbour in (("citations", 1, 0), ("references", 0, 1)):
+        by_owner = np.argsort(edges[:, owner], kind="stable")
+        counts = np.bincount(edges[:, owner], minlength=num_papers)
+        offsets = np.zeros(num_papers + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        np.save(os.path.join(out, f"{relation}.offsets.npy"), offsets)
+        np.save(
+            os.path.join(out, f"{relation}.indices.npy"), edges[by_owner, neighbour]
+        )
+    os.remove(edges_path)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--out", required=True, help="Output directory")
+    parser.add_argument("--papers", required=True, help="Glob of `papers` shards")
+    parser.add_argument("--citations", required=True, help="Glob of `citations` shards")
+    parser.add_argument("--abstracts", help="Glob of `abstracts` shards")
+    parser.add_argument("--tldrs", help="Glob of `tldrs` shards")
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.out, exist_ok=True)
+    db_path = os.path.join(args.out, "papers.sqlite3")
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=OFF")
+    conn.execute("PRAGMA synchronous=OFF")
+    conn.execute(
+        """
+        CREATE TABLE papers (
+            idx INTEGER PRIMARY KEY,
+            paper_id TEXT NOT NULL,
+            corpus_id INTEGER NOT NULL,
+            citation_count INTEGER NOT NULL,
+            data TEXT NOT NULL
+        )
+        """
+    )
+
+    print("Loading papers...")
+    corpus_ids = ingest_papers(conn, args.papers)
+    conn.execute("CREATE INDEX papers_paper_id ON papers (paper_id)")
+    conn.execute("CREATE INDEX papers_corpus_id ON papers (corpus_id)")
+    if args.abstracts:
+        print("Merging abstracts...")
+        update_papers(conn, args.abstracts, apply_abstract)
+    if args.tldrs:
+        print("Merging TLDRs...")
+        update_papers(conn, args.tldrs, apply_tldr)
+
+    print("Building search index...")
+    conn.execute("CREATE VIRTUAL TABLE papers_fts USING fts5(title, abstract)")
+    conn.execute(
+        """
+        INSERT INTO papers_fts (rowid, title, abstract)
+        SELECT idx, json_extract(data, '$.title'), json_extract(data, '$.abstract')
+        FROM papers
+        """
+    )
+    citation_counts = np.zeros(len(corpus_ids), dtype=np.int64)
+    for idx, count in conn.execute("SELECT idx, citation_count FROM papers"):
+        citation_counts[idx] = count
+    np.save(os.path.join(args.out, "citation_counts.npy"), citation_counts)
+    conn.commit()
+    conn.close()
+
+    print("Building citation graph...")
+    build_adjacency(args.out, args.citations, corpus_ids)
+    print(f"Mirror with {len(corpus_ids)} papers written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""Persistent SQLite cache of Semantic Scholar paper payloads."""
+
+import json
+import sqlite3
+import threading
+import time
+
+from app.config import settings
+
+
+class PaperCache:
+    """
+    Caches raw Semantic Scholar paper payloads on disk, keyed by paper ID
+    and by the fetch mode ('both', 'citations', 'references', 'details' or
+    'none')
+    together with a signature of the requested field set, so changing the
+    fetched fields never serves stale shapes.
+
+    A payload fetched with a wider mode also satisfies narrower ones
+    (e.g. a 'both' entry answers a 'citations' lookup, and any entry with a
+    TLDR answers a 'details' lookup); the extra nested lists are stripped
+    before the payload is returned.
+
+    The database file is only opened by `open` (at app startup) or on first
+    use. Lookups and writes are blocking, so async callers run them in a
+    worker thread.
+
+    Attributes:
+        path (str): Path of the SQLite database file
+        ttl (int): Time-to-live in seconds for 'details' and 'none' (metadata
+                   only) entries
+        relation_ttl (int): Time-to-live in seconds for entries carrying
+                            nested citations/references, which change faster
+    """
+
+    # Modes whose payload is a superset of the requested mode, best match first
+    SUPERSETS = {
+        "both": ["both"],
+        "citations": ["citations", "both"],
+        "references": ["references", "both"],
+        "details": ["details", "citations", "references", "both"],
+        "none": ["none", "details", "citations", "references", "both"],
+    }
+    RELATIONS = {
+        "both": {"citations", "references"},
+        "citations": {"citations"},
+        "references": {"references"},
+        "details": set(),
+        "none": set(),
+    }
+
+    def __init__(self, path: str, ttl: int, relation_ttl: int):
+        self.path = path
+        self.ttl = ttl
+        self.relation_ttl = relation_ttl
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def open(self) -> sqlite3.Connection:
+        """
+        Open the database file, creating it if needed, unless it is already open.
+        Called at app startup, and otherwise on first use.
+
+        Returns:
+            sqlite3.Connection: The open connection
+        """
+        with self._lock:
+            if self._conn is not None:
+                return self._conn
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            with conn:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+                conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS papers (
+                        paper_id TEXT NOT NULL,
+                        mode TEXT NOT NULL,
+                        signature TEXT NOT NULL,
+                        data TEXT NOT NULL,
+                        fetched_at REAL NOT NULL,
+                        PRIMARY KEY (paper_id, mode)
+                    )
+                    """
+                )
+                # Drop entries that no lookup can serve anymore
+                conn.execute(
+                    "DELETE FROM papers WHERE fetched_at < ?",
+                    (time.time() - max(self.ttl, self.relation_ttl),),
+                )
+            self._conn = conn
+            return conn
+
+    def close(self):
+        """Close the database file, if it is open."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+            self._conn = None
+
+    def _ttl_for(self, mode: str) -> int:
+        """Time-to-live for entries of the given fetch mode."""
+        return self.relation_ttl if self.RELATIONS[mode] else self.ttl
+
+    def get_many(
+        self,
+        paper_ids: list[str],
+        mode: str,
+        signatures: dict[str, str],
+        allow_stale: bool = False,
+    ) -> dict[str, dict]:
+        """
+        Look up cached payloads for a list of paper IDs.
+
+        Args:
+            paper_ids (list[str]): Paper IDs to look up
+            mode (str): The requested fetch mode
+            signatures (dict[str, str]): Current field-set signature for each mode
+            allow_stale (bool): Also return entries older than their TTL
+
+        Returns:
+            dict[str, dict]: The cached payloads, keyed by the requested paper ID
+        """
+        if not paper_ids:
+            return {}
+        conn = self.open()
+        candidates = self.SUPERSETS[mode]
+        min_fetched_at = 0.0 if allow_stale else time.time() - self._ttl_for(mode)
+        rows = []
+        # Stay below SQLite's limit on bound parameters
+        for i in range(0, len(paper_ids), 500):
+            chunk = paper_ids[i : i + 500]
+            placeholders = ",".join("?" * len(chunk))
+            with self._lock:
+                rows += conn.execute(
+                    f"""
+                    SELECT paper_id, mode, signature, data FROM papers
+                    WHERE paper_id IN ({placeholders}) AND fetched_at >= ?
+                    """,
+                    (*chunk, min_fetched_at),
+                ).fetchall()
+        best = {}
+        for paper_id, row_mode, signature, data in rows:
+            if row_mode not in candidates or signature != signatures[row_mode]:
+                continue
+            rank = candidates.index(row_mode)
+            if paper_id not in best or rank < best[paper_id][0]:
+                best[paper_id] = (rank, row_mode, data)
+        results = {}
+        for paper_id, (_, row_mode, data) in best.items():
+            paper = json.loads(data)
+            for relation in self.RELATIONS[row_mode] - self.RELATIONS[mode]:
+                paper.pop(relation, None)
+            results[paper_id] = paper
+        return results
+
+    def set_many(self, papers: dict[str, dict], mode: str, signature: str):
+        """
+        Store payloads fetched with the given mode.
+
+        Args:
+            papers (dict[str, dict]): Payloads keyed by the paper ID they were requested with
+            mode (str): The fetch mode used
+            signature (str): The field-set signature of the fetch mode
+        """
+        if not papers:
+            return
+        now = time.time()
+        rows = []
+        for paper_id, paper in papers.items():
+            data = json.dumps(paper)
+            rows.append((paper_id, mode, signature, data, now))
+            # Also index by the canonical ID when requested by an alias (e.g. DOI:...)
+            canonical_id = paper.get("paperId")
+            if canonical_id and canonical_id != paper_id:
+                rows.append((canonical_id, mode, signature, data, now))
+        conn = self.open()
+        with self._lock, conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO papers VALUES (?, ?, ?, ?, ?)", rows
+            )
+
+
+# Opened at app startup (see `app.main.lifespan`)
+paper_cache = PaperCache(
+    settings.PAPER_CACHE_PATH,
+    ttl=settings.PAPER_CACHE_TTL,
+    relation_ttl=settings.PAPER_CACHE_RELATION_TTL,
+)
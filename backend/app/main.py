@@ -1,7 +1,26 @@
 """Entry point for running the FastAPI backend app."""
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
-from app.routers import auth, graph, papers, recommended
+from app.database.graph_snapshots import graph_snapshots
+from app.database.paper_cache import paper_cache
+from app.routers import auth, graph, papers, recommended, status
+from app.semantic_scholar import semantic_scholar
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Open the paper cache and graph snapshot store on startup, and release
+    them and the pooled Semantic Scholar connections on shutdown.
+    """
+    paper_cache.open()
+    graph_snapshots.open()
+    yield
+    await semantic_scholar.aclose()
+    paper_cache.close()
+    graph_snapshots.close()
 
 
 # Create the FastAPI app instance
@@ -9,6 +28,7 @@ app = FastAPI(
     title="PaperRef API",
     description="Backend API for PaperRef web app",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 
@@ -17,6 +37,7 @@ app.include_router(auth.router, prefix="/auth", tags=["auth"])
 app.include_router(papers.router, prefix="/library", tags=["library"])
 app.include_router(graph.router, prefix="/graph", tags=["graph"])
 app.include_router(recommended.router, prefix="/recommended", tags=["recommended"])
+app.include_router(status.router, prefix="/status", tags=["status"])
 
 
 # Root endpoint for testing
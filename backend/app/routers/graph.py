@@ -1,30 +1,249 @@
 """Routers for graph modules"""
 
-from fastapi import APIRouter, Depends
+from typing import Annotated, Literal
 
+from fastapi import APIRouter, Body, Depends, Query, Request
+from fastapi.responses import Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
 from app.firebase import get_current_user
+from app.services.analytics import get_graph_analytics_service
+from app.services.budget import (
+    enforce_batch_budget,
+    enforce_graph_budget,
+    enforce_library_budget,
+    plan_graph_service,
+)
+from app.services.communities import (
+    get_community_service,
+    get_graph_communities_service,
+    get_library_communities_service,
+    get_library_community_service,
+)
+from app.services.paths import get_path_service
 from app.services.graph import (
     get_graph_service,
+    get_graph_batch_service,
+    get_graph_json_service,
+    get_library_graph_service,
+    open_graph_stream,
     get_references_service,
     get_citations_service,
 )
 from app.schemas.papers import Paper
-from app.schemas.graph import GraphResponse
+from app.services.papers import get_paper_library_service
+from app.schemas.graph import (
+    CommunityResponse,
+    DirectedGraph,
+    GraphParams,
+    GraphPlan,
+    GraphResponse,
+    NormalizedGraphParams,
+    NormalizedGraphResponse,
+)
+from app.utils.compact import MEDIA_TYPE, encode_graphs
+from app.utils.normalized import normalize_graphs
 
 
 router = APIRouter()
 
 
+def negotiate(request: Request, graphs: GraphResponse) -> GraphResponse | Response:
+    """Encode graphs compactly for clients that accept MessagePack, else as JSON."""
+    if MEDIA_TYPE in request.headers.get("accept", ""):
+        return Response(encode_graphs(graphs), media_type=MEDIA_TYPE)
+    return graphs
+
+
 @router.post("", response_model=GraphResponse)
-def get_graph(paper: Paper, user_id: str = Depends(get_current_user)):
-    return get_graph_service(paper)
+async def get_graph(
+    request: Request,
+    paper: Paper,
+    params: Annotated[GraphParams, Query()],
+    user_id: str = Depends(get_current_user),
+):
+    params = await run_in_threadpool(enforce_graph_budget, paper, params)
+    if MEDIA_TYPE in request.headers.get("accept", ""):
+        graphs = await get_graph_service(paper, **params.model_dump())
+        return negotiate(request, graphs)
+    # Snapshots are stored as JSON, so they are served without re-encoding
+    graphs = await get_graph_json_service(paper, **params.model_dump())
+    return Response(graphs, media_type="application/json")
+
+
+def negotiate_normalized(
+    request: Request, graphs: GraphResponse, slim: bool
+) -> NormalizedGraphResponse | Response:
+    """
+    Encode graphs with a shared paper table, compactly for clients that accept
+    MessagePack (whose encoding already shares one), else as normalized JSON.
+    """
+    if MEDIA_TYPE in request.headers.get("accept", ""):
+        return Response(encode_graphs(graphs, slim=slim), media_type=MEDIA_TYPE)
+    return normalize_graphs(graphs, slim=slim)
+
+
+@router.post("/normalized", response_model=NormalizedGraphResponse)
+async def get_normalized_graph(
+    request: Request,
+    paper: Paper,
+    params: Annotated[NormalizedGraphParams, Query()],
+    user_id: str = Depends(get_current_user),
+):
+    build = await run_in_threadpool(enforce_graph_budget, paper, params)
+    graphs = await get_graph_service(paper, **build.model_dump(exclude={"slim"}))
+    return negotiate_normalized(request, graphs, params.slim)
+
+
+@router.post("/batch", response_model=list[GraphResponse])
+async def get_graph_batch(
+    papers: Annotated[
+        list[Paper], Body(min_length=1, max_length=settings.GRAPH_MAX_BATCH_SEEDS)
+    ],
+    params: Annotated[GraphParams, Query()],
+    user_id: str = Depends(get_current_user),
+):
+    params = await run_in_threadpool(enforce_batch_budget, papers, params)
+    return await get_graph_batch_service(papers, **params.model_dump())
+
+
+@router.post("/stream")
+async def stream_graph(
+    paper: Paper,
+    params: Annotated[GraphParams, Query()],
+    user_id: str = Depends(get_current_user),
+):
+    params = await run_in_threadpool(enforce_graph_budget, paper, params)
+    frames = await open_graph_stream(paper, **params.model_dump())
+    return StreamingResponse(frames, media_type="application/x-ndjson")
+
+
+@router.post("/estimate", response_model=GraphPlan)
+async def estimate_graph(
+    paper: Paper,
+    params: Annotated[GraphParams, Query()],
+    user_id: str = Depends(get_current_user),
+):
+    return await run_in_threadpool(plan_graph_service, paper, params)
+
+
+@router.post("/analytics", response_model=GraphResponse)
+async def get_graph_analytics(
+    request: Request,
+    paper: Paper,
+    params: Annotated[GraphParams, Query()],
+    user_id: str = Depends(get_current_user),
+):
+    params = await run_in_threadpool(enforce_graph_budget, paper, params)
+    graphs = await get_graph_analytics_service(paper, **params.model_dump())
+    return negotiate(request, graphs)
+
+
+@router.post("/communities", response_model=CommunityResponse)
+async def get_graph_communities(
+    paper: Paper,
+    params: Annotated[GraphParams, Query()],
+    user_id: str = Depends(get_current_user),
+):
+    params = await run_in_threadpool(enforce_graph_budget, paper, params)
+    return await get_graph_communities_service(paper, **params.model_dump())
+
+
+@router.post("/communities/{graph}/{community}", response_model=DirectedGraph)
+async def get_community(
+    graph: Literal["citation", "reference"],
+    community: int,
+    paper: Paper,
+    params: Annotated[GraphParams, Query()],
+    user_id: str = Depends(get_current_user),
+):
+    params = await run_in_threadpool(enforce_graph_budget, paper, params)
+    return await get_community_service(paper, graph, community, **params.model_dump())
+
+
+@router.post("/path", response_model=DirectedGraph)
+async def get_path(
+    source: Paper,
+    target: Paper,
+    depth: int = Query(
+        settings.GRAPH_PATH_MAX_DEPTH, ge=1, le=settings.GRAPH_PATH_MAX_DEPTH
+    ),
+    max_paths: int = Query(10, ge=1, le=100),
+    user_id: str = Depends(get_current_user),
+):
+    return await get_path_service(source, target, depth=depth, max_paths=max_paths)
+
+
+@router.get("/library", response_model=GraphResponse)
+async def get_library_graph(
+    request: Request,
+    depth: int = Query(1, ge=1, le=settings.GRAPH_MAX_DEPTH),
+    layout: bool = False,
+    user_id: str = Depends(get_current_user),
+):
+    user_papers = await run_in_threadpool(get_paper_library_service, user_id)
+    params = await run_in_threadpool(enforce_library_budget, user_papers, depth)
+    graphs = await get_library_graph_service(
+        user_papers, num_nodes=params.num_nodes, depth=params.depth, layout=layout
+    )
+    return negotiate(request, graphs)
+
+
+@router.get("/library/normalized", response_model=NormalizedGraphResponse)
+async def get_normalized_library_graph(
+    request: Request,
+    depth: int = Query(1, ge=1, le=settings.GRAPH_MAX_DEPTH),
+    layout: bool = False,
+    slim: bool = False,
+    user_id: str = Depends(get_current_user),
+):
+    user_papers = await run_in_threadpool(get_paper_library_service, user_id)
+    params = await run_in_threadpool(enforce_library_budget, user_papers, depth)
+    graphs = await get_library_graph_service(
+        user_papers, num_nodes=params.num_nodes, depth=params.depth, layout=layout
+    )
+    return negotiate_normalized(request, graphs, slim)
+
+
+@router.get("/library/communities", response_model=CommunityResponse)
+async def get_library_communities(
+    depth: int = Query(1, ge=1, le=settings.GRAPH_MAX_DEPTH),
+    layout: bool = False,
+    user_id: str = Depends(get_current_user),
+):
+    user_papers = await run_in_threadpool(get_paper_library_service, user_id)
+    params = await run_in_threadpool(enforce_library_budget, user_papers, depth)
+    return await get_library_communities_service(
+        user_papers, num_nodes=params.num_nodes, depth=params.depth, layout=layout
+    )
+
+
+@router.get("/library/communities/{graph}/{community}", response_model=DirectedGraph)
+async def get_library_community(
+    graph: Literal["citation", "reference"],
+    community: int,
+    depth: int = Query(1, ge=1, le=settings.GRAPH_MAX_DEPTH),
+    layout: bool = False,
+    user_id: str = Depends(get_current_user),
+):
+    user_papers = await run_in_threadpool(get_paper_library_service, user_id)
+    params = await run_in_threadpool(enforce_library_budget, user_papers, depth)
+    return await get_library_community_service(
+        user_papers,
+        graph,
+        community,
+        num_nodes=params.num_nodes,
+        depth=params.depth,
+        layout=layout,
+    )
 
 
 @router.post("/references", response_model=list[Paper])
-def get_references(papers: list[Paper], user_id: str = Depends(get_current_user)):
-    return get_references_service(papers)
+async def get_references(papers: list[Paper], user_id: str = Depends(get_current_user)):
+    return await get_references_service(papers)
 
 
 @router.post("/citations", response_model=list[Paper])
-def get_citations(papers: list[Paper], user_id: str = Depends(get_current_user)):
-    return get_citations_service(papers)
+async def get_citations(papers: list[Paper], user_id: str = Depends(get_current_user)):
+    return await get_citations_service(papers)
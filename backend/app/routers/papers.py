@@ -1,31 +1,61 @@
-from fastapi import APIRouter, Depends, Query, HTTPException
+from typing import Annotated
 
+from fastapi import APIRouter, Body, Depends, Query, HTTPException
+
+from app.config import settings
 from app.firebase import get_current_user
 from app.services.papers import (
+    get_paper_details_service,
     get_paper_library_service,
     search_papers_service,
     add_paper_to_library_service,
     delete_paper_from_library_service,
 )
-from app.schemas.papers import Paper
+from app.schemas.papers import Paper, PaperDetails
+from app.utils.paper import strip_heavy_fields
 
 
 router = APIRouter()
 
 
 @router.get("/papers", response_model=list[Paper])
-def get_paper_library(user_id: str = Depends(get_current_user)) -> list[Paper]:
+def get_paper_library(
+    light: bool = Query(False, description="Leave out abstracts and TLDRs"),
+    user_id: str = Depends(get_current_user),
+) -> list[Paper]:
     """
     Retrieves a list of papers for a given user from Firestore.
     Note that a valid user_id is needed to call this function.
 
     Args:
+        light (bool): Leave out the abstracts and TLDRs (see `get_paper_details`)
         user_id (str): The ID of the user whose paper library is to be fetched.
 
     Returns:
         list[Paper]: A list of Paper objects retrieved from the user's Firestore library.
     """
-    return get_paper_library_service(user_id)
+    papers = get_paper_library_service(user_id)
+    return strip_heavy_fields(papers) if light else papers
+
+
+@router.post("/papers/details", response_model=list[PaperDetails])
+async def get_paper_details(
+    paper_ids: Annotated[
+        list[str], Body(min_length=1, max_length=settings.PAPER_DETAILS_MAX_IDS)
+    ],
+    user_id: str = Depends(get_current_user),
+) -> list[PaperDetails]:
+    """
+    Get the abstracts and TLDRs left out of light listings, for a list of papers.
+
+    Args:
+        paper_ids (list[str]): IDs of the papers
+        user_id (str): The ID of the current user
+
+    Returns:
+        list[PaperDetails]: The details of the papers found, in order
+    """
+    return await get_paper_details_service(paper_ids)
 
 
 # @router.post("/papers")
@@ -78,11 +108,12 @@ def delete_paper_from_library(paper_id: str, user_id: str = Depends(get_current_
 
 
 @router.get("/search", response_model=list[Paper])
-def search_papers(
+async def search_papers(
     query: str = Query(..., description="The search query string"),
     limit: int = Query(
         5, ge=1, le=100, description="Maximum number of results to return"
     ),
+    light: bool = Query(False, description="Leave out abstracts and TLDRs"),
 ):
     """
     Search for papers using the Semantic Scholar API.
@@ -90,11 +121,13 @@ def search_papers(
     Args:
         query (str): The search query string
         limit (int): Maximum number of results to return (default: 5)
+        light (bool): Leave out the abstracts and TLDRs (see `get_paper_details`)
 
     Returns:
         list[Paper]: List of papers matching the search query
     """
-    return search_papers_service(
+    papers = await search_papers_service(
         query=query,
         limit=limit,
     )
+    return strip_heavy_fields(papers) if light else papers
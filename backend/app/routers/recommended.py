@@ -1,18 +1,23 @@
 """Routers for paper recommendation modules"""
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
+from starlette.concurrency import run_in_threadpool
 
 from app.firebase import get_current_user
 from app.services.papers import get_paper_library_service
 from app.services.recommended import get_paper_recommendations_service
 from app.schemas.papers import Paper
+from app.utils.paper import strip_heavy_fields
 
 
 router = APIRouter()
 
 
 @router.get("", response_model=list[Paper])
-def get_recommendations(user_id: str = Depends(get_current_user)):
-    user_papers = get_paper_library_service(user_id)
-    recommended_papers = get_paper_recommendations_service(user_papers)
-    return recommended_papers
+async def get_recommendations(
+    light: bool = Query(False, description="Leave out abstracts and TLDRs"),
+    user_id: str = Depends(get_current_user),
+):
+    user_papers = await run_in_threadpool(get_paper_library_service, user_id)
+    recommended_papers = await get_paper_recommendations_service(user_papers)
+    return strip_heavy_fields(recommended_papers) if light else recommended_papers
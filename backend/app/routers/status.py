@@ -0,0 +1,19 @@
+"""Routers for service status and upstream health"""
+
+from fastapi import APIRouter
+
+from app.semantic_scholar import semantic_scholar
+
+
+router = APIRouter()
+
+
+@router.get("/semantic_scholar")
+def get_semantic_scholar_status() -> dict:
+    """
+    Current state of the shared Semantic Scholar client.
+
+    Returns:
+        dict: The rate limiter, circuit breaker and hedging state
+    """
+    return semantic_scholar.state()
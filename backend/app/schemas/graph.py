@@ -2,14 +2,32 @@
 as directed graphs.
 """
 
-from pydantic import BaseModel
+from typing import Literal
 
+from pydantic import BaseModel, Field
+
+from app.config import settings
 from app.schemas.papers import Paper
 
 
+class Position(BaseModel):
+    """
+    Position of a node in a precomputed graph layout.
+
+    Attributes:
+        x (float): Horizontal position, in pixels
+        y (float): Vertical position, in pixels
+    """
+
+    x: float
+    y: float
+
+
 class Node(BaseModel):
     id: str  # Unique identifier for the node
     detail: Paper
+    in_library: bool = False  # Whether the paper is in the user's library
+    position: Position | None = None  # Precomputed layout position, if requested
 
 
 class Edge(BaseModel):
@@ -26,6 +44,42 @@ class Edge(BaseModel):
     target: str
 
 
+class SimilarPaper(BaseModel):
+    """
+    A paper similar to another one, with their similarity score.
+
+    Attributes:
+        id (str): The id of the similar node
+        score (float): Cosine-normalized similarity in [0, 1]
+    """
+
+    id: str
+    score: float
+
+
+class NodeAnalytics(BaseModel):
+    """
+    Graph analytics of a single node.
+
+    Attributes:
+        id (str): The id of the node
+        pagerank (float): PageRank of the paper, with importance flowing
+                          from citing to cited papers
+        in_degree (int): Number of edges pointing to the node
+        out_degree (int): Number of edges leaving the node
+        co_cited (list[SimilarPaper]): Papers most often cited together with this one
+        coupled (list[SimilarPaper]): Papers sharing the most references with this one
+                                      (bibliographic coupling)
+    """
+
+    id: str
+    pagerank: float
+    in_degree: int
+    out_degree: int
+    co_cited: list[SimilarPaper]
+    coupled: list[SimilarPaper]
+
+
 class DirectedGraph(BaseModel):
     """
     This class creates a graph object to represent a list of nodes and
@@ -36,11 +90,13 @@ class DirectedGraph(BaseModel):
         edges (list[Edge]): List of directed edges in the graph
         max_citations (int): maximum number of citations or edges
                              a single paper (node) can have
+        analytics (list[NodeAnalytics] | None): Per-node scores, if requested
     """
 
     nodes: list[Node]
     edges: list[Edge]
     max_citations: int
+    analytics: list[NodeAnalytics] | None = None
 
 
 class GraphResponse(BaseModel):
@@ -55,3 +111,278 @@ class GraphResponse(BaseModel):
 
     citation_graph: DirectedGraph
     reference_graph: DirectedGraph
+
+
+class GraphNode(BaseModel):
+    """
+    A node of a normalized graph, its paper being in the shared paper table.
+
+    Attributes:
+        id (str): The paper's id, a key of the paper table
+        in_library (bool): Whether the paper is in the user's library
+        position (Position | None): Precomputed layout position, if requested
+    """
+
+    id: str
+    in_library: bool = False
+    position: Position | None = None
+
+
+class NormalizedGraph(BaseModel):
+    """
+    A directed graph whose nodes only refer to their papers by id.
+
+    Attributes:
+        nodes (list[GraphNode]): List of nodes in the graph
+        edges (list[Edge]): List of directed edges in the graph
+        max_citations (int): Maximum citation count among the nodes
+        analytics (list[NodeAnalytics] | None): Per-node scores, if requested
+    """
+
+    nodes: list[GraphNode]
+    edges: list[Edge]
+    max_citations: int
+    analytics: list[NodeAnalytics] | None = None
+
+
+class NormalizedGraphResponse(BaseModel):
+    """
+    Citation and reference graphs sharing a single table of their papers, so
+    that papers in both graphs are sent once.
+
+    Attributes:
+        papers (dict[str, Paper]): The paper of each node of either graph, by id
+        citation_graph (NormalizedGraph): Citation graph for a given paper
+        reference_graph (NormalizedGraph): Reference graph for a given paper
+        slim (bool): Whether the abstracts and TLDRs of the papers are left out
+    """
+
+    papers: dict[str, Paper]
+    citation_graph: NormalizedGraph
+    reference_graph: NormalizedGraph
+    slim: bool = False
+
+
+class Community(BaseModel):
+    """
+    A community of densely connected papers, collapsed into a single node.
+
+    Attributes:
+        id (int): Community number, larger communities first
+        size (int): Number of member papers
+        citation_count (int): Total number of citations of the members
+        representative (Paper): The most cited member
+        in_library (bool): Whether any member is in the user's library
+        merged (bool): Whether this node collects the smallest communities
+        position (Position | None): Centroid of the members' layout positions, if laid out
+    """
+
+    id: int
+    size: int
+    citation_count: int
+    representative: Paper
+    in_library: bool = False
+    merged: bool = False
+    position: Position | None = None
+
+
+class CommunityEdge(BaseModel):
+    """
+    The edges between two communities, aggregated.
+
+    Attributes:
+        source (int): The id of the source community
+        target (int): The id of the target community
+        weight (int): Number of edges from members of the source community
+                      to members of the target community
+    """
+
+    source: int
+    target: int
+    weight: int
+
+
+class CommunityGraph(BaseModel):
+    """
+    Coarse view of a graph, with one node per community.
+
+    Attributes:
+        communities (list[Community]): The communities, largest first
+        edges (list[CommunityEdge]): Aggregated edges between communities
+        num_nodes (int): Number of nodes of the underlying graph
+        num_edges (int): Number of edges of the underlying graph
+    """
+
+    communities: list[Community]
+    edges: list[CommunityEdge]
+    num_nodes: int
+    num_edges: int
+
+
+class CommunityResponse(BaseModel):
+    """
+    Coarse community views of a paper's citation and reference graphs.
+
+    Attributes:
+        citation_graph (CommunityGraph): Communities of the citation graph
+        reference_graph (CommunityGraph): Communities of the reference graph
+    """
+
+    citation_graph: CommunityGraph
+    reference_graph: CommunityGraph
+
+
+class GraphDelta(BaseModel):
+    """
+    A frame of a streamed graph build, holding the nodes and edges added to
+    one of the graphs since its previous frame.
+
+    Attributes:
+        event (str): Always 'delta'
+        graph (str): Either 'citation_graph' or 'reference_graph'
+        nodes (list[Node]): The new nodes
+        edges (list[Edge]): The new edges
+        max_citations (int): Maximum number of citations of the graph so far
+    """
+
+    event: Literal["delta"] = "delta"
+    graph: Literal["citation_graph", "reference_graph"]
+    nodes: list[Node]
+    edges: list[Edge]
+    max_citations: int
+
+
+class GraphLayout(BaseModel):
+    """
+    A frame of a streamed graph build with the precomputed node positions
+    of one of the finished graphs.
+
+    Attributes:
+        event (str): Always 'layout'
+        graph (str): Either 'citation_graph' or 'reference_graph'
+        positions (dict[str, Position]): The position of each node, keyed by its id
+    """
+
+    event: Literal["layout"] = "layout"
+    graph: Literal["citation_graph", "reference_graph"]
+    positions: dict[str, Position]
+
+
+class GraphSize(BaseModel):
+    """
+    Size of a finished graph.
+
+    Attributes:
+        nodes (int): Number of nodes
+        edges (int): Number of edges
+        max_citations (int): Maximum number of citations of a node
+    """
+
+    nodes: int
+    edges: int
+    max_citations: int
+
+
+class GraphSummary(BaseModel):
+    """
+    The final frame of a streamed graph build.
+
+    Attributes:
+        event (str): Always 'summary'
+        citation_graph (GraphSize): Size of the finished citation graph
+        reference_graph (GraphSize): Size of the finished reference graph
+        cached (bool): Whether the graphs were served from a snapshot
+    """
+
+    event: Literal["summary"] = "summary"
+    citation_graph: GraphSize
+    reference_graph: GraphSize
+    cached: bool
+
+
+class GraphStreamError(BaseModel):
+    """
+    The final frame of a streamed graph build that failed after streaming began.
+
+    Attributes:
+        event (str): Always 'error'
+        status_code (int): HTTP status code of the failure
+        detail (str): Description of the failure
+    """
+
+    event: Literal["error"] = "error"
+    status_code: int
+    detail: str
+
+
+class GraphParams(BaseModel):
+    """
+    Tunable parameters of a graph build.
+
+    Attributes:
+        num_nodes (int): Number of most cited related papers kept per expanded paper
+        max_citations (int): Papers cited at least this often have their citations
+                             paged through individually (deep fetch) instead of
+                             fetched in batches
+        max_references (int): Papers with at least this many references have them
+                              paged through individually instead of fetched in batches
+        depth (int): Number of hops to expand the graphs from the input paper
+        layout (bool): Compute node positions with a force-directed layout
+    """
+
+    num_nodes: int = Field(20, ge=1, le=settings.GRAPH_MAX_NUM_NODES)
+    max_citations: int = Field(500, ge=1, le=settings.GRAPH_MAX_RELATION_LIMIT)
+    max_references: int = Field(500, ge=1, le=settings.GRAPH_MAX_RELATION_LIMIT)
+    depth: int = Field(1, ge=1, le=settings.GRAPH_MAX_DEPTH)
+    layout: bool = False
+
+
+class NormalizedGraphParams(GraphParams):
+    """
+    Parameters of a graph build returned as a `NormalizedGraphResponse`.
+
+    Attributes:
+        slim (bool): Leave out the abstracts and TLDRs of the papers
+    """
+
+    slim: bool = False
+
+
+class GraphEstimate(BaseModel):
+    """
+    Predicted cost of a graph build.
+
+    Attributes:
+        nodes (int): Expected number of nodes, summed over both graphs
+        batches (int): Expected number of upstream batch requests
+        deep_pages (int): Upper bound of the pages requested by deep fetches
+        requests (int): Expected number of upstream requests in total
+        seconds (float): Expected duration of the build
+        snapshot (bool): Whether the graphs are served from a snapshot (at no cost)
+        seed_cached (bool): Whether the seed paper's related papers were cached;
+                            otherwise the estimate is based on its counts only
+        within_budget (bool): Whether the build fits the server's request budget
+    """
+
+    nodes: int
+    batches: int
+    deep_pages: int
+    requests: int
+    seconds: float
+    snapshot: bool
+    seed_cached: bool
+    within_budget: bool
+
+
+class GraphPlan(BaseModel):
+    """
+    The cost of a requested graph build and the parameters it would run with.
+
+    Attributes:
+        estimate (GraphEstimate): Predicted cost of the requested parameters
+        params (GraphParams): The parameters the build would use, downscaled
+                              to fit the budget if necessary
+    """
+
+    estimate: GraphEstimate
+    params: GraphParams
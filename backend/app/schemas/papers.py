@@ -18,3 +18,18 @@ class Paper(BaseModel):
     journal: Optional[str] = None
     open_access_url: Optional[str] = None
     tldr: Optional[str] = None
+
+
+class PaperDetails(BaseModel):
+    """
+    The long text fields of a paper, left out of light listings.
+
+    Attributes:
+        id (str): The paper's id
+        abstract (str | None): The paper's abstract
+        tldr (str | None): AI generated summary of the paper, if known
+    """
+
+    id: str
+    abstract: Optional[str] = None
+    tldr: Optional[str] = None
@@ -0,0 +1,333 @@
+"""Shared HTTP client for all Semantic Scholar API traffic."""
+
+import asyncio
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+import httpx
+
+from app.config import settings
+from app.utils.rate_limit import AdaptiveRateLimiter, parse_retry_after
+from app.utils.recording import save_recording
+from app.utils.resilience import CircuitBreaker, CircuitOpenError, LatencyTracker
+
+
+class SemanticScholarClient:
+    """
+    Pooled async HTTP client for the Semantic Scholar API.
+
+    A single keep-alive connection pool is shared by every caller, and the
+    number of in-flight upstream requests is bounded by a semaphore. Both are
+    created lazily and recreated if the running event loop changes (e.g. when
+    the app is driven by a fresh TestClient portal).
+
+    Every request first acquires a token from the shared adaptive rate limiter.
+    Rate-limited (429) responses feed back into the limiter and are retried
+    after the upstream's `Retry-After` delay, up to `max_retries` times.
+
+    Tail latency is cut by hedging: once a request has been outstanding for
+    longer than the `hedge_percentile` of recent latencies for the same
+    endpoint, a duplicate is sent (only if the rate limiter has a spare token)
+    and whichever answers first wins. Every request also passes through a
+    circuit breaker that fails fast with `CircuitOpenError` while the
+    upstream's rate of server and transport errors is too high.
+
+    When `record_dir` is set, every non-429 response is also written to disk
+    so it can be replayed by the benchmark stand-in server.
+
+    Attributes:
+        max_concurrency (int): Maximum number of concurrent upstream requests
+        limiter (AdaptiveRateLimiter): Rate limiter shared by all requests
+        max_retries (int): Number of retries for rate-limited requests
+        timeout (float): Default request timeout in seconds
+        record_dir (str | None): Directory to record upstream responses to
+        breaker (CircuitBreaker): Circuit breaker guarding the upstream
+        hedge_percentile (float | None): Latency percentile that triggers a
+                                         hedged request (None disables hedging)
+        hedge_min_delay (float): Minimum delay in seconds before hedging
+    """
+
+    HEADERS = {"Content-Type": "application/json; charset=UTF-8"}
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        limiter: AdaptiveRateLimiter,
+        max_retries: int = 3,
+        timeout: float = 30,
+        record_dir: str | None = None,
+        breaker: CircuitBreaker | None = None,
+        hedge_percentile: float | None = None,
+        hedge_min_delay: float = 0.05,
+    ):
+        self.max_concurrency = max_concurrency
+        self.limiter = limiter
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.record_dir = record_dir
+        self.breaker = breaker or CircuitBreaker()
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_delay = hedge_min_delay
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.latency = {}
+        self._client = None
+        self._semaphore = None
+        self._loop = None
+
+    def _ensure_client(self) -> httpx.AsyncClient:
+        """
+        Return the pooled client, creating it for the running event loop if needed.
+
+        Returns:
+            httpx.AsyncClient: The shared client
+        """
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed or self._loop is not loop:
+            self._client = httpx.AsyncClient(
+                headers=self.HEADERS,
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency,
+                ),
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._loop = loop
+        return self._client
+
+    def _tracker(self, method: str, url: str) -> LatencyTracker:
+        """
+        Latency tracker of an endpoint, keyed by method and last path segment
+        (e.g. 'POST batch' or 'GET citations') so per-paper URLs share one.
+        """
+        path = httpx.URL(url).path.rstrip("/")
+        key = f"{method} {path.rsplit('/', 1)[-1]}"
+        return self.latency.setdefault(key, LatencyTracker())
+
+    async def _send(
+        self,
+        client: httpx.AsyncClient,
+        tracker: LatencyTracker,
+        method: str,
+        url: str,
+        kwargs: dict,
+    ) -> httpx.Response:
+        """Send one request through the concurrency bound and time it."""
+        async with self._semaphore:
+            start = time.monotonic()
+            response = await client.request(method, url, **kwargs)
+        if response.status_code < 500:
+            tracker.record(time.monotonic() - start)
+        return response
+
+    async def _send_hedged(
+        self, client: httpx.AsyncClient, method: str, url: str, kwargs: dict
+    ) -> httpx.Response:
+        """
+        Send a request, hedging it with a duplicate if it is slower than usual.
+
+        Args:
+            client (httpx.AsyncClient): The pooled client
+            method (str): HTTP method
+            url (str): Absolute request URL
+            kwargs (dict): Extra arguments forwarded to httpx
+
+        Returns:
+            httpx.Response: The first successful (below 429) response, or else
+                the primary's response (the hedge's if the primary raised)
+
+        Raises:
+            httpx.HTTPError: Any transport error (if every attempt failed)
+        """
+        tracker = self._tracker(method, url)
+        delay = (
+            tracker.percentile(self.hedge_percentile)
+            if self.hedge_percentile is not None
+            else None
+        )
+        primary = asyncio.ensure_future(
+            self._send(client, tracker, method, url, kwargs)
+        )
+        if delay is None:
+            return await primary
+        tasks = {primary}
+        try:
+            done, _ = await asyncio.wait(
+                tasks, timeout=max(delay, self.hedge_min_delay)
+            )
+            if done or not self.limiter.try_acquire():
+                return await primary
+            self.hedged += 1
+            hedge = asyncio.ensure_future(
+                self._send(client, tracker, method, url, kwargs)
+            )
+            tasks.add(hedge)
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    # A rate-limited or failed answer does not beat a slower success
+                    if task.exception() is None and task.result().status_code < 429:
+                        if task is hedge:
+                            self.hedge_wins += 1
+                        return task.result()
+            if primary.exception() is not None and hedge.exception() is None:
+                return hedge.result()
+            return primary.result()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """
+        Send a request to the Semantic Scholar API through the shared pool.
+
+        Args:
+            method (str): HTTP method
+            url (str): Absolute request URL
+            **kwargs: Extra arguments forwarded to httpx (params, json, timeout, ...)
+
+        Returns:
+            httpx.Response: The upstream response (still 429 if retries ran out)
+
+        Raises:
+            CircuitOpenError: If the circuit breaker is open
+            httpx.HTTPError: Any transport error
+        """
+        if not self.breaker.allow():
+            raise CircuitOpenError(self.breaker.retry_after())
+        client = self._ensure_client()
+        for _ in range(self.max_retries + 1):
+            await self.limiter.acquire()
+            try:
+                response = await self._send_hedged(client, method, url, kwargs)
+            except httpx.TransportError:
+                self.breaker.record(False)
+                raise
+            self.breaker.record(response.status_code < 500)
+            if response.status_code != 429:
+                self.limiter.on_success()
+                if self.record_dir:
+                    save_recording(self.record_dir, response)
+                return response
+            self.limiter.on_rate_limited(
+                parse_retry_after(response.headers.get("Retry-After"))
+            )
+        return response
+
+    @asynccontextmanager
+    async def stream(
+        self, method: str, url: str, **kwargs
+    ) -> AsyncIterator[httpx.Response]:
+        """
+        Send a request whose response body is consumed incrementally.
+
+        Rate limiting, 429 retries and circuit breaking behave as in `request`,
+        but streamed requests are never hedged; the concurrency slot is held
+        until the caller has finished reading the body.
+
+        Args:
+            method (str): HTTP method
+            url (str): Absolute request URL
+            **kwargs: Extra arguments forwarded to httpx (params, json, timeout, ...)
+
+        Yields:
+            httpx.Response: The upstream response with an unread body
+
+        Raises:
+            CircuitOpenError: If the circuit breaker is open
+            httpx.HTTPError: Any transport error
+        """
+        if not self.breaker.allow():
+            raise CircuitOpenError(self.breaker.retry_after())
+        client = self._ensure_client()
+        for attempt in range(self.max_retries + 1):
+            await self.limiter.acquire()
+            recorded = False
+            async with self._semaphore:
+                try:
+                    async with client.stream(method, url, **kwargs) as response:
+                        self.breaker.record(response.status_code < 500)
+                        recorded = True
+                        if response.status_code != 429:
+                            self.limiter.on_success()
+                            if self.record_dir:
+                                await response.aread()
+                                save_recording(self.record_dir, response)
+                            yield response
+                            return
+                        if attempt == self.max_retries:
+                            yield response
+                            return
+                except httpx.TransportError:
+                    # An error while the caller reads the body was already
+                    # counted with the response headers
+                    if not recorded:
+                        self.breaker.record(False)
+                    raise
+            self.limiter.on_rate_limited(
+                parse_retry_after(response.headers.get("Retry-After"))
+            )
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        """Send a GET request (see `request`)."""
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        """Send a POST request (see `request`)."""
+        return await self.request("POST", url, **kwargs)
+
+    def state(self) -> dict:
+        """
+        Snapshot of the client's current state.
+
+        Returns:
+            dict: The rate limiter, circuit breaker and hedging state
+        """
+        return {
+            "max_concurrency": self.max_concurrency,
+            "rate_limiter": self.limiter.state(),
+            "circuit_breaker": self.breaker.state(),
+            "hedging": {
+                "percentile": self.hedge_percentile,
+                "hedged": self.hedged,
+                "hedge_wins": self.hedge_wins,
+                "thresholds": {
+                    key: tracker.percentile(self.hedge_percentile)
+                    for key, tracker in self.latency.items()
+                }
+                if self.hedge_percentile is not None
+                else {},
+            },
+        }
+
+    async def aclose(self):
+        """Close the pooled client, if one is open."""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+
+
+semantic_scholar = SemanticScholarClient(
+    max_concurrency=settings.SEMANTIC_SCHOLAR_MAX_CONCURRENCY,
+    limiter=AdaptiveRateLimiter(
+        rate=settings.SEMANTIC_SCHOLAR_RATE_LIMIT,
+        capacity=settings.SEMANTIC_SCHOLAR_BURST,
+        min_rate=settings.SEMANTIC_SCHOLAR_MIN_RATE_LIMIT,
+        max_rate=settings.SEMANTIC_SCHOLAR_MAX_RATE_LIMIT,
+    ),
+    max_retries=settings.SEMANTIC_SCHOLAR_MAX_RETRIES,
+    record_dir=settings.SEMANTIC_SCHOLAR_RECORD_DIR,
+    breaker=CircuitBreaker(
+        error_rate=settings.SEMANTIC_SCHOLAR_BREAKER_ERROR_RATE,
+        min_requests=settings.SEMANTIC_SCHOLAR_BREAKER_MIN_REQUESTS,
+        window=settings.SEMANTIC_SCHOLAR_BREAKER_WINDOW,
+        cooldown=settings.SEMANTIC_SCHOLAR_BREAKER_COOLDOWN,
+    ),
+    hedge_percentile=settings.SEMANTIC_SCHOLAR_HEDGE_PERCENTILE,
+    hedge_min_delay=settings.SEMANTIC_SCHOLAR_HEDGE_MIN_DELAY,
+)
@@ -0,0 +1,169 @@
+"""Graph analytics services computing per-node scores with sparse matrix operations."""
+
+import numpy as np
+import scipy.sparse as sp
+from starlette.concurrency import run_in_threadpool
+
+from app.schemas.graph import (
+    DirectedGraph,
+    GraphResponse,
+    NodeAnalytics,
+    SimilarPaper,
+)
+from app.schemas.papers import Paper
+from app.services.graph import get_graph_service
+
+
+def adjacency_matrix(graph: DirectedGraph) -> sp.csr_matrix:
+    """
+    Convert a graph to a sparse adjacency matrix.
+
+    Both graphs point edges from the cited paper to the citing paper, so
+    A[i, j] = 1 means that paper j cites paper i.
+
+    Args:
+        graph (DirectedGraph): The graph
+
+    Returns:
+        sp.csr_matrix: The (n x n) adjacency matrix, in node order
+    """
+    index = {node.id: i for i, node in enumerate(graph.nodes)}
+    sources = np.fromiter((index[edge.source] for edge in graph.edges), np.int64)
+    targets = np.fromiter((index[edge.target] for edge in graph.edges), np.int64)
+    n = len(graph.nodes)
+    return sp.csr_matrix((np.ones(len(sources)), (sources, targets)), shape=(n, n))
+
+
+def pagerank(
+    adjacency: sp.csr_matrix, damping=0.85, tol=1e-9, max_iter=100
+) -> np.ndarray:
+    """
+    PageRank by power iteration, with importance flowing from citing papers
+    to the papers they cite.
+
+    Args:
+        adjacency (sp.csr_matrix): Adjacency matrix (see `adjacency_matrix`)
+        damping (float): Probability of following a citation
+        tol (float): L1 convergence tolerance
+        max_iter (int): Maximum number of iterations
+
+    Returns:
+        np.ndarray: The PageRank of each node (summing to 1)
+    """
+    n = adjacency.shape[0]
+    if n == 0:
+        return np.zeros(0)
+    # Number of (in-graph) papers each paper cites
+    cites = np.asarray(adjacency.sum(axis=0)).ravel()
+    dangling = cites == 0
+    inverse = np.divide(1.0, cites, out=np.zeros(n), where=~dangling)
+    ranks = np.full(n, 1.0 / n)
+    for _ in range(max_iter):
+        leaked = damping * ranks[dangling].sum() + 1.0 - damping
+        updated = damping * (adjacency @ (ranks * inverse)) + leaked / n
+        converged = np.abs(updated - ranks).sum() < tol
+        ranks = updated
+        if converged:
+            break
+    return ranks
+
+
+def top_similar(
+    similarity: sp.spmatrix, ids: list[str], top_k: int
+) -> list[list[SimilarPaper]]:
+    """
+    Select the top_k most similar other nodes of every node from a sparse
+    co-occurrence matrix, cosine-normalized by its diagonal.
+
+    Args:
+        similarity (sp.spmatrix): Symmetric co-occurrence counts (e.g. A @ A.T)
+        ids (list[str]): The id of each node
+        top_k (int): Number of similar nodes kept per node
+
+    Returns:
+        list[list[SimilarPaper]]: The most similar nodes of each node, best first
+    """
+    coo = similarity.tocoo()
+    diagonal = similarity.diagonal()
+    off_diagonal = coo.row != coo.col
+    rows, cols = coo.row[off_diagonal], coo.col[off_diagonal]
+    scores = coo.data[off_diagonal] / np.sqrt(diagonal[rows] * diagonal[cols])
+    order = np.lexsort((cols, -scores, rows))
+    rows, cols, scores = rows[order], cols[order], scores[order]
+    # Rank of each entry within its row, to keep the first top_k per row
+    rank = np.arange(len(rows)) - np.searchsorted(rows, rows)
+    keep = rank < top_k
+    similar = [[] for _ in ids]
+    for row, col, score in zip(
+        rows[keep].tolist(), cols[keep].tolist(), scores[keep].tolist()
+    ):
+        similar[row].append(SimilarPaper(id=ids[col], score=round(score, 4)))
+    return similar
+
+
+def analyze_graph(graph: DirectedGraph, top_k=5) -> list[NodeAnalytics]:
+    """
+    Compute PageRank, degrees, co-citation and bibliographic coupling of every node.
+
+    Args:
+        graph (DirectedGraph): The graph
+        top_k (int): Number of co-cited and coupled papers kept per node
+
+    Returns:
+        list[NodeAnalytics]: The scores of each node, in node order
+    """
+    ids = [node.id for node in graph.nodes]
+    adjacency = adjacency_matrix(graph)
+    ranks = pagerank(adjacency)
+    out_degrees = np.asarray(adjacency.sum(axis=1)).ravel().astype(int)
+    in_degrees = np.asarray(adjacency.sum(axis=0)).ravel().astype(int)
+    # Papers cited by the same papers (rows) and papers citing the same papers (columns)
+    co_cited = top_similar(adjacency @ adjacency.T, ids, top_k)
+    coupled = top_similar(adjacency.T @ adjacency, ids, top_k)
+    return [
+        NodeAnalytics(
+            id=paper_id,
+            pagerank=round(float(ranks[i]), 6),
+            in_degree=int(in_degrees[i]),
+            out_degree=int(out_degrees[i]),
+            co_cited=co_cited[i],
+            coupled=coupled[i],
+        )
+        for i, paper_id in enumerate(ids)
+    ]
+
+
+def analyze_graphs(graphs: GraphResponse) -> GraphResponse:
+    """
+    Attach analytics to both graphs of a response, leaving the input untouched.
+
+    Args:
+        graphs (GraphResponse): Citation and reference graphs
+
+    Returns:
+        GraphResponse: Copies of the graphs with `analytics` set
+    """
+    return GraphResponse(
+        citation_graph=graphs.citation_graph.model_copy(
+            update={"analytics": analyze_graph(graphs.citation_graph)}
+        ),
+        reference_graph=graphs.reference_graph.model_copy(
+            update={"analytics": analyze_graph(graphs.reference_graph)}
+        ),
+    )
+
+
+async def get_graph_analytics_service(paper: Paper, **graph_params) -> GraphResponse:
+    """
+    Build (or reuse) the graphs of a paper and compute per-node analytics.
+
+    Args:
+        paper (Paper): Input paper
+        **graph_params: The build parameters (see `get_graph_service`)
+
+    Returns:
+        GraphResponse: Both graphs with their per-node analytics
+    """
+    graphs = await get_graph_service(paper, **graph_params)
+    # The sparse computations are CPU-bound, so keep them off the event loop
+    return await run_in_threadpool(analyze_graphs, graphs)
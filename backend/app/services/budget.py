@@ -0,0 +1,367 @@
+"""Cost estimation and request budgets of graph builds."""
+
+import math
+
+from fastapi import HTTPException
+
+from app.config import settings
+from app.database.graph_snapshots import graph_snapshots
+from app.schemas.graph import GraphEstimate, GraphParams, GraphPlan
+from app.schemas.papers import Paper
+from app.semantic_scholar import semantic_scholar
+from app.services.graph import LIBRARY_NUM_NODES, PaperBatchFetcher
+from app.utils.graph_core import top_cited
+
+# Papers per frontier and second-level batch (see `PaperBatchFetcher.iter_batched`)
+BATCH_SIZE = 50
+# Assumed upstream latency (s) until enough requests have been timed
+DEFAULT_LATENCY = 1.0
+
+
+def estimate_graph_size(
+    related: list[dict] | None,
+    count: int,
+    count_field: str,
+    limit: int,
+    params: GraphParams,
+    deep_fetch: bool,
+) -> tuple[int, int, int]:
+    """
+    Estimate the size and upstream fetches of one of a paper's graphs.
+
+    Every level is assumed to add as many new nodes as the level width and
+    node budget allow (no overlap between the papers' neighbours), so the
+    estimate errs on the expensive side. The share of nodes whose related
+    lists are deep fetched in the second-level pass is taken from the seed's
+    own neighbours when they are known.
+
+    Args:
+        related (list[dict] | None): The seed's related papers, if known
+        count (int): The seed's number of related papers
+        count_field (str): Raw count compared with the deep fetch limit
+                           ('citationCount' or 'referenceCount')
+        limit (int): Deep fetch threshold (max_citations or max_references)
+        params (GraphParams): The build parameters
+        deep_fetch (bool): Page through the related papers of highly cited papers
+
+    Returns:
+        tuple[int, int, int]: The number of nodes, batch requests and deep fetch pages
+    """
+    top = None
+    if related is not None:
+        top = top_cited(
+            [paper for paper in related if paper.get("paperId")], params.num_nodes
+        )
+    frontier = len(top) if top is not None else min(params.num_nodes, count)
+    nodes = 1 + frontier
+    batches = 0
+    for _ in range(params.depth - 1):
+        if not frontier or nodes >= settings.GRAPH_MAX_NODES:
+            break
+        batches += math.ceil(frontier / BATCH_SIZE)
+        frontier = min(
+            settings.GRAPH_LEVEL_WIDTH,
+            frontier * params.num_nodes,
+            settings.GRAPH_MAX_NODES - nodes,
+        )
+        nodes += frontier
+
+    # Second-level pass over every node, paging through the highly connected ones
+    counts = [paper.get(count_field) or 0 for paper in top or []]
+    deep = [value for value in counts if value >= limit]
+    share = len(deep) / len(counts) if counts else 0.0
+    if count >= limit:
+        deep.append(count)
+    deep_nodes = round((nodes - 1) * share) + (count >= limit)
+    batches += math.ceil((nodes - deep_nodes) / BATCH_SIZE)
+    deep_pages = 0
+    if deep_fetch and deep:
+        pages = [
+            min(
+                math.ceil(value / PaperBatchFetcher.PAGE_SIZE),
+                settings.GRAPH_DEEP_FETCH_MAX_PAGES,
+            )
+            for value in deep
+        ]
+        deep_pages = math.ceil(deep_nodes * sum(pages) / len(pages))
+    return nodes, batches, deep_pages
+
+
+def expected_seconds(requests: int) -> float:
+    """
+    Expected duration of a number of upstream requests, given the client's
+    concurrency, current rate limit and recent batch latency.
+    """
+    tracker = semantic_scholar.latency.get("POST batch")
+    latency = (tracker and tracker.percentile(50)) or DEFAULT_LATENCY
+    limiter = semantic_scholar.limiter
+    waves = math.ceil(requests / semantic_scholar.max_concurrency) * latency
+    throttled = max(requests - limiter.capacity, 0) / limiter.rate
+    return round(max(waves, throttled), 2)
+
+
+def _estimate(
+    seed: dict | None, paper: Paper, params: GraphParams, deep_fetch: bool, local: bool
+) -> GraphEstimate:
+    """Estimate a build from the (possibly unknown) seed paper data."""
+    if seed is not None:
+        citations, references = seed.get("citations"), seed.get("references")
+        citation_count = seed.get("citationCount") or 0
+        reference_count = seed.get("referenceCount") or 0
+    else:
+        citations = references = None
+        citation_count = paper.citation_count or 0
+        reference_count = paper.reference_count or 0
+    sizes = [
+        estimate_graph_size(
+            citations,
+            citation_count,
+            "citationCount",
+            params.max_citations,
+            params,
+            deep_fetch,
+        ),
+        estimate_graph_size(
+            references,
+            reference_count,
+            "referenceCount",
+            params.max_references,
+            params,
+            deep_fetch,
+        ),
+    ]
+    nodes, batches, deep_pages = (sum(values) for values in zip(*sizes))
+    # A local mirror answers without any upstream request
+    requests = 0 if local else (seed is None) + batches + deep_pages
+    return GraphEstimate(
+        nodes=nodes,
+        batches=batches,
+        deep_pages=deep_pages,
+        requests=requests,
+        seconds=expected_seconds(requests),
+        snapshot=False,
+        seed_cached=seed is not None,
+        within_budget=requests <= settings.GRAPH_REQUEST_BUDGET,
+    )
+
+
+def snapshot_key(paper: Paper, params: GraphParams, deep_fetch: bool) -> str:
+    """Key of the snapshot a build of a paper's graphs would be stored under."""
+    return graph_snapshots.key(
+        paper.id,
+        params.num_nodes,
+        deep_fetch,
+        params.depth,
+        params.max_citations,
+        params.max_references,
+    )
+
+
+def downscale(params: GraphParams) -> GraphParams | None:
+    """
+    The next smaller build parameters: one level less deep, or else half the
+    num_nodes.
+
+    Args:
+        params (GraphParams): The build parameters
+
+    Returns:
+        GraphParams | None: The smaller parameters, or None if there are none
+    """
+    if params.depth > 1:
+        return params.model_copy(update={"depth": params.depth - 1})
+    if params.num_nodes > 1:
+        return params.model_copy(update={"num_nodes": params.num_nodes // 2})
+    return None
+
+
+def plan_graph_service(
+    paper: Paper, params: GraphParams, deep_fetch=settings.GRAPH_DEEP_FETCH
+) -> GraphPlan:
+    """
+    Estimate the cost of building a paper's graphs, and the parameters the
+    build would use: with GRAPH_OVER_BUDGET set to 'downscale', builds over
+    GRAPH_REQUEST_BUDGET lose depth first, then have their num_nodes halved,
+    until they fit.
+
+    The estimate is made from the seed paper's cached data without any
+    upstream request, falling back to the counts of the given paper.
+    Graphs with a snapshot cost nothing. Both lookups read SQLite, so async
+    callers run this in a worker thread.
+
+    Args:
+        paper (Paper): Input paper
+        params (GraphParams): The requested build parameters
+        deep_fetch (bool): Page through the citations/references of highly cited papers
+
+    Returns:
+        GraphPlan: The estimate of the requested parameters and the planned parameters
+    """
+    if graph_snapshots.exists(snapshot_key(paper, params, deep_fetch)):
+        estimate = GraphEstimate(
+            nodes=0,
+            batches=0,
+            deep_pages=0,
+            requests=0,
+            seconds=0.0,
+            snapshot=True,
+            seed_cached=True,
+            within_budget=True,
+        )
+        return GraphPlan(estimate=estimate, params=params)
+    fetcher = PaperBatchFetcher()
+    seed = fetcher.peek([paper.id]).get(paper.id)
+    local = fetcher.mirror is not None
+    estimate = _estimate(seed, paper, params, deep_fetch, local)
+    planned, fits = params, estimate.within_budget
+    while not fits and settings.GRAPH_OVER_BUDGET == "downscale":
+        smaller = downscale(planned)
+        if smaller is None:
+            break
+        planned = smaller
+        fits = _estimate(seed, paper, planned, deep_fetch, local).within_budget
+    return GraphPlan(estimate=estimate, params=planned)
+
+
+def enforce_graph_budget(
+    paper: Paper, params: GraphParams, deep_fetch=settings.GRAPH_DEEP_FETCH
+) -> GraphParams:
+    """
+    Check a graph request against the request budget (see `plan_graph_service`).
+
+    Args:
+        paper (Paper): Input paper
+        params (GraphParams): The requested build parameters
+        deep_fetch (bool): Page through the citations/references of highly cited papers
+
+    Returns:
+        GraphParams: The parameters to build with, downscaled if necessary
+
+    Raises:
+        HTTPException: If the request is over budget and GRAPH_OVER_BUDGET is 'reject'
+    """
+    plan = plan_graph_service(paper, params, deep_fetch)
+    if not plan.estimate.within_budget and settings.GRAPH_OVER_BUDGET == "reject":
+        raise HTTPException(
+            status_code=422,
+            detail=(
+                f"Graph request exceeds the budget of {settings.GRAPH_REQUEST_BUDGET} "
+                f"upstream requests (estimated {plan.estimate.requests}); "
+                "lower depth or num_nodes"
+            ),
+        )
+    return plan.params
+
+
+def _enforce_seeds_budget(
+    papers: list[Paper],
+    params: GraphParams,
+    deep_fetch: bool,
+    snapshots: bool,
+    kind: str,
+) -> GraphParams:
+    """
+    Hold the builds of several seeds to the request budget as a whole (see
+    `enforce_batch_budget`).
+
+    Args:
+        papers (list[Paper]): Seed papers
+        params (GraphParams): The requested build parameters
+        deep_fetch (bool): Page through the citations/references of highly cited papers
+        snapshots (bool): Count seeds with a graph snapshot as free
+        kind (str): Name of the request in the error message
+
+    Returns:
+        GraphParams: The parameters to build every seed with
+
+    Raises:
+        HTTPException: If the seeds are over budget and GRAPH_OVER_BUDGET is 'reject'
+    """
+    seeds = list({paper.id: paper for paper in papers}.values())
+    fetcher = PaperBatchFetcher()
+    cached = fetcher.peek([paper.id for paper in seeds])
+    local = fetcher.mirror is not None
+
+    def total_requests(planned: GraphParams) -> int:
+        return sum(
+            _estimate(cached.get(paper.id), paper, planned, deep_fetch, local).requests
+            for paper in seeds
+            if not (
+                snapshots
+                and graph_snapshots.exists(snapshot_key(paper, planned, deep_fetch))
+            )
+        )
+
+    requests = total_requests(params)
+    if (
+        requests > settings.GRAPH_REQUEST_BUDGET
+        and settings.GRAPH_OVER_BUDGET == "reject"
+    ):
+        raise HTTPException(
+            status_code=422,
+            detail=(
+                f"{kind} exceeds the budget of {settings.GRAPH_REQUEST_BUDGET} "
+                f"upstream requests (estimated {requests} across {len(seeds)} seeds); "
+                "lower depth, num_nodes or the number of papers"
+            ),
+        )
+    planned = params
+    while requests > settings.GRAPH_REQUEST_BUDGET:
+        smaller = downscale(planned)
+        if smaller is None:
+            break
+        planned = smaller
+        requests = total_requests(planned)
+    return planned
+
+
+def enforce_batch_budget(
+    papers: list[Paper], params: GraphParams, deep_fetch=settings.GRAPH_DEEP_FETCH
+) -> GraphParams:
+    """
+    Check a batch graph request against the request budget. The batch is held
+    to the budget as a whole: the estimates of its seeds are added up (seeds
+    with a snapshot cost nothing), ignoring the fetches the seeds may share,
+    so the total errs on the expensive side. As for a single build, a batch
+    over budget is rejected or built with downscaled parameters for every
+    seed (see `plan_graph_service`).
+
+    Args:
+        papers (list[Paper]): Input papers
+        params (GraphParams): The requested build parameters
+        deep_fetch (bool): Page through the citations/references of highly cited papers
+
+    Returns:
+        GraphParams: The parameters to build every seed with
+
+    Raises:
+        HTTPException: If the batch is over budget and GRAPH_OVER_BUDGET is 'reject'
+    """
+    return _enforce_seeds_budget(
+        papers, params, deep_fetch, snapshots=True, kind="Batch graph request"
+    )
+
+
+def enforce_library_budget(
+    papers: list[Paper], depth: int, deep_fetch=settings.GRAPH_DEEP_FETCH
+) -> GraphParams:
+    """
+    Check a library graph build against the request budget. The library
+    papers are the seeds of one merged build, estimated as a batch (see
+    `enforce_batch_budget`), except that library builds have no snapshots.
+
+    Args:
+        papers (list[Paper]): The user's library papers
+        depth (int): The requested expansion depth
+        deep_fetch (bool): Page through the citations/references of highly cited papers
+
+    Returns:
+        GraphParams: The parameters (num_nodes and depth) to build the library with
+
+    Raises:
+        HTTPException: If the build is over budget and GRAPH_OVER_BUDGET is 'reject'
+    """
+    params = GraphParams(num_nodes=LIBRARY_NUM_NODES, depth=depth)
+    return _enforce_seeds_budget(
+        papers, params, deep_fetch, snapshots=False, kind="Library graph"
+    )
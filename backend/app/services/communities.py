@@ -0,0 +1,274 @@
+"""Community services collapsing large graphs into coarse, expandable views."""
+
+from typing import Literal
+
+import numpy as np
+import scipy.sparse as sp
+from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.schemas.graph import (
+    Community,
+    CommunityEdge,
+    CommunityGraph,
+    CommunityResponse,
+    DirectedGraph,
+    GraphResponse,
+    Position,
+)
+from app.schemas.papers import Paper
+from app.services.analytics import adjacency_matrix
+from app.services.graph import (
+    LIBRARY_NUM_NODES,
+    get_graph_service,
+    get_library_graph_service,
+)
+from app.utils.communities import louvain
+
+
+def detect_communities(graph: DirectedGraph) -> np.ndarray:
+    """
+    Assign every node of a graph to a community (see `louvain`), ignoring
+    edge directions.
+
+    Args:
+        graph (DirectedGraph): The graph
+
+    Returns:
+        np.ndarray: The community of each node, in node order, larger communities first
+    """
+    adjacency = adjacency_matrix(graph)
+    return louvain(adjacency + adjacency.T)
+
+
+def summarize_communities(
+    graph: DirectedGraph, max_communities=settings.GRAPH_MAX_COMMUNITIES
+) -> CommunityGraph:
+    """
+    Collapse each community of a graph into a single node. Beyond
+    max_communities, the smallest communities are merged into the last one.
+
+    Args:
+        graph (DirectedGraph): The graph
+        max_communities (int): Maximum number of communities
+
+    Returns:
+        CommunityGraph: The communities and the aggregated edges between them
+    """
+    detected = detect_communities(graph)
+    merged = len(detected) > 0 and detected.max() >= max_communities
+    labels = np.minimum(detected, max_communities - 1)
+    num_communities = int(labels.max()) + 1 if len(labels) else 0
+    citations = np.array(
+        [node.detail.citation_count or 0 for node in graph.nodes], dtype=np.int64
+    )
+    totals = np.bincount(labels, weights=citations, minlength=num_communities)
+    sizes = np.bincount(labels, minlength=num_communities)
+    placed = bool(graph.nodes) and all(
+        node.position is not None for node in graph.nodes
+    )
+    if placed:
+        positions = np.array(
+            [(node.position.x, node.position.y) for node in graph.nodes]
+        )
+        centroids = (
+            np.stack(
+                [
+                    np.bincount(
+                        labels, weights=positions[:, axis], minlength=num_communities
+                    )
+                    for axis in range(2)
+                ],
+                axis=1,
+            )
+            / np.maximum(sizes, 1)[:, None]
+        )
+    communities = []
+    for community in range(num_communities):
+        members = np.flatnonzero(labels == community)
+        representative = members[np.argmax(citations[members])]
+        communities.append(
+            Community(
+                id=community,
+                size=int(sizes[community]),
+                citation_count=int(totals[community]),
+                representative=graph.nodes[representative].detail,
+                in_library=any(graph.nodes[i].in_library for i in members),
+                merged=merged and community == max_communities - 1,
+                position=Position(
+                    x=round(float(centroids[community, 0]), 1),
+                    y=round(float(centroids[community, 1]), 1),
+                )
+                if placed
+                else None,
+            )
+        )
+    # Count the edges between each pair of distinct communities
+    adjacency = adjacency_matrix(graph).tocoo()
+    sources, targets = labels[adjacency.row], labels[adjacency.col]
+    between = sources != targets
+    weights = sp.coo_matrix(
+        (np.ones(between.sum()), (sources[between], targets[between])),
+        shape=(num_communities, num_communities),
+    )
+    # Converting to CSR sums the duplicate entries
+    weights = weights.tocsr().tocoo()
+    edges = [
+        CommunityEdge(source=source, target=target, weight=int(weight))
+        for source, target, weight in zip(
+            weights.row.tolist(), weights.col.tolist(), weights.data.tolist()
+        )
+    ]
+    return CommunityGraph(
+        communities=communities,
+        edges=edges,
+        num_nodes=len(graph.nodes),
+        num_edges=len(graph.edges),
+    )
+
+
+def community_subgraph(
+    graph: DirectedGraph,
+    community: int,
+    max_communities=settings.GRAPH_MAX_COMMUNITIES,
+    max_nodes=settings.GRAPH_VIEW_MAX_NODES,
+) -> DirectedGraph:
+    """
+    Expand a community of a graph (see `summarize_communities`) into its members.
+
+    Args:
+        graph (DirectedGraph): The graph
+        community (int): The community's id
+        max_communities (int): Maximum number of communities
+        max_nodes (int): Maximum number of members kept, most cited first
+
+    Returns:
+        DirectedGraph: The members and the edges between them
+
+    Raises:
+        HTTPException: If the graph has no such community
+    """
+    labels = np.minimum(detect_communities(graph), max_communities - 1)
+    members = np.flatnonzero(labels == community).tolist()
+    if not members:
+        raise HTTPException(status_code=404, detail="Community not found")
+    if len(members) > max_nodes:
+        members = sorted(
+            members,
+            key=lambda i: graph.nodes[i].detail.citation_count or 0,
+            reverse=True,
+        )[:max_nodes]
+        members.sort()
+    nodes = [graph.nodes[i] for i in members]
+    ids = {node.id for node in nodes}
+    return DirectedGraph(
+        nodes=nodes,
+        edges=[
+            edge for edge in graph.edges if edge.source in ids and edge.target in ids
+        ],
+        max_citations=max(
+            (node.detail.citation_count or 0 for node in nodes), default=0
+        ),
+    )
+
+
+def summarize_graphs(graphs: GraphResponse) -> CommunityResponse:
+    """Coarse community views of both graphs of a response."""
+    return CommunityResponse(
+        citation_graph=summarize_communities(graphs.citation_graph),
+        reference_graph=summarize_communities(graphs.reference_graph),
+    )
+
+
+async def get_graph_communities_service(
+    paper: Paper, **graph_params
+) -> CommunityResponse:
+    """
+    Build (or reuse) the graphs of a paper and collapse their communities.
+
+    Args:
+        paper (Paper): Input paper
+        **graph_params: The build parameters (see `get_graph_service`)
+
+    Returns:
+        CommunityResponse: The coarse community view of both graphs
+    """
+    graphs = await get_graph_service(paper, **graph_params)
+    # Community detection is CPU-bound, so keep it off the event loop
+    return await run_in_threadpool(summarize_graphs, graphs)
+
+
+async def get_community_service(
+    paper: Paper,
+    graph: Literal["citation", "reference"],
+    community: int,
+    **graph_params,
+) -> DirectedGraph:
+    """
+    Build (or reuse) the graphs of a paper and expand one of their communities.
+
+    Args:
+        paper (Paper): Input paper
+        graph (str): Either 'citation' or 'reference'
+        community (int): The community's id (see `get_graph_communities_service`)
+        **graph_params: The build parameters (see `get_graph_service`)
+
+    Returns:
+        DirectedGraph: The community's members and the edges between them
+    """
+    graphs = await get_graph_service(paper, **graph_params)
+    return await run_in_threadpool(
+        community_subgraph, getattr(graphs, f"{graph}_graph"), community
+    )
+
+
+async def get_library_communities_service(
+    papers: list[Paper], num_nodes=LIBRARY_NUM_NODES, depth=1, layout=False
+) -> CommunityResponse:
+    """
+    Build (or reuse) the merged graphs of a library and collapse their communities.
+
+    Args:
+        papers (list[Paper]): The library's papers
+        num_nodes (int): Number of nodes to keep per library paper
+        depth (int): Number of hops to expand the graphs from the library papers
+        layout (bool): Compute node positions with a force-directed layout
+
+    Returns:
+        CommunityResponse: The coarse community view of both graphs
+    """
+    graphs = await get_library_graph_service(
+        papers, num_nodes=num_nodes, depth=depth, layout=layout
+    )
+    return await run_in_threadpool(summarize_graphs, graphs)
+
+
+async def get_library_community_service(
+    papers: list[Paper],
+    graph: Literal["citation", "reference"],
+    community: int,
+    num_nodes=LIBRARY_NUM_NODES,
+    depth=1,
+    layout=False,
+) -> DirectedGraph:
+    """
+    Build (or reuse) the merged graphs of a library and expand one of their communities.
+
+    Args:
+        papers (list[Paper]): The library's papers
+        graph (str): Either 'citation' or 'reference'
+        community (int): The community's id (see `get_library_communities_service`)
+        num_nodes (int): Number of nodes to keep per library paper
+        depth (int): Number of hops to expand the graphs from the library papers
+        layout (bool): Compute node positions with a force-directed layout
+
+    Returns:
+        DirectedGraph: The community's members and the edges between them
+    """
+    graphs = await get_library_graph_service(
+        papers, num_nodes=num_nodes, depth=depth, layout=layout
+    )
+    return await run_in_threadpool(
+        community_subgraph, getattr(graphs, f"{graph}_graph"), community
+    )
@@ -1,20 +1,59 @@
 """Graph services to fetch, load and parse paper data to build citation and reference graphs."""
 
-import requests
+import asyncio
+import heapq
+import logging
 import time
-from math import ceil
+from abc import ABC, abstractmethod
+from collections.abc import AsyncIterable, AsyncIterator, Awaitable
+from functools import partial
+from hashlib import sha1
+from itertools import chain
 
+import httpx
+import ijson
 from fastapi import HTTPException
+from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
 
 from app.config import settings
+from app.database.graph_snapshots import graph_snapshots
+from app.database.mirror import PaperMirror, paper_mirror
+from app.database.paper_cache import PaperCache, paper_cache
+from app.semantic_scholar import semantic_scholar
 from app.schemas.papers import Paper
-from app.schemas.graph import Node, Edge, DirectedGraph, GraphResponse
-from app.utils.paper import parse_paper_detail
+from app.schemas.graph import (
+    DirectedGraph,
+    GraphDelta,
+    GraphLayout,
+    GraphResponse,
+    GraphSize,
+    GraphStreamError,
+    GraphSummary,
+)
+from app.utils.graph_core import GraphCore, top_cited
+from app.utils.json_stream import iter_json_array
+from app.utils.layout import has_layout, has_layout_json, layout_graphs
+from app.utils.paper import PaperColumns
+from app.utils.resilience import CircuitOpenError
+from app.utils.singleflight import SingleFlight
+
+
+logger = logging.getLogger(__name__)
+
+# Coalesce identical concurrent graph builds and upstream batch requests
+graph_flights = SingleFlight()
+batch_flights = SingleFlight()
+# Background snapshot refreshes, referenced until they finish
+background_tasks = set()
+# Nodes kept per paper when expanding a user's library
+LIBRARY_NUM_NODES = 10
 
 
 class PaperBatchFetcher:
     """
-    Fetches paper details in batches from the Semantic Scholar API.
+    Fetches paper details in batches from the Semantic Scholar API, or from
+    a local mirror when PAPER_DATA_SOURCE is 'mirror'.
 
     Attributes:
         FIELDS (list[str]): Miscellaneous fields including the paper's
@@ -27,6 +66,8 @@ class PaperBatchFetcher:
     """
 
     BASE_URL = f"{settings.SEMANTIC_SCHOLAR_API_URL}/paper/batch"
+    RELATION_URL = f"{settings.SEMANTIC_SCHOLAR_API_URL}/paper"
+    PAGE_SIZE = 1000
     FIELDS = [
         "externalIds",
         "title",
@@ -39,9 +80,15 @@ class PaperBatchFetcher:
         "openAccessPdf",
     ]
     TOP_LEVEL_FIELDS = ["citations", "references", "tldr"]
-    HEADERS = {"Content-Type": "application/json; charset=UTF-8"}
 
-    def __init__(self):
+    def __init__(
+        self,
+        cache: PaperCache | None = paper_cache,
+        mirror: PaperMirror | None = paper_mirror,
+    ):
+        # A local mirror replaces the API entirely, so there is nothing to cache
+        self.mirror = mirror
+        self.cache = cache if mirror is None else None
         self.all_fields = (
             self.FIELDS
             + self.TOP_LEVEL_FIELDS
@@ -55,6 +102,10 @@ class PaperBatchFetcher:
             + self.TOP_LEVEL_FIELDS
             + self._get_nested_fields(["references"])
         )
+        self.signatures = {
+            key: sha1(",".join(self._fields_for(key)).encode()).hexdigest()[:16]
+            for key in ("both", "citations", "references", "details", "none")
+        }
 
     @staticmethod
     def _get_nested_fields(keys_to_nest: list[str]) -> list[str]:
@@ -73,93 +124,510 @@ class PaperBatchFetcher:
             for field in PaperBatchFetcher.FIELDS
         ]
 
-    def fetch(self, paper_ids: list[str], key="both") -> dict:
+    def _fields_for(self, key: str) -> list[str]:
         """
-        Fetch details for a list of paper IDs (up to 50 at a time).
+        Select the fields to request for a fetch key.
 
         Args:
-            paper_ids (list[int]): List of paper ID's
-            key (str): Which data to fetch; must be either 'both', 'citations' or 'references'
+            key (str): Which data to fetch; must be one of 'both', 'citations',
+                'references', 'details' (metadata and TLDR) or 'none'
 
         Returns:
-            dict: The data for the list of papers, determined by the key
-
-        Raises:
-            HTTPException: Any error fetching paper data
+            list[str]: The Semantic Scholar fields for the key
         """
-        payload = {"ids": paper_ids}
         if key == "both":
-            fields = self.all_fields
+            return self.all_fields
         elif key == "citations":
-            fields = self.citation_fields
+            return self.citation_fields
         elif key == "references":
-            fields = self.reference_fields
+            return self.reference_fields
+        elif key == "details":
+            return self.FIELDS + ["tldr"]
         elif key == "none":
-            fields = self.FIELDS
-        else:
-            raise ValueError(
-                'Invalid fetch key: must be one of ["both", "citations", "references", "none"]'
+            return self.FIELDS
+        raise ValueError(
+            "Invalid fetch key: must be one of "
+            '["both", "citations", "references", "details", "none"]'
+        )
+
+    async def _lookup(self, paper_ids: list[str], key: str) -> dict[str, dict]:
+        """
+        Look up fresh cached payloads for a list of paper IDs, in a worker
+        thread so the SQLite read does not block the event loop.
+
+        Args:
+            paper_ids (list[str]): List of paper ID's
+            key (str): The fetch key
+
+        Returns:
+            dict[str, dict]: The cached payloads keyed by paper ID
+        """
+        if self.cache is None:
+            return {}
+        return await run_in_threadpool(
+            self.cache.get_many, paper_ids, key, self.signatures
+        )
+
+    def peek(self, paper_ids: list[str], key="both") -> dict[str, dict]:
+        """
+        Look up papers available locally (in the mirror or fresh in the
+        cache), without any upstream request. The lookup blocks, so async
+        callers run it in a worker thread (see `plan_graph_service`).
+
+        Args:
+            paper_ids (list[str]): List of paper ID's
+            key (str): Which data to look up (see `fetch`)
+
+        Returns:
+            dict[str, dict]: The local papers keyed by paper ID
+        """
+        if self.mirror is not None:
+            papers = self.mirror.get_papers(paper_ids, key)
+            return {
+                paper_id: paper
+                for paper_id, paper in zip(paper_ids, papers)
+                if paper is not None
+            }
+        if self.cache is None:
+            return {}
+        return self.cache.get_many(paper_ids, key, self.signatures)
+
+    async def _store(self, paper_ids: list[str], results: list[dict | None], key: str):
+        """
+        Store freshly fetched payloads in the cache, skipping unknown papers
+        (in a worker thread, see `_lookup`).
+
+        Args:
+            paper_ids (list[str]): The requested paper ID's
+            results (list[dict | None]): The upstream results, aligned with paper_ids
+            key (str): The fetch key
+        """
+        if self.cache is None:
+            return
+        papers = {
+            paper_id: paper
+            for paper_id, paper in zip(paper_ids, results)
+            if paper is not None
+        }
+        await run_in_threadpool(self.cache.set_many, papers, key, self.signatures[key])
+
+    async def _stale_fallback(self, paper_ids: list[str], key: str) -> dict[str, dict]:
+        """
+        Serve papers from the cache regardless of their age while the
+        Semantic Scholar circuit breaker is open.
+
+        Args:
+            paper_ids (list[str]): List of paper ID's
+            key (str): The fetch key
+
+        Returns:
+            dict[str, dict]: The cached payloads keyed by paper ID
+
+        Raises:
+            HTTPException: If any of the papers is not cached
+        """
+        stale = (
+            await run_in_threadpool(
+                self.cache.get_many, paper_ids, key, self.signatures, allow_stale=True
+            )
+            if self.cache is not None
+            else {}
+        )
+        if any(paper_id not in stale for paper_id in paper_ids):
+            raise HTTPException(
+                status_code=503,
+                detail="Semantic Scholar is temporarily unavailable",
             )
-        params = {"fields": ",".join(fields)}
+        return stale
+
+    async def _fetch_upstream(self, paper_ids: list[str], key: str) -> list[dict]:
+        """
+        Fetch a single batch from the Semantic Scholar API, bypassing the cache.
+
+        Args:
+            paper_ids (list[str]): List of paper ID's (at most 500)
+            key (str): The fetch key
+
+        Returns:
+            list[dict]: The upstream results, aligned with paper_ids (None for unknown papers)
+
+        Raises:
+            HTTPException: Any error fetching paper data
+        """
+        payload = {"ids": paper_ids}
+        params = {"fields": ",".join(self._fields_for(key))}
         try:
-            response = requests.post(
+            response = await semantic_scholar.post(
                 self.BASE_URL,
-                headers=self.HEADERS,
                 params=params,
                 json=payload,
                 timeout=30,
             )
             response.raise_for_status()
-            return response.json()
-        except requests.RequestException as e:
+            results = response.json()
+        except CircuitOpenError:
+            raise
+        except httpx.HTTPError as e:
             raise HTTPException(
                 status_code=500, detail=f"Error fetching paper data: {e}"
             )
+        await self._store(paper_ids, results, key)
+        return results
+
+    async def fetch(self, paper_ids: list[str], key="both") -> list[dict]:
+        """
+        Fetch details for a list of paper IDs (up to 50 at a time).
+        Cached papers are served locally; only the misses are requested upstream.
+        While the upstream circuit breaker is open, stale cached papers are
+        served instead.
+
+        Args:
+            paper_ids (list[str]): List of paper ID's
+            key (str): Which data to fetch; must be one of 'both', 'citations',
+                'references', 'details' (metadata and TLDR) or 'none'
+
+        Returns:
+            list[dict]: The data for the list of papers in input order, determined by the key
+
+        Raises:
+            HTTPException: Any error fetching paper data
+        """
+        return await self.fetch_batched(
+            paper_ids, batch_size=max(len(paper_ids), 1), key=key
+        )
 
-    def fetch_batched(
-        self, paper_ids: list[int], batch_size=50, key="both"
+    async def fetch_batched(
+        self, paper_ids: list[str], batch_size=50, key="both", refresh=False
     ) -> list[dict]:
         """
         Fetch details for a list of paper IDs in batches to avoid size limits.
-        Uses key='both' for fetch function.
+        The cache is consulted first, then the misses are batched and
+        dispatched concurrently over the shared Semantic Scholar client,
+        which bounds the number of requests in flight. Identical batches
+        already in flight for another caller are awaited instead of resent.
 
         Args:
-            paper_ids (list[int]): List of paper ID's
+            paper_ids (list[str]): List of paper ID's
             batch_size (int): Batch size to fetch a list of papers
+            key (str): Which data to fetch (see `fetch`)
+            refresh (bool): Skip the cache lookup (fetched papers are still cached)
 
         Returns:
-            list[dict]: The batched data for the list of papers.
+            list[dict]: The batched data for the list of papers, in input order.
 
         Raises:
             HTTPException: Any error fetching paper data
         """
-        results = []
-        num_batches = ceil(len(paper_ids) / batch_size)
-        for i in range(num_batches):
-            batch_ids = paper_ids[i * batch_size : (i + 1) * batch_size]
+        self._fields_for(key)  # validate the key before touching the cache
+        if self.mirror is not None:
+            # Mirror reads hit SQLite and memory-mapped arrays, so keep them off the loop
+            return await run_in_threadpool(self.mirror.get_papers, paper_ids, key)
+        papers = {} if refresh else await self._lookup(paper_ids, key)
+        # Sorted so that identical id sets map to identical in-flight batches
+        missing = sorted({paper_id for paper_id in paper_ids if paper_id not in papers})
+        batches = [
+            missing[i : i + batch_size] for i in range(0, len(missing), batch_size)
+        ]
+        try:
+            batch_results = await asyncio.gather(
+                *(
+                    batch_flights.do(
+                        ("batch", key, tuple(batch)),
+                        partial(self._fetch_upstream, batch, key),
+                    )
+                    for batch in batches
+                )
+            )
+        except CircuitOpenError:
+            papers.update(await self._stale_fallback(missing, key))
+            return [papers.get(paper_id) for paper_id in paper_ids]
+        except HTTPException as error:
+            raise HTTPException(status_code=500, detail=error.detail)
+        for batch, results in zip(batches, batch_results):
+            papers.update(zip(batch, results))
+        return [papers.get(paper_id) for paper_id in paper_ids]
+
+    async def _stream_upstream(
+        self, paper_ids: list[str], key: str
+    ) -> AsyncIterator[dict]:
+        """
+        Stream a single batch from the Semantic Scholar API, bypassing the cache.
+        Papers are parsed incrementally and cached as they arrive.
+
+        Args:
+            paper_ids (list[str]): List of paper ID's (at most 500)
+            key (str): The fetch key
+
+        Yields:
+            dict: Each known paper of the batch, in upstream order
+
+        Raises:
+            HTTPException: Any error fetching paper data
+        """
+        payload = {"ids": paper_ids}
+        params = {"fields": ",".join(self._fields_for(key))}
+        try:
+            async with semantic_scholar.stream(
+                "POST", self.BASE_URL, params=params, json=payload, timeout=30
+            ) as response:
+                response.raise_for_status()
+                position = 0
+                async for paper in iter_json_array(response):
+                    paper_id = paper_ids[position]
+                    position += 1
+                    if paper is None:
+                        continue
+                    await self._store([paper_id], [paper], key)
+                    yield paper
+        except CircuitOpenError:
+            raise
+        except (httpx.HTTPError, ijson.JSONError) as e:
+            raise HTTPException(
+                status_code=500, detail=f"Error fetching paper data: {e}"
+            )
+
+    async def iter_batched(
+        self, paper_ids: list[str], batch_size=50, key="both", refresh=False
+    ) -> AsyncIterator[dict]:
+        """
+        Stream details for a list of paper IDs, yielding papers as they arrive.
+
+        Each batch is served from the cache where possible and its misses are
+        streamed from upstream and parsed incrementally. Batches run
+        concurrently and feed a bounded queue, so at most about one batch worth
+        of papers is held in memory regardless of the number of ids. Papers are
+        yielded in arrival order and unknown papers are skipped. Unlike
+        `fetch_batched`, streamed batches are not coalesced with other callers.
+
+        Args:
+            paper_ids (list[str]): List of paper ID's
+            batch_size (int): Batch size to fetch a list of papers
+            key (str): Which data to fetch (see `fetch`)
+            refresh (bool): Skip the cache lookup (fetched papers are still cached)
+
+        Yields:
+            dict: The data for each paper, determined by the key
+
+        Raises:
+            HTTPException: Any error fetching paper data
+        """
+        self._fields_for(key)  # validate the key before touching the cache
+        unique_ids = list(dict.fromkeys(paper_ids))
+        batches = [
+            unique_ids[i : i + batch_size]
+            for i in range(0, len(unique_ids), batch_size)
+        ]
+        if self.mirror is not None:
+            for batch in batches:
+                papers = await run_in_threadpool(self.mirror.get_papers, batch, key)
+                for paper in papers:
+                    if paper is not None:
+                        yield paper
+            return
+        if not batches:
+            return
+        queue = asyncio.Queue(maxsize=batch_size)
+        done = object()
+
+        async def produce(batch: list[str]):
             try:
-                batch_results = self.fetch(batch_ids, key=key)
-                results.extend(batch_results)
-                time.sleep(1)
-            except HTTPException as error:
-                raise HTTPException(status_code=500, detail=error.detail)
-        return results
+                cached = {} if refresh else await self._lookup(batch, key)
+                missing = [paper_id for paper_id in batch if paper_id not in cached]
+                for paper_id in batch:
+                    if paper_id in cached:
+                        await queue.put(cached.pop(paper_id))
+                if missing:
+                    try:
+                        async for paper in self._stream_upstream(missing, key):
+                            await queue.put(paper)
+                    except CircuitOpenError:
+                        # Raised before anything was streamed for this batch
+                        stale = await self._stale_fallback(missing, key)
+                        for paper in stale.values():
+                            await queue.put(paper)
+            except Exception as error:
+                # Surface the failure to the consumer
+                await queue.put(error)
+            finally:
+                await queue.put(done)
+
+        producers = [asyncio.ensure_future(produce(batch)) for batch in batches]
+        try:
+            remaining = len(producers)
+            while remaining:
+                item = await queue.get()
+                if item is done:
+                    remaining -= 1
+                    continue
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            for producer in producers:
+                producer.cancel()
 
+    async def _fetch_relation_page(
+        self, paper_id: str, key: str, offset: int
+    ) -> list[dict]:
+        """
+        Fetch one page of a paper's citations or references.
 
-class BaseGraphBuilder:
+        Args:
+            paper_id (str): The paper's ID
+            key (str): Either 'citations' or 'references'
+            offset (int): Offset of the page
+
+        Returns:
+            list[dict]: The related papers on the page
+
+        Raises:
+            HTTPException: Any error fetching paper data
+        """
+        params = {
+            "fields": ",".join(self.FIELDS),
+            "offset": offset,
+            "limit": self.PAGE_SIZE,
+        }
+        try:
+            response = await semantic_scholar.get(
+                f"{self.RELATION_URL}/{paper_id}/{key}", params=params, timeout=30
+            )
+            response.raise_for_status()
+            page = response.json().get("data") or []
+        except CircuitOpenError:
+            raise HTTPException(
+                status_code=503, detail="Semantic Scholar is temporarily unavailable"
+            )
+        except httpx.HTTPError as e:
+            raise HTTPException(
+                status_code=500, detail=f"Error fetching paper data: {e}"
+            )
+        related_key = "citingPaper" if key == "citations" else "citedPaper"
+        return [item[related_key] for item in page if item.get(related_key)]
+
+    async def fetch_deep(
+        self,
+        paper_id: str,
+        total: int,
+        key: str,
+        top_k: int,
+        targets: dict[str, int] | None = None,
+        max_pages: int = settings.GRAPH_DEEP_FETCH_MAX_PAGES,
+    ) -> dict:
+        """
+        Fetch the top_k most cited citations (or references) of a single paper
+        by paging through its per-paper endpoint, for papers whose related
+        lists are too long for the batch endpoint.
+
+        Pages are requested in parallel waves while a running top-k (min-heap
+        by citation count) is maintained, so memory stays bounded by top_k and
+        one wave of pages. When `targets` (the papers already in the graph and
+        their citation counts) is given, paging stops early once the heap is
+        full and no unseen target is cited more than the current k-th paper:
+        the remaining pages can then no longer add a graph node to the top-k.
+
+        Args:
+            paper_id (str): The paper's ID
+            total (int): The paper's citation (or reference) count
+            key (str): Either 'citations' or 'references'
+            top_k (int): Number of most cited related papers to keep
+            targets (dict[str, int] | None): Citation counts of the papers of interest
+            max_pages (int): Maximum number of pages to request
+
+        Returns:
+            dict: A batch-style payload {"paperId", "tldr", key} with the top-k related papers
+
+        Raises:
+            HTTPException: Any error fetching paper data
+        """
+        if key not in ("citations", "references"):
+            raise ValueError(
+                'Invalid deep fetch key: must be "citations" or "references"'
+            )
+        if self.mirror is not None:
+            # The mirror holds complete neighbour lists, so the top-k is exact
+            [paper] = await run_in_threadpool(
+                self.mirror.get_papers, [paper_id], key, top_k=top_k
+            )
+            related = paper[key] if paper is not None else []
+            return {"paperId": paper_id, "tldr": None, key: related}
+        limit = min(total, max_pages * self.PAGE_SIZE)
+        offsets = list(range(0, limit, self.PAGE_SIZE))
+        unseen_targets = dict(targets or {})
+        unseen_targets.pop(paper_id, None)
+        heap = []  # (citation_count, paperId, paper), smallest first
+        wave_size = semantic_scholar.max_concurrency
+        for i in range(0, len(offsets), wave_size):
+            pages = await asyncio.gather(
+                *(
+                    self._fetch_relation_page(paper_id, key, offset)
+                    for offset in offsets[i : i + wave_size]
+                )
+            )
+            for related in (paper for page in pages for paper in page):
+                related_id = related.get("paperId")
+                if not related_id:
+                    continue
+                unseen_targets.pop(related_id, None)
+                entry = (related.get("citationCount") or 0, related_id, related)
+                if len(heap) < top_k:
+                    heapq.heappush(heap, entry)
+                elif entry[0] > heap[0][0]:
+                    heapq.heapreplace(heap, entry)
+            if (
+                targets is not None
+                and len(heap) >= top_k
+                and all(count <= heap[0][0] for count in unseen_targets.values())
+            ):
+                break
+        return {
+            "paperId": paper_id,
+            "tldr": None,
+            key: [paper for _, _, paper in sorted(heap, reverse=True)],
+        }
+
+
+class BaseGraphBuilder(ABC):
     """
     Base class for constructing directed graphs from paper data.
 
+    Nodes and edges live in a compact integer-indexed `GraphCore`, so
+    repeated passes over the same papers neither duplicate edges nor create
+    a pydantic model per node or edge; those are only built by
+    `build_graph_response`. Once the node or edge budget is spent, no more
+    nodes or edges are added.
+
     Attributes:
-        nodes (dict): assigns a paper's "paperId" str to a app.schemas.graph.Node object
-        edges (list): assigns edges as app.schemas.graph.Edge objects
+        core (GraphCore): The graph's nodes and deduplicated edges
+        max_nodes (int | None): Node budget of the graph (None for no limit)
+        max_edges (int | None): Edge budget of the graph (None for no limit)
+        RELATION (str): The nested list each paper contributes edges from
     """
 
-    def __init__(self):
-        self.nodes = {}
-        self.edges = []
+    RELATION = None
+
+    def __init__(self, max_nodes: int | None = None, max_edges: int | None = None):
+        self.core = GraphCore()
+        self.max_nodes = max_nodes
+        self.max_edges = max_edges
 
-    def add_node(self, paper_data: dict):
+    @classmethod
+    def from_graph(cls, graph: DirectedGraph, **budget) -> "BaseGraphBuilder":
+        """
+        Resume building from a graph built earlier.
+
+        Args:
+            graph (DirectedGraph): The graph to start from
+            **budget: The node and edge budget (see the class attributes)
+
+        Returns:
+            BaseGraphBuilder: A builder holding the graph
+        """
+        builder = cls(**budget)
+        builder.core = GraphCore.from_directed_graph(graph)
+        return builder
+
+    def add_node(self, paper_data: dict) -> int:
         """
         Add a node to the graph if it doesn’t already exist.
 
@@ -167,22 +635,13 @@ class BaseGraphBuilder:
             paper_data (dict): Data dictionary for a given paper
 
         Returns:
-            None
-
+            int: The node's index in the graph core
         """
-        paper_id = paper_data["paperId"]
-        if paper_id not in self.nodes:
-            self.nodes[paper_id] = Node(
-                id=paper_id, detail=Paper(**parse_paper_detail(paper_data))
-            )
-        elif not self.nodes[paper_id].detail.tldr and isinstance(
-            paper_data["tldr"], dict
-        ):
-            self.nodes[paper_id].detail.tldr = paper_data["tldr"]["text"]
+        return self.core.add_node(paper_data)
 
     def add_edge(self, source_id: str, target_id: str):
         """
-        Add an edge between two nodes
+        Add an edge between two nodes, unless it already exists
 
         Args:
             source_id (str): Source paper's ID
@@ -191,228 +650,1114 @@ class BaseGraphBuilder:
         Returns:
             None
         """
-        self.edges.append(Edge(source=source_id, target=target_id))
+        self.core.add_edge(self.core.index[source_id], self.core.index[target_id])
 
-    def build_graph_response(self) -> DirectedGraph:
+    def _node_room(self) -> int | None:
+        """Number of nodes that can still be added (None for no limit)."""
+        if self.max_nodes is None:
+            return None
+        return max(self.max_nodes - len(self.core), 0)
+
+    @abstractmethod
+    def _edge(self, paper: int, related: int) -> tuple[int, int]:
+        """The (source, target) edge between a paper and one of its related papers."""
+
+    def _connect(self, paper: int, related: int):
+        """Add the edge between a paper and a related paper, within the edge budget."""
+        if self.max_edges is None or self.core.num_edges < self.max_edges:
+            self.core.add_edge(*self._edge(paper, related))
+
+    def add_paper_and_edges(
+        self, source_paper: dict, include_new_nodes=True, num_nodes=-1
+    ):
         """
-        Build and return the graph.
+        Add a paper and the edges to its most cited related papers.
 
         Args:
+            source_paper (dict): Raw paper data including its `RELATION` list
+            include_new_nodes (bool): Boolean to include new nodes in the graph from the related papers
+            num_nodes (int): if -1 then add all related papers, otherwise the top num_nodes most cited
+
+        Returns:
             None
+        """
+        related_papers = top_cited(source_paper.get(self.RELATION) or [], num_nodes)
+        source = self.add_node(source_paper)
+        index = self.core.index
+        for related_paper in related_papers:
+            related_id = related_paper.get("paperId")
+            if not related_id:
+                continue
+            related = index.get(related_id)
+            if related is None:
+                if not include_new_nodes or self._node_room() == 0:
+                    continue
+                related = self.add_node(related_paper)
+            self._connect(source, related)
+
+    async def expand(
+        self, frontier: AsyncIterable[dict], num_nodes: int, level_width: int
+    ) -> list[str]:
+        """
+        Add one breadth-first level to the graph.
+
+        Each frontier paper proposes its top num_nodes most cited related
+        papers; of the proposals not yet in the graph, only the level_width
+        most cited (within the node budget) become new nodes. Edges are then
+        added from every frontier paper to each of its proposals in the graph.
+
+        Args:
+            frontier (AsyncIterable[dict]): Stream of the frontier papers' data
+            num_nodes (int): Number of related papers each frontier paper proposes
+            level_width (int): Maximum number of new nodes added by this level
 
         Returns:
-            DirectedGraph
+            list[str]: The paper IDs of the new nodes (the next frontier)
         """
-        return DirectedGraph(
-            nodes=list(self.nodes.values()),
-            edges=self.edges,
-            max_citations=self._max_citations(),
-        )
+        candidates = {}
+        links = []
+        async for paper in frontier:
+            source = self.add_node(paper)
+            for related in top_cited(paper.get(self.RELATION) or [], num_nodes):
+                related_id = related.get("paperId")
+                if not related_id:
+                    continue
+                links.append((source, related_id))
+                if related_id not in self.core and related_id not in candidates:
+                    candidates[related_id] = related
+        room = self._node_room()
+        width = level_width if room is None else min(level_width, room)
+        new_nodes = [
+            paper["paperId"] for paper in top_cited(list(candidates.values()), width)
+        ]
+        for paper_id in new_nodes:
+            self.add_node(candidates[paper_id])
+        index = self.core.index
+        for source, related_id in links:
+            if related_id in index:
+                self._connect(source, index[related_id])
+        return new_nodes
+
+    async def consume(
+        self, papers: AsyncIterable[dict], include_new_nodes=True, num_nodes=-1
+    ):
+        """
+        Add papers and their edges from a stream as they arrive, so each raw
+        paper payload can be released as soon as its nodes and edges are extracted.
+
+        Args:
+            papers (AsyncIterable[dict]): Stream of paper data dictionaries
+            include_new_nodes (bool): Boolean to include new nodes in the graph
+            num_nodes (int): if -1 then add all related papers, otherwise the top num_nodes most cited
 
-    def _max_citations(self) -> int:
+        Returns:
+            None
         """
-        Calculate the maximum citation count among all nodes.
+        async for paper in papers:
+            self.add_paper_and_edges(
+                paper, include_new_nodes=include_new_nodes, num_nodes=num_nodes
+            )
+
+    def build_graph_response(self) -> DirectedGraph:
+        """
+        Build and return the graph.
 
         Args:
             None
 
         Returns:
-            int
+            DirectedGraph
         """
-        return max(
-            (node.detail.citation_count for node in self.nodes.values()), default=0
-        )
+        return self.core.to_directed_graph()
 
 
 class CitationGraphBuilder(BaseGraphBuilder):
     """
-    Constructs a directed citation graph from paper data.
+    Constructs a directed citation graph from paper data, with edges from
+    each paper to the papers citing it.
     Inherits from BaseGraphBuilder.
 
     Attributes:
         (see BaseGraphBuilder)
     """
 
-    def add_paper_and_edges(
-        self, source_paper: Paper, include_new_nodes=True, num_nodes=-1
-    ):
-        """
-        Add a paper and its citation edges.
+    RELATION = "citations"
 
-        Args:
-            source_paper (Paper): input paper
-            include_new_nodes (bool): Boolean to include new nodes in the graph from the citations
-            num_nodes (int): if -1 then add all citations, otherwise add top num_nodes most cited papers
-
-        Returns:
-            None
-        """
-        # First create an ordered list of citations based on their "citationCount"
-        ordered_citations = [
-            citation_paper
-            for citation_paper in sorted(
-                source_paper.get("citations", []),
-                key=lambda item: item["citationCount"]
-                if item["citationCount"] is not None
-                else 0,
-                reverse=True,
-            )
-        ]
-        # Keep the top num_nodes most cited papers in the citations
-        if num_nodes != -1:
-            ordered_citations = ordered_citations[:num_nodes]
-        # Add original paper
-        self.add_node(source_paper)
-        source_id = source_paper["paperId"]
-        # Add citation papers
-        for citation_paper in ordered_citations:
-            citation_id = citation_paper.get("paperId")
-            if not citation_id:
-                continue
-            if citation_id in self.nodes:
-                self.add_edge(source_id, citation_id)
-            elif include_new_nodes:
-                self.add_node(citation_paper)
-                self.add_edge(source_id, citation_id)
+    def _edge(self, paper: int, related: int) -> tuple[int, int]:
+        return paper, related
 
 
 class ReferenceGraphBuilder(BaseGraphBuilder):
     """
-    Constructs a directed reference graph from paper data.
+    Constructs a directed reference graph from paper data, with edges from
+    each referenced paper to the paper referencing it.
+    Inherits from BaseGraphBuilder.
 
     Attributes:
         (see BaseGraphBuilder)
     """
 
-    def add_paper_and_edges(self, source_paper, include_new_nodes=True, num_nodes=-1):
-        """
-        Add a paper and its reference edges.
+    RELATION = "references"
 
-        Args:
-            source_paper (Paper): input paper
-            include_new_nodes (bool): Boolean to include new nodes in the graph from the references
-            num_nodes (int): if -1 then add all references, otherwise add top num_nodes most cited papers
-        """
-        # First create an ordered list of references based on their "citationCount"
-        ordered_references = [
-            reference_paper
-            for reference_paper in sorted(
-                source_paper.get("references", []),
-                key=lambda item: item["citationCount"]
-                if item["citationCount"] is not None
-                else 0,
-                reverse=True,
-            )
-        ]
-        # Keep the top num_nodes most cited papers in the references
-        if num_nodes != -1:
-            ordered_references = ordered_references[:num_nodes]
-        # Add original paper
-        self.add_node(source_paper)
-        source_id = source_paper["paperId"]
-        # Add reference papers
-        for reference_paper in ordered_references:
-            reference_id = reference_paper.get("paperId")
-            if not reference_id:
-                continue
-            if reference_id in self.nodes:
-                self.add_edge(reference_id, source_id)
-            elif include_new_nodes:
-                self.add_node(reference_paper)
-                self.add_edge(reference_id, source_id)
+    def _edge(self, paper: int, related: int) -> tuple[int, int]:
+        return related, paper
 
 
-def get_graph_service(paper: Paper, num_nodes=20) -> GraphResponse:
+async def get_graph_service(
+    paper: Paper,
+    num_nodes=20,
+    deep_fetch=settings.GRAPH_DEEP_FETCH,
+    depth=1,
+    layout=False,
+    max_citations=500,
+    max_references=500,
+) -> GraphResponse:
     """Fetch papers and build citation and reference graphs for the given user.
+    Concurrent requests for the same paper and parameters share one build.
+
+    Built graphs are stored as snapshots: repeat requests are answered from
+    the snapshot straight away, and snapshots older than
+    GRAPH_SNAPSHOT_REFRESH_INTERVAL are refreshed incrementally in the background.
+
     Args:
         paper (Paper): Input paper
         num_nodes (int): Number of papers (ordered by their number of citations) to keep
-                        in the citation graph of the input paper
+                        in the citation graph of each expanded paper
+        deep_fetch (bool): Page through the citations/references of highly cited
+                        papers instead of leaving them out of the second-level pass
+        depth (int): Number of hops to expand the graphs breadth-first from the input paper
+        layout (bool): Compute node positions with a force-directed layout; they are
+                        stored with the snapshot, so later requests reuse them
+        max_citations (int): Papers cited at least this often are deep fetched (or
+                        skipped) in the second-level pass instead of batch fetched
+        max_references (int): Papers with at least this many references are deep
+                        fetched (or skipped) in the second-level pass
 
     Returns:
         GraphResponse: Returns both citation and reference graphs as DirectedGraph objects
                         wrapped in a GraphResponse object
     """
+    limits = {"max_citations": max_citations, "max_references": max_references}
+    key = graph_snapshots.key(paper.id, num_nodes, deep_fetch, depth, *limits.values())
+    graphs = await get_snapshot(key, num_nodes, deep_fetch, **limits)
+    if graphs is None:
+        graphs = await graph_flights.do(
+            ("graph", key),
+            lambda: build_graph_snapshot(
+                key, paper, num_nodes, deep_fetch, depth, **limits
+            ),
+        )
+    if layout and not has_layout(graphs):
+        graphs = await graph_flights.do(
+            ("layout", key), lambda: layout_snapshot(key, graphs)
+        )
+    return graphs
+
+
+async def get_graph_json_service(
+    paper: Paper,
+    num_nodes=20,
+    deep_fetch=settings.GRAPH_DEEP_FETCH,
+    depth=1,
+    layout=False,
+    max_citations=500,
+    max_references=500,
+) -> str:
+    """
+    Same as `get_graph_service`, but returns the graphs as JSON. Snapshots are
+    stored as JSON, so a snapshot hit is served as stored, without parsing the
+    graphs into models and encoding them again.
+
+    Returns:
+        str: The GraphResponse, as JSON
+    """
+    limits = {"max_citations": max_citations, "max_references": max_references}
+    key = graph_snapshots.key(paper.id, num_nodes, deep_fetch, depth, *limits.values())
+    data = await get_snapshot_json(key, num_nodes, deep_fetch, **limits)
+    if data is not None and (not layout or has_layout_json(data)):
+        return data
+    graphs = await get_graph_service(
+        paper, num_nodes, deep_fetch, depth, layout, **limits
+    )
+    return graphs.model_dump_json()
+
+
+async def layout_snapshot(key: str, graphs: GraphResponse) -> GraphResponse:
+    """Compute the node positions of a snapshot's graphs and store them with it."""
+    # The layout is CPU-bound, so keep it off the event loop
+    graphs = await run_in_threadpool(layout_graphs, graphs)
+    await run_in_threadpool(graph_snapshots.update, key, graphs)
+    return graphs
+
+
+async def get_snapshot(
+    key: str, num_nodes: int, deep_fetch: bool, **limits
+) -> GraphResponse | None:
+    """
+    Look up a graph snapshot, scheduling a background refresh if it is stale.
+
+    Args:
+        key (str): The snapshot key
+        num_nodes (int): Number of most cited related papers considered per paper
+        deep_fetch (bool): Page through the related papers of highly cited papers
+        **limits: The deep fetch thresholds (see `connect_graphs`)
+
+    Returns:
+        GraphResponse | None: The snapshot, or None if there is none
+    """
+    data = await get_snapshot_json(key, num_nodes, deep_fetch, **limits)
+    if data is None:
+        return None
+    return GraphResponse.model_validate_json(data)
+
+
+async def get_snapshot_json(
+    key: str, num_nodes: int, deep_fetch: bool, **limits
+) -> str | None:
+    """
+    Look up a graph snapshot as its stored JSON, without parsing it, scheduling
+    a background refresh if it is stale (see `get_snapshot`).
+
+    Returns:
+        str | None: The snapshot's JSON, or None if there is none
+    """
+    snapshot = await run_in_threadpool(graph_snapshots.get_json, key)
+    if snapshot is None:
+        return None
+    data, refreshed_at = snapshot
+    if time.time() - refreshed_at > settings.GRAPH_SNAPSHOT_REFRESH_INTERVAL:
+        run_in_background(
+            graph_flights.do(
+                ("refresh", key),
+                lambda: refresh_graph(
+                    key,
+                    GraphResponse.model_validate_json(data),
+                    num_nodes,
+                    deep_fetch,
+                    **limits,
+                ),
+            )
+        )
+    return data
+
+
+def run_in_background(coroutine: Awaitable):
+    """
+    Run a coroutine as a background task, keeping a reference to it until it
+    finishes and logging its failure.
+
+    Args:
+        coroutine (Awaitable): The work to run
+    """
+    task = asyncio.ensure_future(coroutine)
+    background_tasks.add(task)
+    task.add_done_callback(_finish_background_task)
+
+
+def _finish_background_task(task: asyncio.Future):
+    """Release a finished background task and report its failure."""
+    background_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning("Background graph task failed: %r", task.exception())
+
 
+async def build_graph_snapshot(
+    key: str, paper: Paper, num_nodes: int, deep_fetch: bool, depth: int, **limits
+) -> GraphResponse:
+    """Build the graphs of a paper and store them as a snapshot."""
+    graphs = await build_graph(paper, num_nodes, deep_fetch, depth, **limits)
+    await run_in_threadpool(graph_snapshots.put, key, graphs)
+    return graphs
+
+
+async def refresh_graph(
+    key: str, graphs: GraphResponse, num_nodes: int, deep_fetch: bool, **limits
+) -> GraphResponse:
+    """
+    Incrementally refresh a graph snapshot.
+
+    Only the lightweight metadata of every node is re-fetched. Nodes whose
+    citation or reference count changed are re-expanded: new edges between
+    existing nodes are added, and the seed paper may also gain new most
+    cited neighbours (earlier ones are kept, so a refreshed graph can hold a
+    few more nodes than a fresh build until the snapshot expires).
+    Unchanged snapshots are only marked as refreshed. A snapshot with a
+    layout is laid out again starting from its node positions, so the
+    graph keeps its shape.
+
+    Args:
+        key (str): The snapshot key
+        graphs (GraphResponse): The snapshot
+        num_nodes (int): Number of most cited related papers considered per paper
+        deep_fetch (bool): Page through the related papers of highly cited papers
+        **limits: The deep fetch thresholds (see `connect_graphs`)
+
+    Returns:
+        GraphResponse: The refreshed graphs
+    """
     fetcher = PaperBatchFetcher()
-    citation_builder = CitationGraphBuilder()
-    reference_builder = ReferenceGraphBuilder()
-    # Initial batch fetch for input papers
-    initial_papers = fetcher.fetch([paper.id], key="both")
-
-    # Add to citation_builder the top num_nodes most cited papers that cite it
-    for paper in initial_papers:
-        citation_builder.add_paper_and_edges(
-            paper, include_new_nodes=True, num_nodes=num_nodes
+    budget = {
+        "max_nodes": settings.GRAPH_MAX_NODES,
+        "max_edges": settings.GRAPH_MAX_EDGES,
+    }
+    citation_builder = CitationGraphBuilder.from_graph(graphs.citation_graph, **budget)
+    reference_builder = ReferenceGraphBuilder.from_graph(
+        graphs.reference_graph, **budget
+    )
+    builders = (citation_builder, reference_builder)
+    paper_ids = sorted({*citation_builder.core.ids, *reference_builder.core.ids})
+    changed = set()
+    for paper_data in await fetcher.fetch_batched(paper_ids, key="none", refresh=True):
+        if paper_data is None:
+            continue
+        for builder in builders:
+            if builder.core.update_node(paper_data):
+                changed.add(paper_data["paperId"])
+    if not changed:
+        await run_in_threadpool(graph_snapshots.touch, key)
+        return graphs
+
+    # The seed paper is always the first node of both graphs
+    seed_id = citation_builder.core.ids[0]
+    if seed_id in changed:
+        [seed] = await fetcher.fetch_batched([seed_id], key="both", refresh=True)
+        for builder in builders:
+            if seed is not None:
+                builder.add_paper_and_edges(
+                    seed, include_new_nodes=True, num_nodes=num_nodes
+                )
+    await connect_graphs(
+        citation_builder,
+        reference_builder,
+        fetcher,
+        num_nodes,
+        deep_fetch,
+        only=changed,
+        refresh=True,
+        **limits,
+    )
+    refreshed = GraphResponse(
+        citation_graph=citation_builder.build_graph_response(),
+        reference_graph=reference_builder.build_graph_response(),
+    )
+    if has_layout(graphs):
+        refreshed = await run_in_threadpool(layout_graphs, refreshed, graphs)
+    await run_in_threadpool(graph_snapshots.put, key, refreshed)
+    return refreshed
+
+
+async def _iterate(papers: list[dict]) -> AsyncIterator[dict]:
+    """Stream already fetched papers like `PaperBatchFetcher.iter_batched`."""
+    for paper in papers:
+        yield paper
+
+
+async def expand_graph(
+    builder: BaseGraphBuilder,
+    fetcher: PaperBatchFetcher,
+    seeds: list[dict],
+    num_nodes: int,
+    depth: int,
+    level_width: int = settings.GRAPH_LEVEL_WIDTH,
+):
+    """
+    Expand a graph breadth-first from its seed papers, one level per hop.
+
+    Each frontier level is fetched as a single batched (and cached) wave and
+    pruned to the level_width most cited new papers; the builder's budget
+    bounds the graph overall.
+
+    Args:
+        builder (BaseGraphBuilder): The graph to expand
+        fetcher (PaperBatchFetcher): Fetcher for the frontier papers
+        seeds (list[dict]): The seed papers' data, including their related papers
+        num_nodes (int): Number of related papers each frontier paper proposes
+        depth (int): Number of hops to expand
+        level_width (int): Maximum number of new nodes per level
+    """
+    frontier = await builder.expand(_iterate(seeds), num_nodes, level_width)
+    await expand_levels(builder, fetcher, frontier, num_nodes, depth - 1, level_width)
+
+
+async def expand_levels(
+    builder: BaseGraphBuilder,
+    fetcher: PaperBatchFetcher,
+    frontier: list[str],
+    num_nodes: int,
+    levels: int,
+    level_width: int = settings.GRAPH_LEVEL_WIDTH,
+):
+    """
+    Continue a breadth-first expansion from a frontier of paper IDs (see `expand_graph`).
+
+    Args:
+        builder (BaseGraphBuilder): The graph to expand
+        fetcher (PaperBatchFetcher): Fetcher for the frontier papers
+        frontier (list[str]): Paper IDs of the nodes added by the previous level
+        num_nodes (int): Number of related papers each frontier paper proposes
+        levels (int): Number of further hops to expand
+        level_width (int): Maximum number of new nodes per level
+    """
+    for _ in range(levels):
+        if not frontier:
+            break
+        frontier = await builder.expand(
+            fetcher.iter_batched(frontier, key=builder.RELATION),
+            num_nodes,
+            level_width,
         )
-        reference_builder.add_paper_and_edges(
-            paper, include_new_nodes=True, num_nodes=num_nodes
+
+
+def new_builders() -> tuple[CitationGraphBuilder, ReferenceGraphBuilder]:
+    """Empty citation and reference graph builders with the configured budget."""
+    budget = {
+        "max_nodes": settings.GRAPH_MAX_NODES,
+        "max_edges": settings.GRAPH_MAX_EDGES,
+    }
+    return CitationGraphBuilder(**budget), ReferenceGraphBuilder(**budget)
+
+
+async def fetch_seed(fetcher: PaperBatchFetcher, paper: Paper) -> dict:
+    """
+    Fetch the input paper of a graph with both its citations and references.
+
+    Args:
+        fetcher (PaperBatchFetcher): The fetcher
+        paper (Paper): Input paper
+
+    Returns:
+        dict: The paper's data
+
+    Raises:
+        HTTPException: If the paper is not found, or any error fetching it
+    """
+    [seed] = await fetcher.fetch([paper.id], key="both")
+    if seed is None:
+        raise HTTPException(status_code=404, detail="Paper not found")
+    return seed
+
+
+async def build_graph(
+    paper: Paper,
+    num_nodes=20,
+    deep_fetch=settings.GRAPH_DEEP_FETCH,
+    depth=1,
+    max_citations=500,
+    max_references=500,
+) -> GraphResponse:
+    """Build citation and reference graphs for a paper (see `get_graph_service`)."""
+    fetcher = PaperBatchFetcher()
+    citation_builder, reference_builder = new_builders()
+    # Initial batch fetch for the input paper
+    seed = await fetch_seed(fetcher, paper)
+
+    # Expand both graphs from the input paper, one hop at a time
+    await asyncio.gather(
+        expand_graph(citation_builder, fetcher, [seed], num_nodes, depth),
+        expand_graph(reference_builder, fetcher, [seed], num_nodes, depth),
+    )
+    await connect_graphs(
+        citation_builder,
+        reference_builder,
+        fetcher,
+        num_nodes,
+        deep_fetch,
+        max_citations=max_citations,
+        max_references=max_references,
+    )
+    return GraphResponse(
+        citation_graph=citation_builder.build_graph_response(),
+        reference_graph=reference_builder.build_graph_response(),
+    )
+
+
+async def get_graph_batch_service(
+    papers: list[Paper],
+    num_nodes=20,
+    deep_fetch=settings.GRAPH_DEEP_FETCH,
+    depth=1,
+    layout=False,
+    max_citations=500,
+    max_references=500,
+) -> list[GraphResponse]:
+    """
+    Build the citation and reference graphs of several papers at once.
+
+    Seeds with a snapshot are answered from it (see `get_graph_service`).
+    The graphs of the other seeds are built together by `build_graph_batch`
+    from shared fetches, so papers close to several seeds are only fetched
+    once, and are then stored as snapshots like single builds.
+
+    Args:
+        papers (list[Paper]): Input papers
+        (the other arguments are those of `get_graph_service`)
+
+    Returns:
+        list[GraphResponse]: The graphs of each input paper, in input order
+    """
+    limits = {"max_citations": max_citations, "max_references": max_references}
+    seeds = list({paper.id: paper for paper in papers}.values())
+    keys = {
+        paper.id: graph_snapshots.key(
+            paper.id, num_nodes, deep_fetch, depth, *limits.values()
         )
+        for paper in seeds
+    }
+    results = {}
+    for paper in seeds:
+        graphs = await get_snapshot(keys[paper.id], num_nodes, deep_fetch, **limits)
+        if graphs is not None:
+            results[paper.id] = graphs
+    missing = [paper for paper in seeds if paper.id not in results]
+    if missing:
+        built = await build_graph_batch(missing, num_nodes, deep_fetch, depth, **limits)
+        for paper_id, graphs in built.items():
+            await run_in_threadpool(graph_snapshots.put, keys[paper_id], graphs)
+        results.update(built)
+    if layout:
+        unplaced = [
+            paper_id for paper_id, graphs in results.items() if not has_layout(graphs)
+        ]
+        placed = await asyncio.gather(
+            *(
+                graph_flights.do(
+                    ("layout", keys[paper_id]),
+                    partial(layout_snapshot, keys[paper_id], results[paper_id]),
+                )
+                for paper_id in unplaced
+            )
+        )
+        results.update(zip(unplaced, placed))
+    return [results[paper.id] for paper in papers]
+
+
+async def build_graph_batch(
+    papers: list[Paper],
+    num_nodes=20,
+    deep_fetch=settings.GRAPH_DEEP_FETCH,
+    depth=1,
+    max_citations=500,
+    max_references=500,
+) -> dict[str, GraphResponse]:
+    """
+    Build the citation and reference graphs of several papers from shared fetches.
 
-    # Second-level fetch to find connections between existing nodes
-    cited_papers_to_fetch = list(citation_builder.nodes.keys())
-    reference_papers_to_fetch = list(reference_builder.nodes.keys())
-
-    # Avoid fetching papers with too many citations or references
-    max_citations = 500
-    max_references = 500
-    cited_papers_to_fetch = [
-        paper_id
-        for paper_id in cited_papers_to_fetch
-        if citation_builder.nodes[paper_id].detail.citation_count < max_citations
+    All seeds are fetched in one batch, each breadth-first level fetches the
+    union of the seeds' frontiers once, and the second-level pass fetches
+    every paper once however many graphs it is a node of. Each seed still
+    gets the graphs a single build would give it.
+
+    Args:
+        papers (list[Paper]): Input papers, without duplicates
+        (the other arguments are those of `get_graph_service`)
+
+    Returns:
+        dict[str, GraphResponse]: The graphs of each input paper, by paper ID
+
+    Raises:
+        HTTPException: If any paper is not found, or any error fetching paper data
+    """
+    fetcher = PaperBatchFetcher()
+    seeds = await fetcher.fetch_batched([paper.id for paper in papers], key="both")
+    not_found = [paper.id for paper, seed in zip(papers, seeds) if seed is None]
+    if not_found:
+        raise HTTPException(
+            status_code=404, detail=f"Papers not found: {', '.join(not_found)}"
+        )
+    pairs = [new_builders() for _ in papers]
+    citation_builders = [citation_builder for citation_builder, _ in pairs]
+    reference_builders = [reference_builder for _, reference_builder in pairs]
+    await asyncio.gather(
+        expand_graphs(citation_builders, fetcher, seeds, num_nodes, depth),
+        expand_graphs(reference_builders, fetcher, seeds, num_nodes, depth),
+    )
+    await asyncio.gather(
+        connect_builders(
+            citation_builders, fetcher, num_nodes, deep_fetch, max_citations
+        ),
+        connect_builders(
+            reference_builders, fetcher, num_nodes, deep_fetch, max_references
+        ),
+    )
+    return {
+        paper.id: GraphResponse(
+            citation_graph=citation_builder.build_graph_response(),
+            reference_graph=reference_builder.build_graph_response(),
+        )
+        for paper, (citation_builder, reference_builder) in zip(papers, pairs)
+    }
+
+
+async def expand_graphs(
+    builders: list[BaseGraphBuilder],
+    fetcher: PaperBatchFetcher,
+    seeds: list[dict],
+    num_nodes: int,
+    depth: int,
+    level_width: int = settings.GRAPH_LEVEL_WIDTH,
+):
+    """
+    Expand graphs of the same kind breadth-first, each from its own seed paper
+    (see `expand_graph`). The frontiers of all graphs are fetched together,
+    one batched wave per level.
+
+    Args:
+        builders (list[BaseGraphBuilder]): The graphs to expand
+        fetcher (PaperBatchFetcher): Fetcher for the frontier papers
+        seeds (list[dict]): The seed paper's data of each graph
+        num_nodes (int): Number of related papers each frontier paper proposes
+        depth (int): Number of hops to expand
+        level_width (int): Maximum number of new nodes per graph and level
+    """
+    frontiers = [
+        await builder.expand(_iterate([seed]), num_nodes, level_width)
+        for builder, seed in zip(builders, seeds)
     ]
-    reference_papers_to_fetch = [
-        paper_id
-        for paper_id in reference_papers_to_fetch
-        if reference_builder.nodes[paper_id].detail.reference_count < max_references
+    for _ in range(depth - 1):
+        paper_ids = list(dict.fromkeys(chain.from_iterable(frontiers)))
+        if not paper_ids:
+            break
+        fetched = dict(
+            zip(
+                paper_ids,
+                await fetcher.fetch_batched(paper_ids, key=builders[0].RELATION),
+            )
+        )
+        frontiers = [
+            await builder.expand(
+                _iterate(
+                    [fetched[paper_id] for paper_id in frontier if fetched[paper_id]]
+                ),
+                num_nodes,
+                level_width,
+            )
+            for builder, frontier in zip(builders, frontiers)
+        ]
+
+
+async def connect_graphs(
+    citation_builder: CitationGraphBuilder,
+    reference_builder: ReferenceGraphBuilder,
+    fetcher: PaperBatchFetcher,
+    num_nodes: int,
+    deep_fetch: bool,
+    only: set[str] | None = None,
+    refresh=False,
+    max_citations=500,
+    max_references=500,
+):
+    """
+    Second-level fetch to find connections between the existing nodes of
+    both graphs (no new nodes are added).
+
+    Papers with too many citations or references for the batch endpoint's
+    nested lists are paged through individually (deep fetch), or skipped
+    when deep fetching is disabled.
+
+    Args:
+        citation_builder (CitationGraphBuilder): The citation graph
+        reference_builder (ReferenceGraphBuilder): The reference graph
+        fetcher (PaperBatchFetcher): Fetcher for the graphs' papers
+        num_nodes (int): Number of most cited related papers considered per paper
+        deep_fetch (bool): Page through the related papers of highly cited papers
+        only (set[str] | None): Only fetch these papers (default: every node)
+        refresh (bool): Bypass cached paper data
+        max_citations (int): Citation count from which a paper's citations are
+                        deep fetched instead of batch fetched
+        max_references (int): Reference count from which a paper's references are
+                        deep fetched instead of batch fetched
+    """
+    await asyncio.gather(
+        connect_builders(
+            [citation_builder],
+            fetcher,
+            num_nodes,
+            deep_fetch,
+            max_citations,
+            only=only,
+            refresh=refresh,
+        ),
+        connect_builders(
+            [reference_builder],
+            fetcher,
+            num_nodes,
+            deep_fetch,
+            max_references,
+            only=only,
+            refresh=refresh,
+        ),
+    )
+
+
+async def connect_builders(
+    builders: list[BaseGraphBuilder],
+    fetcher: PaperBatchFetcher,
+    num_nodes: int,
+    deep_fetch: bool,
+    limit: int,
+    only: set[str] | None = None,
+    refresh=False,
+):
+    """
+    Second-level pass over graphs of the same kind (see `connect_graphs`).
+
+    Papers that are nodes of several graphs are fetched once and their
+    related papers are added to each of these graphs.
+
+    Args:
+        builders (list[BaseGraphBuilder]): Citation graphs or reference graphs
+        fetcher (PaperBatchFetcher): Fetcher for the graphs' papers
+        num_nodes (int): Number of most cited related papers considered per paper
+        deep_fetch (bool): Page through the related papers of highly cited papers
+        limit (int): Citation (or reference) count from which a paper's related
+                     papers are deep fetched instead of batch fetched
+        only (set[str] | None): Only fetch these papers (default: every node)
+        refresh (bool): Bypass cached paper data
+    """
+    if not builders:
+        return
+    relation = builders[0].RELATION
+    count_field = "citation_count" if relation == "citations" else "reference_count"
+    owners = {}  # paper id -> builders holding the paper
+    counts = {}
+    # Related papers are ranked by citation count in both graphs
+    targets = {}
+    for builder in builders:
+        targets.update(builder.core.counts("citation_count"))
+        for paper_id, count in builder.core.counts(count_field).items():
+            if only is None or paper_id in only:
+                owners.setdefault(paper_id, []).append(builder)
+                counts[paper_id] = max(count, counts.get(paper_id, 0))
+    papers_to_fetch = [paper_id for paper_id, count in counts.items() if count < limit]
+    deep_fetches = [
+        fetcher.fetch_deep(paper_id, count, relation, num_nodes, targets=targets)
+        for paper_id, count in counts.items()
+        if deep_fetch and count >= limit
     ]
 
-    # Fetch additional papers if needed
-    if cited_papers_to_fetch:
-        citation_papers = fetcher.fetch_batched(cited_papers_to_fetch, key="citations")
-        for paper in citation_papers:
-            citation_builder.add_paper_and_edges(
+    def add(paper: dict):
+        for builder in owners.get(paper["paperId"], ()):
+            builder.add_paper_and_edges(
                 paper, include_new_nodes=False, num_nodes=num_nodes
             )
 
-    if reference_papers_to_fetch:
-        reference_papers = fetcher.fetch_batched(
-            reference_papers_to_fetch, key="references"
+    async def stream():
+        # Stream additional papers into the graphs as they arrive
+        async for paper in fetcher.iter_batched(
+            papers_to_fetch, key=relation, refresh=refresh
+        ):
+            add(paper)
+
+    _, deep_papers = await asyncio.gather(stream(), asyncio.gather(*deep_fetches))
+    for paper in deep_papers:
+        add(paper)
+
+
+async def open_graph_stream(
+    paper: Paper,
+    num_nodes=20,
+    deep_fetch=settings.GRAPH_DEEP_FETCH,
+    depth=1,
+    layout=False,
+    max_citations=500,
+    max_references=500,
+) -> AsyncIterator[str]:
+    """Start a streamed build of the citation and reference graphs of a paper.
+
+    The graphs are streamed as newline-delimited JSON frames: `GraphDelta`
+    frames with the nodes and edges added to either graph, then a final
+    `GraphSummary` frame (or a `GraphStreamError` frame if the build fails
+    after streaming began). The seed paper and its direct neighbours are
+    sent as soon as the seed paper is fetched; further levels and the edges
+    between existing nodes follow at most every GRAPH_STREAM_INTERVAL
+    seconds while their batches complete. With `layout`, the node positions
+    of each finished graph follow in a `GraphLayout` frame. Graphs with a
+    snapshot are sent whole, and a streamed build is stored as a snapshot
+    once it finishes.
+
+    The seed paper is fetched before this returns, so a missing paper is
+    still reported with a regular error response.
+
+    Args:
+        paper (Paper): Input paper
+        num_nodes (int): Number of papers (ordered by their number of citations) to keep
+                        in the citation graph of each expanded paper
+        deep_fetch (bool): Page through the citations/references of highly cited papers
+        depth (int): Number of hops to expand the graphs breadth-first from the input paper
+        layout (bool): Compute node positions (see `get_graph_service`)
+        max_citations (int): Deep fetch threshold (see `get_graph_service`)
+        max_references (int): Deep fetch threshold (see `get_graph_service`)
+
+    Returns:
+        AsyncIterator[str]: The NDJSON lines
+
+    Raises:
+        HTTPException: If the paper is not found, or any error fetching it
+    """
+    limits = {"max_citations": max_citations, "max_references": max_references}
+    key = graph_snapshots.key(paper.id, num_nodes, deep_fetch, depth, *limits.values())
+    graphs = await get_snapshot(key, num_nodes, deep_fetch, **limits)
+    if graphs is not None:
+        if layout and not has_layout(graphs):
+            graphs = await graph_flights.do(
+                ("layout", key), lambda: layout_snapshot(key, graphs)
+            )
+        return _stream_snapshot(graphs)
+    fetcher = PaperBatchFetcher()
+    seed = await fetch_seed(fetcher, paper)
+    return _stream_build(
+        key, fetcher, seed, num_nodes, deep_fetch, depth, layout, limits
+    )
+
+
+def _frame(model: BaseModel) -> str:
+    """Encode a stream frame as one NDJSON line."""
+    return model.model_dump_json() + "\n"
+
+
+def _size(graph: DirectedGraph) -> GraphSize:
+    """Size of a finished graph."""
+    return GraphSize(
+        nodes=len(graph.nodes),
+        edges=len(graph.edges),
+        max_citations=graph.max_citations,
+    )
+
+
+async def _stream_snapshot(graphs: GraphResponse) -> AsyncIterator[str]:
+    """Stream a snapshot as one delta per graph followed by the summary."""
+    for name in ("citation_graph", "reference_graph"):
+        graph = getattr(graphs, name)
+        yield _frame(
+            GraphDelta(
+                graph=name,
+                nodes=graph.nodes,
+                edges=graph.edges,
+                max_citations=graph.max_citations,
+            )
         )
-        for paper in reference_papers:
-            reference_builder.add_paper_and_edges(
-                paper, include_new_nodes=False, num_nodes=num_nodes
+    yield _frame(
+        GraphSummary(
+            citation_graph=_size(graphs.citation_graph),
+            reference_graph=_size(graphs.reference_graph),
+            cached=True,
+        )
+    )
+
+
+async def _stream_build(
+    key: str,
+    fetcher: PaperBatchFetcher,
+    seed: dict,
+    num_nodes: int,
+    deep_fetch: bool,
+    depth: int,
+    layout: bool,
+    limits: dict,
+) -> AsyncIterator[str]:
+    """Build the graphs of a fetched seed paper, streaming their growth (see `open_graph_stream`)."""
+    citation_builder, reference_builder = new_builders()
+    builders = {
+        "citation_graph": citation_builder,
+        "reference_graph": reference_builder,
+    }
+    # Nodes and edges of each graph already sent
+    sent = {name: (0, 0) for name in builders}
+
+    def deltas() -> list[str]:
+        frames = []
+        for name, builder in builders.items():
+            core = builder.core
+            node_start, edge_start = sent[name]
+            if node_start == len(core) and edge_start == core.num_edges:
+                continue
+            frames.append(
+                _frame(
+                    GraphDelta(
+                        graph=name,
+                        nodes=core.node_models(node_start),
+                        edges=core.edge_models(edge_start),
+                        max_citations=core.max_citations(),
+                    )
+                )
             )
+            sent[name] = (len(core), core.num_edges)
+        return frames
 
-    return GraphResponse(
+    # The first level only needs the seed paper, which is already fetched
+    frontiers = [
+        await builder.expand(_iterate([seed]), num_nodes, settings.GRAPH_LEVEL_WIDTH)
+        for builder in builders.values()
+    ]
+    for frame in deltas():
+        yield frame
+
+    async def grow():
+        await asyncio.gather(
+            *(
+                expand_levels(builder, fetcher, frontier, num_nodes, depth - 1)
+                for builder, frontier in zip(builders.values(), frontiers)
+            )
+        )
+        await connect_graphs(
+            citation_builder,
+            reference_builder,
+            fetcher,
+            num_nodes,
+            deep_fetch,
+            **limits,
+        )
+
+    task = asyncio.ensure_future(grow())
+    try:
+        while not task.done():
+            await asyncio.wait({task}, timeout=settings.GRAPH_STREAM_INTERVAL)
+            for frame in deltas():
+                yield frame
+        task.result()
+    except HTTPException as error:
+        yield _frame(
+            GraphStreamError(status_code=error.status_code, detail=error.detail)
+        )
+        return
+    finally:
+        # Stop building if the client went away
+        task.cancel()
+
+    graphs = GraphResponse(
         citation_graph=citation_builder.build_graph_response(),
         reference_graph=reference_builder.build_graph_response(),
     )
+    if layout:
+        graphs = await run_in_threadpool(layout_graphs, graphs)
+        for name in builders:
+            yield _frame(
+                GraphLayout(
+                    graph=name,
+                    positions={
+                        node.id: node.position for node in getattr(graphs, name).nodes
+                    },
+                )
+            )
+    await run_in_threadpool(graph_snapshots.put, key, graphs)
+    yield _frame(
+        GraphSummary(
+            citation_graph=_size(graphs.citation_graph),
+            reference_graph=_size(graphs.reference_graph),
+            cached=False,
+        )
+    )
 
 
-def get_references_service(papers: list[Paper]) -> list[Paper]:
-    """Get references for a list of papers."""
-    paper_ids = [paper.id for paper in papers]
+async def get_library_graph_service(
+    papers: list[Paper],
+    num_nodes=LIBRARY_NUM_NODES,
+    deep_fetch=settings.GRAPH_DEEP_FETCH,
+    depth=1,
+    layout=False,
+) -> GraphResponse:
+    """Build one merged citation and reference graph across a user's library.
+    Concurrent requests for the same library and parameters share one build.
+
+    Args:
+        papers (list[Paper]): The papers in the user's library
+        num_nodes (int): Number of papers (ordered by their number of citations) to keep
+                        per library paper
+        deep_fetch (bool): Page through the citations/references of highly cited papers
+        depth (int): Number of hops to expand the graphs from the library papers
+        layout (bool): Compute node positions with a force-directed layout
+
+    Returns:
+        GraphResponse: Both merged graphs, with library papers flagged `in_library`
+    """
+    paper_ids = sorted({paper.id for paper in papers})
+    graphs = await graph_flights.do(
+        ("library", tuple(paper_ids), num_nodes, deep_fetch, depth),
+        lambda: build_library_graph(paper_ids, num_nodes, deep_fetch, depth),
+    )
+    if layout:
+        graphs = await run_in_threadpool(layout_graphs, graphs)
+    return graphs
+
+
+async def build_library_graph(
+    paper_ids: list[str],
+    num_nodes=LIBRARY_NUM_NODES,
+    deep_fetch=settings.GRAPH_DEEP_FETCH,
+    depth=1,
+) -> GraphResponse:
+    """Build the merged library graphs (see `get_library_graph_service`)."""
     fetcher = PaperBatchFetcher()
-    results = fetcher.fetch_batched(paper_ids, key="references")
-    references = [
-        ref
-        for paper in results
-        for ref in paper.get("references", [])
-        if ref["paperId"]
+    citation_builder, reference_builder = new_builders()
+    # The whole library is fetched once, in batches
+    seeds = [
+        paper
+        for paper in await fetcher.fetch_batched(paper_ids, key="both")
+        if paper is not None
     ]
-    return [Paper(**parse_paper_detail(ref)) for ref in references]
 
+    # Expand both graphs from every library paper at once, so shared
+    # neighbours are fetched and added only once; all library papers are
+    # nodes, and their neighbours share the rest of the node budget
+    await asyncio.gather(
+        expand_graph(
+            citation_builder,
+            fetcher,
+            seeds,
+            num_nodes,
+            depth,
+            level_width=settings.GRAPH_MAX_NODES,
+        ),
+        expand_graph(
+            reference_builder,
+            fetcher,
+            seeds,
+            num_nodes,
+            depth,
+            level_width=settings.GRAPH_MAX_NODES,
+        ),
+    )
+    await connect_graphs(
+        citation_builder, reference_builder, fetcher, num_nodes, deep_fetch
+    )
+    for builder in (citation_builder, reference_builder):
+        for seed in seeds:
+            builder.core.in_library.add(builder.core.index[seed["paperId"]])
+    return GraphResponse(
+        citation_graph=citation_builder.build_graph_response(),
+        reference_graph=reference_builder.build_graph_response(),
+    )
 
-def get_citations_service(papers: list[Paper]) -> list[Paper]:
+
+async def get_references_service(papers: list[Paper]) -> list[Paper]:
     """Get references for a list of papers."""
-    paper_ids = [paper.id for paper in papers]
+    references = await fetch_related_papers(
+        [paper.id for paper in papers], "references"
+    )
+    return PaperColumns(references).to_papers()
+
+
+async def get_citations_service(papers: list[Paper]) -> list[Paper]:
+    """Get citations for a list of papers."""
+    citations = await fetch_related_papers([paper.id for paper in papers], "citations")
+    return PaperColumns(citations).to_papers()
+
+
+async def fetch_related_papers(paper_ids: list[str], relation: str) -> list[dict]:
+    """
+    Fetch the raw citations (or references) of a list of papers.
+
+    Args:
+        paper_ids (list[str]): IDs of the papers
+        relation (str): Either 'citations' or 'references'
+
+    Returns:
+        list[dict]: The related papers, paper by paper, with repeats
+    """
     fetcher = PaperBatchFetcher()
-    results = fetcher.fetch_batched(paper_ids, key="citations")
-    citations = [
-        citation
-        for paper in results
-        for citation in paper.get("citations", [])
-        if citation["paperId"]
+    return [
+        related
+        async for paper in fetcher.iter_batched(paper_ids, key=relation)
+        for related in paper.get(relation, [])
+        if related["paperId"]
     ]
-    return [Paper(**parse_paper_detail(citation)) for citation in citations]
@@ -1,21 +1,31 @@
 """Paper services for managing a user's paper library in Firestore."""
 
-import requests
-import time
+import httpx
 from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
 
 from app.database.firestore import db
-from app.schemas.papers import Paper
-from app.utils.paper import parse_paper_detail
+from app.database.mirror import paper_mirror
+from app.semantic_scholar import semantic_scholar
+from app.schemas.papers import Paper, PaperDetails
+from app.services.graph import PaperBatchFetcher
+from app.utils.paper import PAPER_LIST, parse_papers
+from app.utils.resilience import CircuitOpenError
+from app.utils.singleflight import SingleFlight
 from app.config import settings
 
 
-def search_papers_service(
+# Coalesce identical concurrent searches
+search_flights = SingleFlight()
+
+
+async def search_papers_service(
     query: str,
     limit: int = 5,
 ) -> list[Paper]:
     """
     Search for papers using the Semantic Scholar API.
+    Concurrent identical searches (ignoring case and whitespace) share one request.
 
     Args:
         query (str): The search query string
@@ -24,6 +34,19 @@ def search_papers_service(
     Returns:
         list[Paper]: List of Paper objects matching the search query
     """
+    normalized_query = " ".join(query.split()).lower()
+    return await search_flights.do(
+        ("search", normalized_query, limit),
+        lambda: fetch_search_results(normalized_query, limit),
+    )
+
+
+async def fetch_search_results(query: str, limit: int) -> list[Paper]:
+    """Query the Semantic Scholar search endpoint (see `search_papers_service`)."""
+    if paper_mirror is not None:
+        # Full-text search reads SQLite, so keep it off the event loop
+        papers = await run_in_threadpool(paper_mirror.search, query, limit)
+        return parse_papers(papers)
     base_url = f"{settings.SEMANTIC_SCHOLAR_API_URL}/paper/search"
     fields = [
         "paperId",
@@ -45,37 +68,51 @@ def search_papers_service(
         "fields": ",".join(fields),
     }
 
-    max_retries = 3
-    retry_delay = 1  # seconds
-
-    for attempt in range(max_retries):
-        try:
-            response = requests.get(base_url, params=params, timeout=10)
-
-            if response.status_code == 429:  # Rate limit exceeded
-                if attempt < max_retries - 1:
-                    time.sleep(retry_delay * (attempt + 1))  # Exponential backoff
-                    continue
-                else:
-                    raise HTTPException(
-                        status_code=429,
-                        detail="Semantic Scholar API rate limit exceeded. Please try again later.",
-                    )
-
-            response.raise_for_status()
-            data = response.json()
-            papers = []
-            for paper_data in data.get("data", []):
-                paper = Paper(**parse_paper_detail(paper_data))
-                papers.append(paper)
-            return papers
-
-        except requests.RequestException as e:
-            if attempt == max_retries - 1:
-                raise HTTPException(
-                    status_code=500, detail=f"Error searching papers: {e}"
-                )
-            time.sleep(retry_delay * (attempt + 1))
+    # Rate limiting and 429 retries are handled by the shared client
+    try:
+        response = await semantic_scholar.get(base_url, params=params, timeout=10)
+        if response.status_code == 429:  # Rate limit still exceeded after retries
+            raise HTTPException(
+                status_code=429,
+                detail="Semantic Scholar API rate limit exceeded. Please try again later.",
+            )
+        response.raise_for_status()
+    except CircuitOpenError as e:
+        raise HTTPException(
+            status_code=503,
+            detail="Semantic Scholar is temporarily unavailable",
+            headers={"Retry-After": str(e.retry_after)},
+        )
+    except httpx.HTTPError as e:
+        raise HTTPException(status_code=500, detail=f"Error searching papers: {e}")
+
+    data = response.json()
+    return parse_papers(data.get("data", []))
+
+
+async def get_paper_details_service(paper_ids: list[str]) -> list[PaperDetails]:
+    """
+    Get the long text fields (abstract and TLDR) of a list of papers, served
+    from the paper cache (or mirror) where possible and fetched in batches
+    otherwise.
+
+    Args:
+        paper_ids (list[str]): IDs of the papers
+
+    Returns:
+        list[PaperDetails]: The details of the papers found, in order
+    """
+    paper_ids = list(dict.fromkeys(paper_ids))
+    papers = await PaperBatchFetcher().fetch_batched(paper_ids, key="details")
+    return [
+        PaperDetails(
+            id=paper_id,
+            abstract=paper.get("abstract"),
+            tldr=(paper.get("tldr") or {}).get("text"),
+        )
+        for paper_id, paper in zip(paper_ids, papers)
+        if paper is not None
+    ]
 
 
 def get_paper_library_service(user_id: str) -> list[Paper]:
@@ -90,11 +127,7 @@ def get_paper_library_service(user_id: str) -> list[Paper]:
     """
     papers_ref = db.collection("users").document(user_id).collection("papers")
     papers = papers_ref.stream()
-    paper_list = []
-    for paper in papers:
-        paper_dict = paper.to_dict()
-        paper_list.append(Paper(**paper_dict))
-    return paper_list
+    return PAPER_LIST.validate_python([paper.to_dict() for paper in papers])
 
 
 def add_paper_to_library_service(user_id: str, paper: Paper) -> None:
@@ -0,0 +1,171 @@
+"""Shortest connecting paths between two papers over citations and references."""
+
+from collections.abc import Iterator
+from itertools import islice
+
+from fastapi import HTTPException
+
+from app.config import settings
+from app.schemas.graph import DirectedGraph
+from app.schemas.papers import Paper
+from app.services.graph import PaperBatchFetcher
+from app.utils.graph_core import GraphCore
+
+
+async def get_path_service(
+    source: Paper,
+    target: Paper,
+    depth=settings.GRAPH_PATH_MAX_DEPTH,
+    max_paths=10,
+) -> DirectedGraph:
+    """
+    Find the shortest paths connecting two papers, following citations and
+    references in either direction.
+
+    Args:
+        source (Paper): The paper to start from
+        target (Paper): The paper to connect to
+        depth (int): Maximum number of hops of a path
+        max_paths (int): Maximum number of shortest paths returned
+
+    Returns:
+        DirectedGraph: The papers and citation edges of the shortest paths,
+                       pointing from the cited to the citing paper
+
+    Raises:
+        HTTPException: If either paper is not found, or if no path is found
+                       within the depth and GRAPH_PATH_MAX_NODES budgets
+    """
+    fetcher = PaperBatchFetcher()
+    seeds = await fetcher.fetch_batched([source.id, target.id], key="both")
+    if any(seed is None for seed in seeds):
+        raise HTTPException(status_code=404, detail="Paper not found")
+    graph = await find_paths(
+        fetcher, *seeds, depth, settings.GRAPH_PATH_MAX_NODES, max_paths
+    )
+    if graph is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"No connection found within {depth} hops",
+        )
+    return graph
+
+
+async def find_paths(
+    fetcher: PaperBatchFetcher,
+    source: dict,
+    target: dict,
+    depth: int,
+    max_nodes: int,
+    max_paths: int,
+) -> DirectedGraph | None:
+    """
+    Bidirectional breadth-first search between two papers.
+
+    Both papers grow a search tree one level at a time, always expanding the
+    side with the smaller frontier, and each level is fetched as a single
+    batched (and cached) wave. The search stops at the first level where the
+    two trees meet: every meeting paper then lies on a shortest path, and
+    the shortest paths are read back through the parents of both trees.
+    Searching from both ends only fetches the papers within about half the
+    path length of either paper.
+
+    Args:
+        fetcher (PaperBatchFetcher): Fetcher for the frontier papers
+        source (dict): The first paper's data, including its related papers
+        target (dict): The second paper's data, including its related papers
+        depth (int): Maximum number of hops of a path
+        max_nodes (int): Maximum number of papers fetched by the search
+        max_paths (int): Maximum number of shortest paths returned
+
+    Returns:
+        DirectedGraph | None: The shortest paths, or None if none is found
+                              within the budgets
+    """
+    source_id, target_id = source["paperId"], target["paperId"]
+    papers = {source_id: source, target_id: target}
+    if source_id == target_id:
+        return _path_graph([[source_id]], papers, {})
+    # Parents of each paper reached by either search tree
+    parents = ({source_id: []}, {target_id: []})
+    frontiers = [[source_id], [target_id]]
+    # Data of the frontier papers when already known (the input papers)
+    known = ({source_id: source}, {target_id: target})
+    links = {}  # (paper, related) -> (cited, citing)
+    hops = fetched = 0
+    while hops < depth:
+        side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+        frontier = frontiers[side]
+        missing = [paper_id for paper_id in frontier if paper_id not in known[side]]
+        if not frontier or fetched + len(missing) > max_nodes:
+            return None
+        fetched += len(missing)
+        level_papers = [
+            known[side][paper_id] for paper_id in frontier if paper_id in known[side]
+        ]
+        level_papers += await fetcher.fetch_batched(missing, key="both")
+        known[side].clear()
+        reached = parents[side]
+        level = {}
+        for paper in level_papers:
+            if paper is None:
+                continue
+            paper_id = paper["paperId"]
+            for relation in ("citations", "references"):
+                for related in paper.get(relation) or []:
+                    related_id = related.get("paperId")
+                    if not related_id or related_id in reached:
+                        continue
+                    papers.setdefault(related_id, related)
+                    level.setdefault(related_id, []).append(paper_id)
+                    links[paper_id, related_id] = (
+                        (paper_id, related_id)
+                        if relation == "citations"
+                        else (related_id, paper_id)
+                    )
+        reached.update(level)
+        frontiers[side] = list(level)
+        hops += 1
+        meeting = [paper_id for paper_id in level if paper_id in parents[1 - side]]
+        if meeting:
+            paths = islice(_join_paths(meeting, *parents), max_paths)
+            return _path_graph(list(paths), papers, links)
+    return None
+
+
+def _walk(paper_id: str, parents: dict[str, list[str]]) -> Iterator[list[str]]:
+    """Every path from the root of a search tree down to one of its papers."""
+    if not parents[paper_id]:
+        yield [paper_id]
+        return
+    for parent in parents[paper_id]:
+        for path in _walk(parent, parents):
+            yield [*path, paper_id]
+
+
+def _join_paths(
+    meeting: list[str],
+    source_parents: dict[str, list[str]],
+    target_parents: dict[str, list[str]],
+) -> Iterator[list[str]]:
+    """Every source-to-target path through the papers where the search trees meet."""
+    for paper_id in meeting:
+        for head in _walk(paper_id, source_parents):
+            for tail in _walk(paper_id, target_parents):
+                yield head + tail[-2::-1]
+
+
+def _path_graph(
+    paths: list[list[str]],
+    papers: dict[str, dict],
+    links: dict[tuple[str, str], tuple[str, str]],
+) -> DirectedGraph:
+    """Build the graph of the papers and citations along some paths."""
+    core = GraphCore()
+    for path in paths:
+        for paper_id in path:
+            core.add_node(papers[paper_id])
+        for pair in zip(path, path[1:]):
+            cited, citing = links.get(pair) or links[pair[::-1]]
+            core.add_edge(core.index[cited], core.index[citing])
+    return core.to_directed_graph()
@@ -1,13 +1,18 @@
 """Recommended paper services for generating a user's recommended papers list based on a list of user input papers."""
 
+import asyncio
 import os
-import requests
+
+import httpx
 from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
 
 from app.config import settings
+from app.semantic_scholar import semantic_scholar
 from app.schemas.papers import Paper
-from app.utils.paper import parse_paper_detail
-from app.services.graph import get_references_service, get_citations_service
+from app.utils.paper import PaperColumns
+from app.utils.resilience import CircuitOpenError
+from app.services.graph import fetch_related_papers
 
 # from langchain_core.vectorstores import InMemoryVectorStore
 from langchain_core.documents import Document
@@ -17,7 +22,7 @@ from langchain.retrievers.contextual_compression import ContextualCompressionRet
 from langchain_community.document_compressors.rankllm_rerank import RankLLMRerank
 
 
-def get_paper_recommendations_service(user_papers: list[Paper]) -> list[Paper]:
+async def get_paper_recommendations_service(user_papers: list[Paper]) -> list[Paper]:
     """
     Generates a list of recommended papers based on an input list of user papers.
 
@@ -30,63 +35,71 @@ def get_paper_recommendations_service(user_papers: list[Paper]) -> list[Paper]:
     Raises:
         HTTPException: Raises any exception during recommendation fetching
     """
-    return get_custom_recommendations(user_papers)
+    return await get_custom_recommendations(user_papers)
 
 
-def get_semantic_scholar_recommendations(user_papers: list[Paper]):
+async def fetch_semantic_scholar_recommendations(user_papers: list[Paper]):
     paper_ids = [paper.id for paper in user_papers]
     payload = {"positivePaperIds": paper_ids, "negativePaperIds": []}
-    base_url = "https://api.semanticscholar.org/recommendations/v1/papers"
+    base_url = settings.SEMANTIC_SCHOLAR_RECOMMENDATIONS_URL
     fields = ["title", "authors", "year", "publicationDate", "url", "citationCount"]
     full_url = base_url + "?fields=" + ",".join(fields)
     try:
-        response = requests.post(
-            url=full_url,
-            headers={"content-type": "application/json; charset=UTF-8"},
-            json=payload,
-            timeout=10,
-        )
+        response = await semantic_scholar.post(full_url, json=payload, timeout=10)
         response.raise_for_status()
         response = response.json()
-        papers = response["recommendedPapers"]
-        return [Paper(**parse_paper_detail(paper)) for paper in papers]
-    except requests.RequestException as e:
+        return response["recommendedPapers"]
+    except CircuitOpenError as e:
+        raise HTTPException(
+            status_code=503,
+            detail="Semantic Scholar is temporarily unavailable",
+            headers={"Retry-After": str(e.retry_after)},
+        )
+    except httpx.HTTPError as e:
         raise HTTPException(
             status_code=500, detail=f"Error fetching recommendations: {e}"
         )
 
 
-def get_custom_recommendations(user_papers: list[Paper]):
+async def get_custom_recommendations(user_papers: list[Paper]):
+    # Generate candidate recommendations concurrently
+    user_paper_ids = [paper.id for paper in user_papers]
+    ss_recommendations, references, citations = await asyncio.gather(
+        fetch_semantic_scholar_recommendations(user_papers),
+        fetch_related_papers(user_paper_ids, "references"),
+        fetch_related_papers(user_paper_ids, "citations"),
+    )
+
+    # Combine all recommendations, parsing each candidate once and only
+    # building models for the ranked results
+    candidates = PaperColumns(unique=True, exclude=user_paper_ids)
+    for batch in (ss_recommendations, references, citations):
+        candidates.extend(batch)
+
+    # Embedding and reranking are blocking, so keep them off the event loop
+    return await run_in_threadpool(rank_recommendations, user_papers, candidates)
+
+
+def rank_recommendations(
+    user_papers: list[Paper], candidates: PaperColumns
+) -> list[Paper]:
     # Set the OPENAI_API_KEY environment variable
     # TODO: Find a better way to set the API key
     os.environ["OPENAI_API_KEY"] = settings.OPENAI_API_KEY
 
-    # Generate candidate recommendations
-    ss_recommendations = get_semantic_scholar_recommendations(user_papers)
-    references = get_references_service(user_papers)
-    citations = get_citations_service(user_papers)
-
-    # Combine all recommendations
-    seen = set()
-    user_paper_ids = set(paper.id for paper in user_papers)
-    all_recommendations = []
-    for paper in [*ss_recommendations, *references, *citations]:
-        if paper.id not in user_paper_ids and paper.id not in seen:
-            all_recommendations.append(paper)
-            seen.add(paper.id)
-    papers_dict = {paper.id: paper for paper in all_recommendations}
-
     # Create a vector store
     embedding = OpenAIEmbeddings(model="text-embedding-3-large")
     documents = [
         Document(
-            page_content=" ".join([paper.title or "", paper.abstract or ""]),
-            metadata={
-                "paper_id": paper.id,
-                "citations": paper.citation_count,
-            },
+            page_content=" ".join([title or "", abstract or ""]),
+            metadata={"paper_id": paper_id, "citations": citation_count},
+        )
+        for paper_id, title, abstract, citation_count in zip(
+            candidates["id"],
+            candidates["title"],
+            candidates["abstract"],
+            candidates["citation_count"],
         )
-        for paper in all_recommendations
     ]
 
     # Create a retriever
@@ -115,4 +128,6 @@ def get_custom_recommendations(user_papers: list[Paper]):
     results = compression_retriever.get_relevant_documents(summary.content)
 
     # Return the top 10 results
-    return [papers_dict[paper.metadata["paper_id"]] for paper in results]
+    return candidates.to_papers(
+        candidates.index[paper.metadata["paper_id"]] for paper in results
+    )
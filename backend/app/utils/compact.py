@@ -0,0 +1,122 @@
+"""Compact MessagePack encoding of graph responses."""
+
+import msgpack
+
+from app.schemas.graph import DirectedGraph, GraphResponse
+from app.schemas.papers import Paper
+from app.utils.paper import HEAVY_FIELDS
+
+MEDIA_TYPE = "application/x-msgpack"
+# Paper fields of each row of the shared paper table, in order
+PAPER_FIELDS = [field for field in Paper.model_fields if field != "id"]
+
+
+def encode_graphs(graphs: GraphResponse, slim=False) -> bytes:
+    """
+    Encode a graph response as MessagePack.
+
+    Papers are stored once in a shared table, as rows of values in
+    `PAPER_FIELDS` order aligned with a table of ids, so papers in both
+    graphs are sent once. Each graph then refers to the table by row number
+    and stores its edges as two integer lists of positions in its node list:
+
+        {"fields", "ids", "papers",
+         "citation_graph": {"nodes", "sources", "targets", "in_library",
+                            "positions", "max_citations", "analytics"},
+         "reference_graph": {...}}
+
+    `in_library` lists the node positions of library papers, `positions` is
+    a flat [x0, y0, x1, y1, ...] list (or None without a layout) and
+    `analytics` is the plain per-node analytics (or None).
+
+    Args:
+        graphs (GraphResponse): Citation and reference graphs
+        slim (bool): Leave the abstracts and TLDRs out of the paper table
+
+    Returns:
+        bytes: The encoded graphs
+    """
+    fields = [field for field in PAPER_FIELDS if not (slim and field in HEAVY_FIELDS)]
+    ids = []
+    papers = []
+    rows = {}  # paper id -> row numbers in the table
+
+    def intern(detail: Paper, paper_id: str) -> int:
+        values = [getattr(detail, field) for field in fields]
+        for row in rows.get(paper_id, ()):
+            if papers[row] == values:
+                return row
+        rows.setdefault(paper_id, []).append(len(ids))
+        ids.append(paper_id)
+        papers.append(values)
+        return len(ids) - 1
+
+    def encode_graph(graph: DirectedGraph) -> dict:
+        position = {node.id: i for i, node in enumerate(graph.nodes)}
+        placed = all(node.position is not None for node in graph.nodes)
+        return {
+            "nodes": [intern(node.detail, node.id) for node in graph.nodes],
+            "sources": [position[edge.source] for edge in graph.edges],
+            "targets": [position[edge.target] for edge in graph.edges],
+            "in_library": [i for i, node in enumerate(graph.nodes) if node.in_library],
+            "positions": [
+                coordinate
+                for node in graph.nodes
+                for coordinate in (node.position.x, node.position.y)
+            ]
+            if placed
+            else None,
+            "max_citations": graph.max_citations,
+            "analytics": [scores.model_dump() for scores in graph.analytics]
+            if graph.analytics is not None
+            else None,
+        }
+
+    encoded = {
+        "citation_graph": encode_graph(graphs.citation_graph),
+        "reference_graph": encode_graph(graphs.reference_graph),
+    }
+    return msgpack.packb({"fields": fields, "ids": ids, "papers": papers, **encoded})
+
+
+def decode_graphs(payload: bytes) -> GraphResponse:
+    """
+    Decode a graph response encoded by `encode_graphs`.
+
+    Args:
+        payload (bytes): The encoded graphs
+
+    Returns:
+        GraphResponse: The graphs
+    """
+    data = msgpack.unpackb(payload)
+    fields, ids, papers = data["fields"], data["ids"], data["papers"]
+
+    def decode_graph(graph: dict) -> dict:
+        in_library = set(graph["in_library"])
+        positions = graph["positions"]
+        nodes = [
+            {
+                "id": ids[row],
+                "detail": {"id": ids[row], **dict(zip(fields, papers[row]))},
+                "in_library": i in in_library,
+                "position": {"x": positions[2 * i], "y": positions[2 * i + 1]}
+                if positions is not None
+                else None,
+            }
+            for i, row in enumerate(graph["nodes"])
+        ]
+        return {
+            "nodes": nodes,
+            "edges": [
+                {"source": nodes[source]["id"], "target": nodes[target]["id"]}
+                for source, target in zip(graph["sources"], graph["targets"])
+            ],
+            "max_citations": graph["max_citations"],
+            "analytics": graph["analytics"],
+        }
+
+    return GraphResponse(
+        citation_graph=decode_graph(data["citation_graph"]),
+        reference_graph=decode_graph(data["reference_graph"]),
+    )
@@ -0,0 +1,260 @@
+"""Compact integer-indexed storage for citation and reference graphs."""
+
+import heapq
+from array import array
+
+import numpy as np
+from pydantic import TypeAdapter
+
+from app.schemas.graph import DirectedGraph, Edge, Node
+from app.utils.paper import parse_paper_detail
+
+# Validating whole lists in one pydantic-core call is much cheaper than
+# constructing the models one by one from Python
+NODE_LIST = TypeAdapter(list[Node])
+EDGE_LIST = TypeAdapter(list[Edge])
+
+
+def citation_count(paper: dict) -> int:
+    """Citation count of a raw Semantic Scholar paper (0 if unknown)."""
+    return paper.get("citationCount") or 0
+
+
+def top_cited(papers: list[dict], num_nodes: int = -1) -> list[dict]:
+    """
+    Select the most cited papers, most cited first.
+
+    Args:
+        papers (list[dict]): Raw Semantic Scholar papers
+        num_nodes (int): Number of papers to keep, or -1 to keep all of them
+
+    Returns:
+        list[dict]: The selected papers
+    """
+    if num_nodes == -1:
+        return sorted(papers, key=citation_count, reverse=True)
+    return heapq.nlargest(num_nodes, papers, key=citation_count)
+
+
+class GraphCore:
+    """
+    Array-backed directed graph keyed by interned integer node indices.
+
+    Paper IDs are interned to consecutive integers on first sight. Node
+    details are kept as plain parsed dicts and edges as two parallel integer
+    arrays, deduplicated through a set of packed (source, target) keys.
+    Pydantic models are only created by `to_directed_graph`, at the response
+    boundary.
+
+    Attributes:
+        ids (list[str]): Paper ID of each node index
+        index (dict[str, int]): Node index of each paper ID
+        details (list[dict]): Parsed paper details of each node index
+        citation_counts (array): Citation count of each node index
+        reference_counts (array): Reference count of each node index
+        sources (array): Source node index of each edge
+        targets (array): Target node index of each edge
+        in_library (set[int]): Node indices of papers in the user's library
+    """
+
+    def __init__(self):
+        self.ids = []
+        self.index = {}
+        self.details = []
+        self.citation_counts = array("q")
+        self.reference_counts = array("q")
+        self.sources = array("q")
+        self.targets = array("q")
+        self.in_library = set()
+        self._edge_keys = set()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, paper_id: str) -> bool:
+        return paper_id in self.index
+
+    @property
+    def num_edges(self) -> int:
+        return len(self.sources)
+
+    @classmethod
+    def from_directed_graph(cls, graph: DirectedGraph) -> "GraphCore":
+        """
+        Load a graph back from its response model.
+
+        Args:
+            graph (DirectedGraph): A graph built earlier
+
+        Returns:
+            GraphCore: The equivalent graph core
+        """
+        core = cls()
+        for node in graph.nodes:
+            idx = core._intern(node.id, node.detail.model_dump())
+            if node.in_library:
+                core.in_library.add(idx)
+        index = core.index
+        for edge in graph.edges:
+            core.add_edge(index[edge.source], index[edge.target])
+        return core
+
+    def _intern(self, paper_id: str, detail: dict) -> int:
+        """Append a new node with its parsed details and return its index."""
+        idx = len(self.ids)
+        self.index[paper_id] = idx
+        self.ids.append(paper_id)
+        self.details.append(detail)
+        self.citation_counts.append(detail["citation_count"] or 0)
+        self.reference_counts.append(detail["reference_count"] or 0)
+        return idx
+
+    def add_node(self, paper_data: dict) -> int:
+        """
+        Add a node for a raw Semantic Scholar paper if it doesn't already exist.
+        A TLDR missing from an existing node is filled in from the new data.
+
+        Args:
+            paper_data (dict): Raw paper data
+
+        Returns:
+            int: The node index
+        """
+        paper_id = paper_data["paperId"]
+        idx = self.index.get(paper_id)
+        if idx is None:
+            idx = self._intern(paper_id, parse_paper_detail(paper_data))
+        elif not self.details[idx]["tldr"] and isinstance(paper_data.get("tldr"), dict):
+            self.details[idx]["tldr"] = paper_data["tldr"]["text"]
+        return idx
+
+    def update_node(self, paper_data: dict) -> bool:
+        """
+        Replace the details of an existing node with fresher paper data,
+        keeping its TLDR if the new data has none.
+
+        Args:
+            paper_data (dict): Raw paper data
+
+        Returns:
+            bool: Whether the node exists and its citation or reference count changed
+        """
+        idx = self.index.get(paper_data["paperId"])
+        if idx is None:
+            return False
+        detail = parse_paper_detail(paper_data)
+        detail["tldr"] = detail["tldr"] or self.details[idx]["tldr"]
+        self.details[idx] = detail
+        counts = (detail["citation_count"] or 0, detail["reference_count"] or 0)
+        changed = counts != (self.citation_counts[idx], self.reference_counts[idx])
+        self.citation_counts[idx], self.reference_counts[idx] = counts
+        return changed
+
+    def add_edge(self, source: int, target: int) -> bool:
+        """
+        Add an edge between two node indices unless it already exists.
+
+        Args:
+            source (int): Source node index
+            target (int): Target node index
+
+        Returns:
+            bool: Whether the edge was added
+        """
+        key = (source << 32) | target
+        if key in self._edge_keys:
+            return False
+        self._edge_keys.add(key)
+        self.sources.append(source)
+        self.targets.append(target)
+        return True
+
+    def counts(self, field: str = "citation_count") -> dict[str, int]:
+        """
+        Citation (or reference) count of every node, keyed by paper ID.
+
+        Args:
+            field (str): Either 'citation_count' or 'reference_count'
+
+        Returns:
+            dict[str, int]: The counts
+        """
+        values = (
+            self.citation_counts if field == "citation_count" else self.reference_counts
+        )
+        return dict(zip(self.ids, values))
+
+    def max_citations(self) -> int:
+        """Maximum citation count among all nodes."""
+        return max(self.citation_counts, default=0)
+
+    def to_csr(self, reverse: bool = False) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Adjacency of the graph in compressed sparse row form.
+
+        Args:
+            reverse (bool): Index edges by their target instead of their source
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: Offsets (one per node, plus one) and
+                the neighbour index of each edge, grouped by owner node
+        """
+        owners = np.frombuffer(self.targets if reverse else self.sources, np.int64)
+        neighbours = np.frombuffer(self.sources if reverse else self.targets, np.int64)
+        order = np.argsort(owners, kind="stable")
+        offsets = np.zeros(len(self.ids) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(owners, minlength=len(self.ids)), out=offsets[1:])
+        return offsets, neighbours[order]
+
+    def node_models(self, start: int = 0) -> list[Node]:
+        """
+        Response models of the nodes from a node index onwards.
+
+        Args:
+            start (int): Index of the first node
+
+        Returns:
+            list[Node]: The nodes, in index order
+        """
+        ids, details, in_library = self.ids, self.details, self.in_library
+        return NODE_LIST.validate_python(
+            [
+                {
+                    "id": ids[idx],
+                    "detail": details[idx],
+                    "in_library": idx in in_library,
+                }
+                for idx in range(start, len(ids))
+            ]
+        )
+
+    def edge_models(self, start: int = 0) -> list[Edge]:
+        """
+        Response models of the edges from an edge position onwards.
+
+        Args:
+            start (int): Position of the first edge
+
+        Returns:
+            list[Edge]: The edges, in insertion order
+        """
+        ids = self.ids
+        return EDGE_LIST.validate_python(
+            [
+                {"source": ids[source], "target": ids[target]}
+                for source, target in zip(self.sources[start:], self.targets[start:])
+            ]
+        )
+
+    def to_directed_graph(self) -> DirectedGraph:
+        """
+        Convert the graph to its response model.
+
+        Returns:
+            DirectedGraph
+        """
+        return DirectedGraph(
+            nodes=self.node_models(),
+            edges=self.edge_models(),
+            max_citations=self.max_citations(),
+        )
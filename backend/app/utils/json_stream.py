@@ -0,0 +1,55 @@
+"""Incremental parsing of JSON array responses."""
+
+from collections.abc import AsyncIterator
+
+import httpx
+import ijson
+
+
+class _ResponseReader:
+    """
+    File-like adapter exposing an httpx response body to ijson's async API.
+
+    Attributes:
+        response (httpx.Response): A streamed response with an unread body
+    """
+
+    def __init__(self, response: httpx.Response):
+        self.response = response
+        self._chunks = response.aiter_bytes()
+        self._buffer = b""
+
+    async def read(self, size: int = -1) -> bytes:
+        """
+        Read up to `size` bytes of the body (b"" once it is exhausted).
+
+        Args:
+            size (int): Maximum number of bytes to return (-1 for the next chunk)
+
+        Returns:
+            bytes: The next part of the body
+        """
+        if not self._buffer:
+            self._buffer = await anext(self._chunks, b"")
+        if size < 0:
+            size = len(self._buffer)
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+
+async def iter_json_array(response: httpx.Response) -> AsyncIterator:
+    """
+    Yield the items of a top-level JSON array one at a time while the
+    response body is still being received, so only one item is held in
+    memory at once.
+
+    Args:
+        response (httpx.Response): A streamed response whose body is a JSON array
+
+    Yields:
+        Any: Each decoded array item (None for null items)
+    """
+    async for item in ijson.items_async(
+        _ResponseReader(response), "item", use_float=True
+    ):
+        yield item
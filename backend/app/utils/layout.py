@@ -0,0 +1,208 @@
+"""Vectorized force-directed layouts of citation and reference graphs."""
+
+import numpy as np
+
+from app.schemas.graph import DirectedGraph, GraphResponse, Position
+
+# Strength of the pull of every node towards the centre of the layout
+GRAVITY = 1.0
+
+
+def force_layout(
+    num_nodes: int,
+    sources: np.ndarray,
+    targets: np.ndarray,
+    initial: np.ndarray | None = None,
+    iterations: int = 100,
+    seed: int = 0,
+) -> np.ndarray:
+    """
+    Fruchterman-Reingold force-directed layout.
+
+    All pairwise repulsions of an iteration are computed at once as (n x n)
+    arrays and the edge attractions are scattered back with `np.bincount`,
+    which stays fast for graphs within the node budget (a few hundred
+    nodes). Nodes with a known position in `initial` start there and the
+    layout is only gently adjusted, so a graph that gained a few nodes keeps
+    its shape; the remaining nodes start next to their placed neighbours.
+
+    Args:
+        num_nodes (int): Number of nodes
+        sources (np.ndarray): Source node index of each edge
+        targets (np.ndarray): Target node index of each edge
+        initial (np.ndarray | None): (n x 2) starting positions, NaN where unknown
+        iterations (int): Number of iterations
+        seed (int): Seed of the random starting positions
+
+    Returns:
+        np.ndarray: The (n x 2) node positions, spanning about a unit box
+    """
+    if num_nodes == 0:
+        return np.zeros((0, 2))
+    sources = np.asarray(sources, dtype=np.int64)
+    targets = np.asarray(targets, dtype=np.int64)
+    rng = np.random.default_rng(seed)
+    positions = rng.uniform(-0.5, 0.5, (num_nodes, 2))
+    # Maximum step of each node, cooling down over the iterations
+    temperature = np.full(num_nodes, 0.1)
+    known = np.zeros(num_nodes, dtype=bool)
+    if initial is not None:
+        known = ~np.isnan(initial).any(axis=1)
+        if known.any():
+            positions[known] = initial[known]
+            positions[~known] = _near_neighbours(
+                positions, known, sources, targets, rng
+            )
+            # Settle the new nodes in while barely moving the placed ones
+            temperature[known] = 0.001
+    k = np.sqrt(1.0 / num_nodes)  # optimal distance between nodes
+    cooling = temperature / (iterations + 1)
+    for _ in range(iterations):
+        # Repulsion k^2 / d between every pair of nodes, in single precision
+        # since it dominates the cost
+        single = positions.astype(np.float32)
+        dx = single[:, 0, None] - single[None, :, 0]
+        dy = single[:, 1, None] - single[None, :, 1]
+        repulsion = np.float32(k * k) / np.maximum(dx * dx + dy * dy, np.float32(1e-8))
+        displacement = np.stack(
+            [(dx * repulsion).sum(axis=1), (dy * repulsion).sum(axis=1)], axis=1
+        )
+        # Attraction d^2 / k along every edge
+        edge_delta = positions[sources] - positions[targets]
+        pull = edge_delta * (np.linalg.norm(edge_delta, axis=1) / k)[:, None]
+        for axis in range(2):
+            displacement[:, axis] -= np.bincount(
+                sources, weights=pull[:, axis], minlength=num_nodes
+            )
+            displacement[:, axis] += np.bincount(
+                targets, weights=pull[:, axis], minlength=num_nodes
+            )
+        # Gravity keeps disconnected nodes from drifting away
+        displacement -= GRAVITY * positions
+        # Move each node along its displacement, by at most the temperature
+        length = np.maximum(np.linalg.norm(displacement, axis=1), 1e-9)
+        step = np.minimum(length, temperature) / length
+        positions += displacement * step[:, None]
+        temperature -= cooling
+    if not known.any():
+        positions -= positions.mean(axis=0)
+    return positions
+
+
+def _near_neighbours(
+    positions: np.ndarray,
+    known: np.ndarray,
+    sources: np.ndarray,
+    targets: np.ndarray,
+    rng: np.random.Generator,
+) -> np.ndarray:
+    """Starting positions of the unplaced nodes, next to the centroid of their placed neighbours."""
+    num_nodes = len(positions)
+    # Edges from a placed node to an unplaced one, in both directions
+    placed = np.concatenate([sources, targets])
+    other = np.concatenate([targets, sources])
+    mask = known[placed] & ~known[other]
+    counts = np.bincount(other[mask], minlength=num_nodes)
+    centroids = np.stack(
+        [
+            np.bincount(
+                other[mask], weights=positions[placed[mask], axis], minlength=num_nodes
+            )
+            for axis in range(2)
+        ],
+        axis=1,
+    )
+    unplaced = ~known
+    starts = np.where(
+        (counts > 0)[:, None],
+        centroids / np.maximum(counts, 1)[:, None],
+        positions.mean(axis=0) if known.any() else 0.0,
+    )[unplaced]
+    return starts + rng.normal(0, 0.02, starts.shape)
+
+
+def layout_graph(
+    graph: DirectedGraph, previous: DirectedGraph | None = None, scale=100.0
+) -> DirectedGraph:
+    """
+    Compute the node positions of a graph.
+
+    Args:
+        graph (DirectedGraph): The graph
+        previous (DirectedGraph | None): An earlier layout of the graph to start from
+        scale (float): Average spacing between nodes, in pixels
+
+    Returns:
+        DirectedGraph: A copy of the graph with `position` set on every node
+    """
+    index = {node.id: i for i, node in enumerate(graph.nodes)}
+    sources = np.fromiter((index[edge.source] for edge in graph.edges), np.int64)
+    targets = np.fromiter((index[edge.target] for edge in graph.edges), np.int64)
+    initial = None
+    if previous is not None:
+        placed = {
+            node.id: (node.position.x, node.position.y)
+            for node in previous.nodes
+            if node.position is not None
+        }
+        initial = np.array(
+            [placed.get(node.id, (np.nan, np.nan)) for node in graph.nodes],
+            dtype=float,
+        ).reshape(-1, 2)
+        # Positions are stored in pixels, the layout works within a unit box
+        initial /= _extent(previous, scale)
+    positions = force_layout(len(graph.nodes), sources, targets, initial) * _extent(
+        graph, scale
+    )
+    return graph.model_copy(
+        update={
+            "nodes": [
+                node.model_copy(
+                    update={"position": Position(x=round(x, 1), y=round(y, 1))}
+                )
+                for node, (x, y) in zip(graph.nodes, positions.tolist())
+            ]
+        }
+    )
+
+
+def _extent(graph: DirectedGraph, scale: float) -> float:
+    """Side length of the square a graph's layout spans, in pixels."""
+    return scale * np.sqrt(max(len(graph.nodes), 1))
+
+
+def has_layout(graphs: GraphResponse) -> bool:
+    """Whether every node of both graphs has a position."""
+    return all(
+        node.position is not None
+        for graph in (graphs.citation_graph, graphs.reference_graph)
+        for node in graph.nodes
+    )
+
+
+def has_layout_json(data: str) -> bool:
+    """Same as `has_layout`, for graphs encoded as JSON by pydantic."""
+    return '"position":null' not in data
+
+
+def layout_graphs(
+    graphs: GraphResponse, previous: GraphResponse | None = None
+) -> GraphResponse:
+    """
+    Compute the node positions of both graphs of a response.
+
+    Args:
+        graphs (GraphResponse): Citation and reference graphs
+        previous (GraphResponse | None): An earlier layout of the graphs to start from
+
+    Returns:
+        GraphResponse: Copies of the graphs with node positions set
+    """
+    return GraphResponse(
+        citation_graph=layout_graph(
+            graphs.citation_graph, previous and previous.citation_graph
+        ),
+        reference_graph=layout_graph(
+            graphs.reference_graph, previous and previous.reference_graph
+        ),
+    )
@@ -0,0 +1,58 @@
+"""Normalized graph responses, sharing one paper table between both graphs."""
+
+from app.schemas.graph import (
+    DirectedGraph,
+    GraphNode,
+    GraphResponse,
+    NormalizedGraph,
+    NormalizedGraphResponse,
+)
+from app.schemas.papers import Paper
+from app.utils.paper import strip_heavy_fields
+
+
+def normalize_graphs(graphs: GraphResponse, slim=False) -> NormalizedGraphResponse:
+    """
+    Move the papers of both graphs of a response into a single shared table,
+    leaving the graphs with the ids of their nodes only.
+
+    A paper in both graphs is stored once. Should its two copies differ, the
+    copy of the citation graph is kept, unless only the other one has a TLDR
+    (a paper's TLDR is only fetched where it is expanded).
+
+    Args:
+        graphs (GraphResponse): Citation and reference graphs
+        slim (bool): Leave out the abstracts and TLDRs of the papers
+
+    Returns:
+        NormalizedGraphResponse: The paper table and the normalized graphs
+    """
+    papers: dict[str, Paper] = {}
+
+    def normalize(graph: DirectedGraph) -> NormalizedGraph:
+        for node in graph.nodes:
+            paper = papers.get(node.id)
+            if paper is None or (paper.tldr is None and node.detail.tldr is not None):
+                papers[node.id] = node.detail
+        return NormalizedGraph(
+            nodes=[
+                GraphNode(
+                    id=node.id, in_library=node.in_library, position=node.position
+                )
+                for node in graph.nodes
+            ],
+            edges=graph.edges,
+            max_citations=graph.max_citations,
+            analytics=graph.analytics,
+        )
+
+    citation_graph = normalize(graphs.citation_graph)
+    reference_graph = normalize(graphs.reference_graph)
+    if slim:
+        papers = dict(zip(papers, strip_heavy_fields(list(papers.values()))))
+    return NormalizedGraphResponse(
+        papers=papers,
+        citation_graph=citation_graph,
+        reference_graph=reference_graph,
+        slim=slim,
+    )
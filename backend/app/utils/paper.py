@@ -1,5 +1,16 @@
 """Utility functions for handling paper data."""
 
+from collections.abc import Iterable
+
+from pydantic import TypeAdapter
+
+from app.schemas.papers import Paper
+
+# Validates a whole list of papers in a single pydantic-core call
+PAPER_LIST = TypeAdapter(list[Paper])
+# Long text fields of a paper, left out of slim payloads
+HEAVY_FIELDS = ("abstract", "tldr")
+
 
 def parse_paper_detail(paper: dict) -> dict:
     """
@@ -41,7 +52,7 @@ def parse_paper_detail(paper: dict) -> dict:
 
     return {
         "id": paper_id,
-        "title": paper.get("title", ""),
+        "title": paper.get("title") or "",
         "doi": doi,
         "arxiv": arxiv,
         "authors": authors,
@@ -55,3 +66,198 @@ def parse_paper_detail(paper: dict) -> dict:
         "publication_date": paper.get("publicationDate"),
         "url": paper.get("url"),  # For recommendations API
     }
+
+
+def strip_heavy_fields(papers: list[Paper]) -> list[Paper]:
+    """
+    Copies of papers without their long text fields (see `HEAVY_FIELDS`),
+    for light payloads.
+
+    Args:
+        papers (list[Paper]): The papers
+
+    Returns:
+        list[Paper]: The papers, their abstracts and TLDRs left out
+    """
+    omitted = dict.fromkeys(HEAVY_FIELDS)
+    return [paper.model_copy(update=omitted) for paper in papers]
+
+
+def parse_papers(papers: Iterable[dict]) -> list[Paper]:
+    """
+    Parse raw Semantic Scholar papers into Paper models, validating them in
+    bulk rather than constructing each model separately.
+
+    Args:
+        papers (Iterable[dict]): Raw paper data from Semantic Scholar API
+
+    Returns:
+        list[Paper]: The parsed papers
+    """
+    return PAPER_LIST.validate_python([parse_paper_detail(paper) for paper in papers])
+
+
+class PaperColumns:
+    """
+    Column-oriented batch of parsed papers.
+
+    Whole Semantic Scholar batch responses are parsed field by field into
+    parallel lists, one pass per field, instead of into one standardized
+    dict per paper (see `parse_paper_detail`). Author names and venues,
+    which repeat a lot among related papers, are interned so that every
+    occurrence shares a single string. Rows (and Paper models) are only
+    materialized at the response boundary, in bulk.
+
+    Attributes:
+        columns (dict[str, list]): Values of each Paper field, in paper order
+        index (dict[str, int]): Position of each paper ID
+        unique (bool): Whether papers whose ID was already parsed are skipped
+        excluded (set[str]): IDs of papers that are skipped
+    """
+
+    FIELDS = (
+        "id",
+        "title",
+        "doi",
+        "arxiv",
+        "authors",
+        "abstract",
+        "year",
+        "publication_date",
+        "reference_count",
+        "citation_count",
+        "journal",
+        "open_access_url",
+        "tldr",
+    )
+
+    def __init__(self, papers: Iterable[dict] = (), unique=False, exclude=()):
+        """
+        Args:
+            papers (Iterable[dict]): Raw paper data from Semantic Scholar API
+            unique (bool): Skip papers whose ID was already parsed
+            exclude (Iterable[str]): IDs of papers to skip
+        """
+        self.columns = {field: [] for field in self.FIELDS}
+        self.index = {}
+        self.unique = unique
+        self.excluded = set(exclude)
+        self._strings = {}
+        self.extend(papers)
+
+    def __len__(self) -> int:
+        return len(self.columns["id"])
+
+    def __contains__(self, paper_id: str) -> bool:
+        return paper_id in self.index
+
+    def __getitem__(self, field: str) -> list:
+        return self.columns[field]
+
+    def extend(self, papers: Iterable[dict]):
+        """
+        Parse a batch of raw papers and append them.
+
+        Args:
+            papers (Iterable[dict]): Raw paper data from Semantic Scholar API
+        """
+        papers = list(papers)
+        external_ids = [paper.get("externalIds") or _EMPTY for paper in papers]
+        ids = [
+            paper.get("paperId") or external.get("DOI")
+            for paper, external in zip(papers, external_ids)
+        ]
+        if self.unique or self.excluded:
+            keep = self._keep(ids)
+            papers = [papers[i] for i in keep]
+            external_ids = [external_ids[i] for i in keep]
+            ids = [ids[i] for i in keep]
+        start = len(self)
+        for offset, paper_id in enumerate(ids):
+            self.index.setdefault(paper_id, start + offset)
+        intern = self._strings.setdefault
+        columns = self.columns
+        columns["id"] += ids
+        columns["title"] += [paper.get("title") or "" for paper in papers]
+        columns["doi"] += [external.get("DOI") for external in external_ids]
+        columns["arxiv"] += [external.get("ArXiv") for external in external_ids]
+        columns["authors"] += [
+            [intern(name, name) for name in _names(paper.get("authors"))]
+            for paper in papers
+        ]
+        columns["journal"] += [
+            None if venue is None else intern(venue, venue)
+            for venue in _names(
+                [paper.get("publicationVenue") for paper in papers], default=None
+            )
+        ]
+        columns["open_access_url"] += [
+            (paper.get("openAccessPdf") or _EMPTY).get("url") for paper in papers
+        ]
+        columns["tldr"] += [
+            (paper.get("tldr") or _EMPTY).get("text") for paper in papers
+        ]
+        for field, key in _RAW_FIELDS.items():
+            columns[field] += [paper.get(key) for paper in papers]
+
+    def _keep(self, ids: list[str]) -> list[int]:
+        """Positions of the new papers that are neither excluded nor repeated."""
+        seen = set(self.index) if self.unique else set()
+        seen |= self.excluded
+        keep = []
+        for i, paper_id in enumerate(ids):
+            if paper_id not in seen:
+                keep.append(i)
+                if self.unique:
+                    seen.add(paper_id)
+        return keep
+
+    def rows(self, positions: Iterable[int] | None = None) -> list[dict]:
+        """
+        Standardized paper data of the papers (see `parse_paper_detail`).
+
+        Args:
+            positions (Iterable[int] | None): Positions of the papers, or None for all
+
+        Returns:
+            list[dict]: The papers, in order
+        """
+        fields = self.FIELDS
+        columns = [self.columns[field] for field in fields]
+        if positions is None:
+            return [dict(zip(fields, row)) for row in zip(*columns)]
+        return [
+            dict(zip(fields, [column[idx] for column in columns])) for idx in positions
+        ]
+
+    def to_papers(self, positions: Iterable[int] | None = None) -> list[Paper]:
+        """
+        Papers as Paper models, validated in a single call.
+
+        Args:
+            positions (Iterable[int] | None): Positions of the papers, or None for all
+
+        Returns:
+            list[Paper]: The papers, in order
+        """
+        return PAPER_LIST.validate_python(self.rows(positions))
+
+
+_EMPTY = {}
+
+# Paper fields copied as they are from the raw paper data
+_RAW_FIELDS = {
+    "abstract": "abstract",
+    "year": "year",
+    "publication_date": "publicationDate",
+    "reference_count": "referenceCount",
+    "citation_count": "citationCount",
+}
+
+
+def _names(entries: list[dict] | None, default: str | None = "") -> list[str | None]:
+    """Names of raw authors or venues (None for a missing venue, default for a missing name)."""
+    return [
+        entry.get("name", default) if isinstance(entry, dict) else None
+        for entry in entries or ()
+    ]
@@ -0,0 +1,162 @@
+"""Adaptive token-bucket rate limiting for upstream API traffic."""
+
+import asyncio
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """
+    Parse a `Retry-After` header into a delay in seconds.
+
+    Args:
+        value (str | None): Header value, either delta-seconds or an HTTP date
+
+    Returns:
+        float | None: The delay in seconds, or None if the header is missing or invalid
+    """
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+class AdaptiveRateLimiter:
+    """
+    Token bucket whose refill rate adapts to upstream feedback (AIMD).
+
+    Every request reserves one token before it is sent. The rate is cut
+    multiplicatively when the upstream answers 429 and grows additively on
+    success, so concurrent callers converge on whatever quota the upstream
+    currently grants. A `Retry-After` hint blocks all callers until it expires.
+
+    Reservations are computed without awaiting, so the bucket needs no lock
+    as long as it is only used from a single event loop.
+
+    Attributes:
+        rate (float): Current refill rate in requests per second
+        capacity (float): Maximum number of tokens (burst size)
+        min_rate (float): Lower bound for the adaptive rate
+        max_rate (float): Upper bound for the adaptive rate
+        decrease_factor (float): Multiplier applied to the rate on a 429
+        increase_step (float): Amount added to the rate on each success
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float,
+        min_rate: float,
+        max_rate: float,
+        decrease_factor: float = 0.5,
+        increase_step: float = 0.05,
+    ):
+        self.rate = rate
+        self.capacity = capacity
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.decrease_factor = decrease_factor
+        self.increase_step = increase_step
+        self.tokens = capacity
+        self.blocked_until = 0.0
+        self.throttled = 0
+        self.succeeded = 0
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float):
+        """Add the tokens accrued since the last update."""
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    def reserve(self) -> float:
+        """
+        Reserve a token and return how long the caller must wait before using it.
+
+        Returns:
+            float: The delay in seconds (0 if a token is available now)
+        """
+        now = time.monotonic()
+        self._refill(now)
+        self.tokens -= 1
+        wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        return max(wait, self.blocked_until - now)
+
+    async def acquire(self):
+        """Wait until the caller is allowed to send one request."""
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        # A 429 seen by another caller while sleeping extends the block
+        while (remaining := self.blocked_until - time.monotonic()) > 0:
+            await asyncio.sleep(remaining)
+
+    def try_acquire(self) -> bool:
+        """
+        Take a token only if one is available right now, without waiting.
+
+        Returns:
+            bool: Whether a token was taken
+        """
+        now = time.monotonic()
+        self._refill(now)
+        if self.tokens < 1 or self.blocked_until > now:
+            return False
+        self.tokens -= 1
+        return True
+
+    def on_success(self):
+        """Record a successful response and probe for more throughput."""
+        self.succeeded += 1
+        self._refill(time.monotonic())
+        self.rate = min(self.max_rate, self.rate + self.increase_step)
+
+    def on_rate_limited(self, retry_after: float | None = None) -> float:
+        """
+        Record a 429 response, slow down and block callers until it is safe to retry.
+
+        Args:
+            retry_after (float | None): The upstream's `Retry-After` hint in seconds
+
+        Returns:
+            float: The delay in seconds before the next request may be sent
+        """
+        self.throttled += 1
+        now = time.monotonic()
+        self._refill(now)
+        self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+        self.tokens = min(self.tokens, 0.0)
+        delay = retry_after if retry_after is not None else 1 / self.rate
+        self.blocked_until = max(self.blocked_until, now + delay)
+        return self.blocked_until - now
+
+    def state(self) -> dict:
+        """
+        Snapshot of the limiter's current state.
+
+        Returns:
+            dict: Current rate, available tokens, remaining block time and counters
+        """
+        now = time.monotonic()
+        self._refill(now)
+        return {
+            "rate": round(self.rate, 3),
+            "min_rate": self.min_rate,
+            "max_rate": self.max_rate,
+            "capacity": self.capacity,
+            "tokens": round(self.tokens, 3),
+            "blocked_for": round(max(self.blocked_until - now, 0.0), 3),
+            "throttled": self.throttled,
+            "succeeded": self.succeeded,
+        }
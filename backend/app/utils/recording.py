@@ -0,0 +1,60 @@
+"""Recording of upstream responses for offline replay and benchmarking."""
+
+import json
+import os
+from hashlib import sha1
+
+import httpx
+
+
+def recording_key(
+    method: str, path: str, params: list[tuple[str, str]], body: bytes
+) -> str:
+    """
+    Identify a request independently of the host it was sent to.
+
+    Args:
+        method (str): HTTP method
+        path (str): URL path (including any API version prefix)
+        params (list[tuple[str, str]]): Query parameters
+        body (bytes): Raw request body
+
+    Returns:
+        str: A stable hex digest for the request
+    """
+    digest = sha1()
+    digest.update(method.upper().encode())
+    digest.update(path.encode())
+    digest.update(json.dumps(sorted(params)).encode())
+    digest.update(body)
+    return digest.hexdigest()
+
+
+def save_recording(directory: str, response: httpx.Response) -> None:
+    """
+    Write a (fully read) upstream response to disk, keyed by its request.
+
+    Args:
+        directory (str): Directory holding the recordings
+        response (httpx.Response): The response to record
+    """
+    request = response.request
+    key = recording_key(
+        request.method,
+        request.url.path,
+        list(request.url.params.multi_items()),
+        request.content,
+    )
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, f"{key}.json"), "w", encoding="utf-8") as file:
+        json.dump(
+            {
+                "method": request.method,
+                "path": request.url.path,
+                "params": list(request.url.params.multi_items()),
+                "status_code": response.status_code,
+                "content_type": response.headers.get("content-type"),
+                "content": response.text,
+            },
+            file,
+        )
@@ -0,0 +1,170 @@
+"""Latency tracking and circuit breaking for upstream API traffic."""
+
+import math
+import time
+from collections import deque
+
+import httpx
+
+
+class CircuitOpenError(httpx.HTTPError):
+    """
+    Raised instead of sending a request while the circuit breaker is open.
+
+    Attributes:
+        retry_after (int): Seconds until the breaker lets a request through again
+    """
+
+    def __init__(self, retry_after: int = 1):
+        super().__init__("Semantic Scholar circuit breaker is open")
+        self.retry_after = retry_after
+
+
+class LatencyTracker:
+    """
+    Rolling window of recent response latencies.
+
+    Attributes:
+        window (int): Number of recent samples kept
+        min_samples (int): Samples required before percentiles are reported
+    """
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.window = window
+        self.min_samples = min_samples
+        self._samples = deque(maxlen=window)
+
+    def record(self, seconds: float):
+        """Add a latency sample in seconds."""
+        self._samples.append(seconds)
+
+    def percentile(self, q: float) -> float | None:
+        """
+        Nearest-rank percentile of the recent latencies.
+
+        Args:
+            q (float): Percentile between 0 and 100
+
+        Returns:
+            float | None: The latency in seconds, or None with too few samples
+        """
+        if len(self._samples) < self.min_samples:
+            return None
+        ordered = sorted(self._samples)
+        rank = min(max(math.ceil(q / 100 * len(ordered)) - 1, 0), len(ordered) - 1)
+        return ordered[rank]
+
+
+class CircuitBreaker:
+    """
+    Fails fast while the upstream error rate is too high.
+
+    The breaker is 'closed' while the error rate over the last `window`
+    outcomes stays below `error_rate` (once at least `min_requests` outcomes
+    are known). It then 'opens' and rejects requests for `cooldown` seconds,
+    after which it is 'half_open' and lets a single probe through: a success
+    closes it again, a failure reopens it.
+
+    Attributes:
+        error_rate (float): Error rate (0-1) that opens the breaker
+        min_requests (int): Outcomes required before the error rate is trusted
+        window (int): Number of recent outcomes considered
+        cooldown (float): Seconds the breaker stays open before probing
+    """
+
+    def __init__(
+        self,
+        error_rate: float = 0.5,
+        min_requests: int = 20,
+        window: int = 50,
+        cooldown: float = 30,
+    ):
+        self.error_rate = error_rate
+        self.min_requests = min_requests
+        self.window = window
+        self.cooldown = cooldown
+        self.opened = 0
+        self.rejected = 0
+        self._outcomes = deque(maxlen=window)
+        self._opened_at = None
+        self._probe_started = float("-inf")
+
+    @property
+    def status(self) -> str:
+        """Either 'closed', 'open' or 'half_open'."""
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at < self.cooldown:
+            return "open"
+        return "half_open"
+
+    def allow(self) -> bool:
+        """
+        Decide whether a request may be sent now.
+
+        Returns:
+            bool: False if the request should fail fast
+        """
+        status = self.status
+        if status == "closed":
+            return True
+        now = time.monotonic()
+        # A probe that never reported back (e.g. a cancelled request) expires
+        # after another cooldown so the breaker cannot get stuck half-open
+        if status == "half_open" and now - self._probe_started >= self.cooldown:
+            self._probe_started = now
+            return True
+        self.rejected += 1
+        return False
+
+    def retry_after(self) -> int:
+        """Whole seconds (at least 1) until the breaker lets a request through again."""
+        if self.status == "open":
+            remaining = self._opened_at + self.cooldown - time.monotonic()
+        else:
+            # Half open, with a probe in flight until it reports back or expires
+            remaining = self._probe_started + self.cooldown - time.monotonic()
+        return max(math.ceil(remaining), 1)
+
+    def record(self, success: bool):
+        """
+        Record the outcome of a request that was allowed through.
+
+        Args:
+            success (bool): Whether the upstream answered without a server or transport error
+        """
+        if self._opened_at is not None:
+            if self._probe_started > float("-inf"):
+                self._probe_started = float("-inf")
+                if success:
+                    self._opened_at = None
+                    self._outcomes.clear()
+                else:
+                    self._opened_at = time.monotonic()
+            return
+        self._outcomes.append(success)
+        failures = self._outcomes.count(False)
+        if (
+            len(self._outcomes) >= self.min_requests
+            and failures / len(self._outcomes) >= self.error_rate
+        ):
+            self._opened_at = time.monotonic()
+            self.opened += 1
+
+    def state(self) -> dict:
+        """
+        Snapshot of the breaker's current state.
+
+        Returns:
+            dict: The state, recent error rate and counters
+        """
+        outcomes = len(self._outcomes)
+        return {
+            "status": self.status,
+            "error_rate": round(self._outcomes.count(False) / outcomes, 3)
+            if outcomes
+            else 0.0,
+            "recent_requests": outcomes,
+            "opened": self.opened,
+            "rejected": self.rejected,
+        }
@@ -0,0 +1,54 @@
+"""Coalescing of identical concurrent async computations."""
+
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from typing import TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Runs at most one computation per key at a time.
+
+    Callers that ask for a key while its computation is still in flight await
+    the same task and share its result (or exception) instead of starting a
+    duplicate. The task is shielded, so a disconnecting caller does not cancel
+    the work for everyone else. Nothing is cached once the task completes.
+
+    Attributes:
+        shared (int): Number of calls that joined an in-flight computation
+    """
+
+    def __init__(self):
+        self.shared = 0
+        self._calls: dict[Hashable, asyncio.Future] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run `fn` for `key`, or join the computation already in flight for it.
+
+        Args:
+            key (Hashable): Normalized identity of the computation
+            fn (Callable[[], Awaitable[T]]): Factory for the computation
+
+        Returns:
+            T: The (possibly shared) result
+        """
+        task = self._calls.get(key)
+        if task is not None and task.get_loop() is asyncio.get_running_loop():
+            self.shared += 1
+        else:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Future):
+        """Drop a finished task, unless a newer one already replaced it."""
+        if self._calls.get(key) is task:
+            del self._calls[key]
+
+    def in_flight(self) -> int:
+        """Number of computations currently in flight."""
+        return len(self._calls)
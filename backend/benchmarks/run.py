@@ -0,0 +1,249 @@
+"""
+End-to-end latency benchmark for the PaperRef backend.
+
+The FastAPI app is driven in-process (authentication is bypassed) while its
+Semantic Scholar traffic goes to the replaying stand-in server, which is
+started automatically. For each endpoint the runner reports p50/p95/p99
+latency, throughput and the number of upstream calls the requests caused.
+
+Usage:
+    # 1. Capture upstream responses for the workload from the real API
+    python -m benchmarks.run --record recordings
+
+    # 2. Benchmark against the replayed responses
+    python -m benchmarks.run --recordings recordings --latency-ms 150 \
+        --requests 50 --concurrency 8
+
+The `recommended` endpoint also calls OpenAI, which is not replayed, so it is
+only benchmarked when requested explicitly with `--endpoints`.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from urllib.parse import urlsplit
+
+import httpx
+
+
+WORKLOAD = os.path.join(os.path.dirname(__file__), "workload.json")
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Nearest-rank percentile of a list of values (0 for an empty list)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(int(round(q / 100 * len(ordered) + 0.5)) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+def build_requests(endpoint: str, workload: dict) -> list[dict]:
+    """HTTP requests (method, url, params, json) for one endpoint's workload."""
+    if endpoint == "graph":
+        return [
+            {"method": "POST", "url": "/graph", "json": p} for p in workload["graph"]
+        ]
+    if endpoint == "search":
+        return [
+            {"method": "GET", "url": "/library/search", "params": query}
+            for query in workload["search"]
+        ]
+    if endpoint == "recommended":
+        return [{"method": "GET", "url": "/recommended"}]
+    raise ValueError(f"Unknown endpoint: {endpoint}")
+
+
+async def run_endpoint(
+    client: httpx.AsyncClient, requests: list[dict], total: int, concurrency: int
+) -> dict:
+    """
+    Send `total` requests (cycling through the workload) with bounded concurrency.
+
+    Returns:
+        dict: Latencies (s), error count and wall-clock duration (s)
+    """
+    latencies, errors = [], 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def send(request: dict):
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                response = await client.request(**request)
+                if response.status_code != 200:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(send(requests[i % len(requests)]) for i in range(total)))
+    return {
+        "latencies": latencies,
+        "errors": errors,
+        "duration": time.perf_counter() - start,
+    }
+
+
+def start_standin(args: argparse.Namespace) -> subprocess.Popen:
+    """Start the stand-in server and wait until it accepts requests."""
+    env = {
+        **os.environ,
+        "STANDIN_RECORDINGS": args.recordings,
+        "STANDIN_LATENCY_MS": str(args.latency_ms),
+        "STANDIN_JITTER_MS": str(args.jitter_ms),
+        "STANDIN_429_RATE": str(args.rate_limit_rate),
+    }
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "benchmarks.standin:app",
+            "--port",
+            str(args.port),
+            "--log-level",
+            "warning",
+        ],
+        env=env,
+    )
+    for _ in range(100):
+        try:
+            httpx.get(f"http://127.0.0.1:{args.port}/_stats", timeout=1)
+            return process
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError("Stand-in server did not start")
+
+
+async def benchmark(args: argparse.Namespace) -> list[dict]:
+    # Settings must be redirected before the services compute their URLs
+    from app.config import settings
+
+    state_dir = tempfile.mkdtemp()
+    settings.PAPER_CACHE_PATH = os.path.join(state_dir, "cache.sqlite3")
+    settings.GRAPH_SNAPSHOT_PATH = os.path.join(state_dir, "snapshots.sqlite3")
+    if args.record:
+        settings.SEMANTIC_SCHOLAR_RECORD_DIR = args.record
+    else:
+        standin_url = f"http://127.0.0.1:{args.port}"
+        for name in (
+            "SEMANTIC_SCHOLAR_API_URL",
+            "SEMANTIC_SCHOLAR_RECOMMENDATIONS_URL",
+        ):
+            setattr(
+                settings, name, standin_url + urlsplit(getattr(settings, name)).path
+            )
+
+    from app.firebase import get_current_user
+    from app.main import app
+    from app.routers import recommended
+    from app.schemas.papers import Paper
+    from app.semantic_scholar import semantic_scholar
+
+    with open(args.workload, encoding="utf-8") as file:
+        workload = json.load(file)
+    library = [Paper(**paper) for paper in workload["library"]]
+    app.dependency_overrides[get_current_user] = lambda: "benchmark-user"
+    recommended.get_paper_library_service = lambda user_id: library
+
+    results = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://paperref", timeout=300
+    ) as client:
+        for endpoint in args.endpoints:
+            requests = build_requests(endpoint, workload)
+            total = len(requests) if args.record else args.requests
+            concurrency = 1 if args.record else args.concurrency
+            limiter = semantic_scholar.limiter
+            succeeded_before, throttled_before = limiter.succeeded, limiter.throttled
+            run = await run_endpoint(client, requests, total, concurrency)
+            latencies = run["latencies"]
+            throttled = limiter.throttled - throttled_before
+            upstream_calls = limiter.succeeded - succeeded_before + throttled
+            results.append(
+                {
+                    "endpoint": endpoint,
+                    "requests": total,
+                    "errors": run["errors"],
+                    "p50_ms": percentile(latencies, 50) * 1000,
+                    "p95_ms": percentile(latencies, 95) * 1000,
+                    "p99_ms": percentile(latencies, 99) * 1000,
+                    "throughput_rps": total / run["duration"] if run["duration"] else 0,
+                    "upstream_calls": upstream_calls,
+                    "upstream_throttled": throttled,
+                }
+            )
+    return results
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="PaperRef end-to-end latency benchmark"
+    )
+    parser.add_argument("--workload", default=WORKLOAD, help="Workload JSON file")
+    parser.add_argument(
+        "--endpoints",
+        nargs="+",
+        default=["graph", "search"],
+        choices=["graph", "search", "recommended"],
+    )
+    parser.add_argument(
+        "--requests", type=int, default=20, help="Requests per endpoint"
+    )
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument(
+        "--record",
+        metavar="DIR",
+        help="Record real upstream responses to DIR instead of benchmarking",
+    )
+    parser.add_argument(
+        "--recordings", default="recordings", help="Recordings replayed by the stand-in"
+    )
+    parser.add_argument(
+        "--latency-ms", type=float, default=100, help="Injected upstream latency"
+    )
+    parser.add_argument(
+        "--jitter-ms", type=float, default=0, help="Injected upstream latency jitter"
+    )
+    parser.add_argument(
+        "--rate-limit-rate",
+        type=float,
+        default=0,
+        help="Fraction of upstream calls answered with 429",
+    )
+    parser.add_argument("--port", type=int, default=8765, help="Stand-in server port")
+    parser.add_argument("--json", metavar="PATH", help="Also write the results as JSON")
+    args = parser.parse_args(argv)
+
+    standin = None if args.record else start_standin(args)
+    try:
+        results = asyncio.run(benchmark(args))
+    finally:
+        if standin is not None:
+            standin.terminate()
+
+    header = f"{'endpoint':<12}{'reqs':>6}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'req/s':>9}{'upstream':>10}"
+    print(header)
+    for result in results:
+        print(
+            f"{result['endpoint']:<12}{result['requests']:>6}{result['errors']:>8}"
+            f"{result['p50_ms']:>10.1f}{result['p95_ms']:>10.1f}{result['p99_ms']:>10.1f}"
+            f"{result['throughput_rps']:>9.2f}{result['upstream_calls']:>10}"
+        )
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
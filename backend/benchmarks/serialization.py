@@ -0,0 +1,132 @@
+"""
+Per-paper cost of turning upstream paper data into JSON responses.
+
+Runs in-process on synthetic Semantic Scholar papers (no server or
+recordings needed) and reports, for each step, the microseconds spent per
+paper by the per-model path the backend used to take and by the bulk path it
+takes now:
+
+    parse      raw papers -> list[Paper] (search, library, recommendations)
+    pool       overlapping raw candidates -> ten ranked Paper models
+               (recommendations, parsed by `PaperColumns`)
+    graph      GraphCore -> DirectedGraph (graph builds)
+    snapshot   stored snapshot -> response body (graph snapshot hits)
+
+Usage:
+    python -m benchmarks.serialization --papers 500 --repeat 20
+"""
+
+import argparse
+import gc
+import time
+
+from app.schemas.graph import DirectedGraph, Edge, GraphResponse, Node
+from app.schemas.papers import Paper
+from app.utils.graph_core import GraphCore
+from app.utils.paper import PaperColumns, parse_paper_detail, parse_papers
+
+
+def synthetic_paper(i: int) -> dict:
+    """A raw Semantic Scholar paper with every field the backend requests."""
+    return {
+        "paperId": f"{i:040x}",
+        "title": f"Paper {i}",
+        "authors": [{"authorId": str(j), "name": f"Author {j}"} for j in range(4)],
+        "abstract": "An abstract of a few sentences. " * 8,
+        "year": 2000 + i % 25,
+        "publicationDate": f"{2000 + i % 25}-01-01",
+        "referenceCount": i % 50,
+        "citationCount": i * 7 % 1000,
+        "publicationVenue": {"name": f"Venue {i % 20}"},
+        "openAccessPdf": {"url": f"https://example.org/{i}.pdf"},
+        "externalIds": {"DOI": f"10.0/{i}", "ArXiv": f"{i:04d}.0001"},
+        "tldr": {"text": "A short summary."},
+    }
+
+
+def per_paper(func, num_papers: int, repeat: int) -> float:
+    """Best time of a function over several runs, in microseconds per paper."""
+    best = float("inf")
+    # As in timeit, keep garbage collections out of the measurements
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            best = min(best, time.perf_counter() - start)
+    finally:
+        gc.enable()
+    return best / num_papers * 1e6
+
+
+def model_graph(core: GraphCore) -> DirectedGraph:
+    """`GraphCore.to_directed_graph`, constructing each model separately."""
+    ids = core.ids
+    return DirectedGraph(
+        nodes=[
+            Node(id=ids[idx], detail=Paper(**core.details[idx]))
+            for idx in range(len(ids))
+        ],
+        edges=[
+            Edge(source=ids[source], target=ids[target])
+            for source, target in zip(core.sources, core.targets)
+        ],
+        max_citations=core.max_citations(),
+    )
+
+
+def model_pool(raw: list[dict]) -> list[Paper]:
+    """The recommendation candidate pool, building a model per raw paper."""
+    pool = {}
+    for paper in raw:
+        paper = Paper(**parse_paper_detail(paper))
+        pool.setdefault(paper.id, paper)
+    return list(pool.values())[:10]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--papers", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    raw = [synthetic_paper(i) for i in range(args.papers)]
+    core = GraphCore()
+    for paper in raw:
+        core.add_node(paper)
+    # A citation chain plus a few shortcuts, about two edges per paper
+    for idx in range(1, len(raw)):
+        core.add_edge(idx - 1, idx)
+        core.add_edge(idx // 2, idx)
+    graph = core.to_directed_graph()
+    stored = GraphResponse(citation_graph=graph, reference_graph=graph)
+    stored = stored.model_dump_json()
+
+    steps = {
+        "parse": (
+            lambda: [Paper(**parse_paper_detail(paper)) for paper in raw],
+            lambda: parse_papers(raw),
+        ),
+        # Candidates found by several sources: a third of them twice
+        "pool": (
+            lambda: model_pool(raw + raw[::3]),
+            lambda: PaperColumns(raw + raw[::3], unique=True).to_papers(range(10)),
+        ),
+        "graph": (lambda: model_graph(core), core.to_directed_graph),
+        "snapshot": (
+            lambda: GraphResponse.model_validate_json(stored).model_dump_json(),
+            # Starlette only encodes the stored JSON to bytes
+            lambda: stored.encode(),
+        ),
+    }
+    print(f"{'step':<10}{'per-model':>12}{'bulk':>12}{'speedup':>10}  (us/paper)")
+    for name, (before, after) in steps.items():
+        before = per_paper(before, args.papers, args.repeat)
+        after = per_paper(after, args.papers, args.repeat)
+        speedup = before / after if after else float("inf")
+        speedup = f"{speedup:.1f}x" if speedup < 1000 else ">1000x"
+        print(f"{name:<10}{before:>12.2f}{after:>12.2f}{speedup:>10}")
+
+
+if __name__ == "__main__":
+    main()
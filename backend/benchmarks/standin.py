@@ -0,0 +1,81 @@
+"""
+Stand-in Semantic Scholar server that replays recorded upstream responses.
+
+Recordings are produced by running the backend (or `benchmarks.run --record`)
+with SEMANTIC_SCHOLAR_RECORD_DIR set. Point SEMANTIC_SCHOLAR_API_URL at this
+server using the same path prefix as the real API (e.g. `/graph/v1`).
+
+Configuration (environment variables):
+    STANDIN_RECORDINGS: Directory of recorded responses (default: recordings)
+    STANDIN_LATENCY_MS: Injected latency per request in milliseconds (default: 0)
+    STANDIN_JITTER_MS: Uniform random jitter added to the latency (default: 0)
+    STANDIN_429_RATE: Probability of answering 429 instead (default: 0)
+    STANDIN_RETRY_AFTER: Retry-After seconds sent with injected 429s (default: 1)
+
+Usage:
+    uvicorn benchmarks.standin:app --port 8001
+"""
+
+import asyncio
+import json
+import os
+import random
+from collections import Counter
+
+from fastapi import FastAPI, Request, Response
+
+from app.utils.recording import recording_key
+
+
+RECORDINGS = os.environ.get("STANDIN_RECORDINGS", "recordings")
+LATENCY_MS = float(os.environ.get("STANDIN_LATENCY_MS", 0))
+JITTER_MS = float(os.environ.get("STANDIN_JITTER_MS", 0))
+RATE_LIMIT_RATE = float(os.environ.get("STANDIN_429_RATE", 0))
+RETRY_AFTER = os.environ.get("STANDIN_RETRY_AFTER", "1")
+
+app = FastAPI(title="Semantic Scholar stand-in")
+stats = Counter()
+
+
+@app.get("/_stats")
+def get_stats() -> dict:
+    """Number of upstream calls served, by outcome and path."""
+    return dict(stats)
+
+
+@app.post("/_stats/reset")
+def reset_stats() -> dict:
+    """Reset the call counters."""
+    stats.clear()
+    return {}
+
+
+@app.api_route("/{path:path}", methods=["GET", "POST"])
+async def replay(request: Request) -> Response:
+    """Replay the recorded response for a request, after the injected latency."""
+    body = await request.body()
+    key = recording_key(
+        request.method,
+        request.url.path,
+        list(request.query_params.multi_items()),
+        body,
+    )
+    stats["calls"] += 1
+    stats[f"calls:{request.url.path}"] += 1
+    delay = LATENCY_MS + random.uniform(0, JITTER_MS)
+    if delay:
+        await asyncio.sleep(delay / 1000)
+    if random.random() < RATE_LIMIT_RATE:
+        stats["rate_limited"] += 1
+        return Response(status_code=429, headers={"Retry-After": RETRY_AFTER})
+    try:
+        with open(os.path.join(RECORDINGS, f"{key}.json"), encoding="utf-8") as file:
+            recording = json.load(file)
+    except FileNotFoundError:
+        stats["missing"] += 1
+        return Response(status_code=404, content="No recording for this request")
+    return Response(
+        status_code=recording["status_code"],
+        content=recording["content"],
+        media_type=recording["content_type"],
+    )
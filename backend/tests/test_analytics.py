@@ -0,0 +1,33 @@
+import numpy as np
+
+from app.schemas.graph import DirectedGraph, Edge, Node
+from app.schemas.papers import Paper
+from app.services.analytics import adjacency_matrix, analyze_graph, pagerank
+
+
+def graph(edges: list[tuple[str, str]]) -> DirectedGraph:
+    ids = sorted({paper_id for edge in edges for paper_id in edge})
+    return DirectedGraph(
+        nodes=[Node(id=i, detail=Paper(id=i, title=i)) for i in ids],
+        edges=[Edge(source=source, target=target) for source, target in edges],
+        max_citations=0,
+    )
+
+
+def test_analyze_graph():
+    # c and d both cite a and b, so a and b are co-cited and c and d coupled
+    analytics = analyze_graph(
+        graph([("a", "c"), ("b", "c"), ("a", "d"), ("b", "d"), ("a", "e")])
+    )
+    scores = {node.id: node for node in analytics}
+    assert scores["a"].out_degree == 3 and scores["c"].in_degree == 2
+    assert scores["a"].pagerank > scores["b"].pagerank > scores["c"].pagerank
+    assert [similar.id for similar in scores["a"].co_cited] == ["b"]
+    assert scores["c"].coupled[0].id == "d"
+    assert scores["c"].coupled[0].score == 1.0
+
+
+def test_pagerank_sums_to_one():
+    ranks = pagerank(adjacency_matrix(graph([("a", "b"), ("b", "c"), ("c", "a")])))
+    assert np.isclose(ranks.sum(), 1.0)
+    assert np.allclose(ranks, 1 / 3)
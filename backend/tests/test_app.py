@@ -8,3 +8,10 @@ def test_root():
     response = client.get("/")
     assert response.status_code == 200
     assert response.json()["message"] == "API is up and running!"
+
+
+def test_semantic_scholar_status():
+    response = client.get("/status/semantic_scholar")
+    assert response.status_code == 200
+    assert "rate" in response.json()["rate_limiter"]
+    assert "status" in response.json()["circuit_breaker"]
@@ -0,0 +1,84 @@
+import pytest
+from fastapi import HTTPException
+
+from app.config import settings
+from app.schemas.graph import GraphParams
+from app.schemas.papers import Paper
+from app.services import budget
+from app.services.budget import (
+    enforce_batch_budget,
+    enforce_library_budget,
+    estimate_graph_size,
+)
+from app.services.graph import PaperBatchFetcher
+
+
+def related(counts: list[int]) -> list[dict]:
+    return [
+        {"paperId": str(i), "citationCount": count} for i, count in enumerate(counts)
+    ]
+
+
+def test_estimate_graph_size_from_seed_neighbours():
+    params = GraphParams(num_nodes=4, depth=1, max_citations=100)
+    # One of the four most cited neighbours is deep fetched (one page)
+    nodes, batches, deep_pages = estimate_graph_size(
+        related([500, 50, 40, 30, 1]), 5, "citationCount", 100, params, True
+    )
+    assert (nodes, batches, deep_pages) == (5, 1, 1)
+    assert estimate_graph_size(
+        related([500, 50, 40, 30, 1]), 5, "citationCount", 100, params, False
+    ) == (5, 1, 0)
+
+
+def test_estimate_graph_size_grows_with_depth():
+    shallow = estimate_graph_size(None, 50, "citationCount", 500, GraphParams(), True)
+    deep = estimate_graph_size(
+        None, 50, "citationCount", 500, GraphParams(depth=2), True
+    )
+    assert shallow[0] == 21
+    assert deep[0] > shallow[0] and deep[1] > shallow[1]
+
+
+def test_batch_budget_adds_up_the_seeds(monkeypatch):
+    # Nothing cached or snapshotted: seeds are estimated from their counts
+    monkeypatch.setattr(budget, "PaperBatchFetcher", lambda: PaperBatchFetcher(None))
+    monkeypatch.setattr(budget.graph_snapshots, "exists", lambda key: False)
+    papers = [
+        Paper(id=str(i), title=f"Paper {i}", citation_count=50, reference_count=50)
+        for i in range(4)
+    ]
+    params = GraphParams(depth=2)
+    single = budget.plan_graph_service(papers[0], params).estimate.requests
+    monkeypatch.setattr(settings, "GRAPH_REQUEST_BUDGET", 2 * single)
+    assert enforce_batch_budget(papers[:2], params) == params
+
+    # Each seed fits on its own, but the four of them do not
+    monkeypatch.setattr(settings, "GRAPH_OVER_BUDGET", "reject")
+    assert budget.plan_graph_service(papers[3], params).estimate.within_budget
+    with pytest.raises(HTTPException) as error:
+        enforce_batch_budget(papers, params)
+    assert error.value.status_code == 422
+    monkeypatch.setattr(settings, "GRAPH_OVER_BUDGET", "downscale")
+    assert enforce_batch_budget(papers, params).depth == 1
+
+
+def test_library_budget_counts_every_library_paper(monkeypatch):
+    monkeypatch.setattr(budget, "PaperBatchFetcher", lambda: PaperBatchFetcher(None))
+    # Library builds have no snapshots, so existing ones do not make them free
+    monkeypatch.setattr(budget.graph_snapshots, "exists", lambda key: True)
+    papers = [
+        Paper(id=str(i), title=f"Paper {i}", citation_count=50, reference_count=50)
+        for i in range(4)
+    ]
+    library = GraphParams(num_nodes=10, depth=2)
+    assert enforce_library_budget(papers, depth=2) == library
+
+    single = budget.plan_graph_service(papers[0], library).estimate.requests
+    monkeypatch.setattr(settings, "GRAPH_REQUEST_BUDGET", 2 * single)
+    monkeypatch.setattr(settings, "GRAPH_OVER_BUDGET", "reject")
+    with pytest.raises(HTTPException) as error:
+        enforce_library_budget(papers, depth=2)
+    assert error.value.status_code == 422
+    monkeypatch.setattr(settings, "GRAPH_OVER_BUDGET", "downscale")
+    assert enforce_library_budget(papers, depth=2).depth == 1
@@ -0,0 +1,39 @@
+from itertools import combinations
+
+from app.schemas.graph import DirectedGraph, Edge, Node
+from app.schemas.papers import Paper
+from app.services.communities import community_subgraph, summarize_communities
+
+
+def two_cliques() -> DirectedGraph:
+    # a-d and e-h are fully connected, with a single edge between them
+    ids = "abcdefgh"
+    edges = [*combinations("abcd", 2), *combinations("efgh", 2), ("a", "e")]
+    return DirectedGraph(
+        nodes=[
+            Node(id=i, detail=Paper(id=i, title=i, citation_count=ord(i))) for i in ids
+        ],
+        edges=[Edge(source=source, target=target) for source, target in edges],
+        max_citations=0,
+    )
+
+
+def test_summarize_communities():
+    summary = summarize_communities(two_cliques())
+    assert [community.size for community in summary.communities] == [4, 4]
+    assert {community.representative.id for community in summary.communities} == {
+        "d",
+        "h",
+    }
+    assert [(edge.source, edge.target, edge.weight) for edge in summary.edges] == [
+        (0, 1, 1)
+    ]
+    merged = summarize_communities(two_cliques(), max_communities=1)
+    assert [community.size for community in merged.communities] == [8]
+    assert merged.communities[0].merged
+
+
+def test_community_subgraph():
+    members = community_subgraph(two_cliques(), 0, max_nodes=3)
+    assert len(members.nodes) == 3
+    assert len(members.edges) == 3
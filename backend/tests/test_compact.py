@@ -0,0 +1,27 @@
+from app.schemas.graph import DirectedGraph, Edge, GraphResponse, Node, Position
+from app.schemas.papers import Paper
+from app.utils.compact import decode_graphs, encode_graphs
+
+
+def node(paper_id: str, **fields) -> Node:
+    return Node(id=paper_id, detail=Paper(id=paper_id, title=paper_id), **fields)
+
+
+def test_compact_round_trip():
+    citation_graph = DirectedGraph(
+        nodes=[node("a", in_library=True), node("b")],
+        edges=[Edge(source="a", target="b")],
+        max_citations=3,
+    )
+    reference_graph = DirectedGraph(
+        nodes=[
+            node("a", position=Position(x=1.5, y=-2)),
+            node("c", position=Position(x=0, y=0)),
+        ],
+        edges=[Edge(source="c", target="a")],
+        max_citations=0,
+    )
+    graphs = GraphResponse(
+        citation_graph=citation_graph, reference_graph=reference_graph
+    )
+    assert decode_graphs(encode_graphs(graphs)) == graphs
@@ -0,0 +1,113 @@
+import asyncio
+import json
+from contextlib import asynccontextmanager
+
+import httpx
+
+from app.database.paper_cache import PaperCache
+from app.semantic_scholar import semantic_scholar
+from app.services.graph import PaperBatchFetcher
+
+# Citations of the paper "seed", most cited first, two per page
+CITATIONS = [{"paperId": f"p{i}", "citationCount": 100 - 10 * i} for i in range(8)]
+
+
+def stub_pages(monkeypatch) -> list[int]:
+    """Serve CITATIONS in pages of two, recording the requested offsets."""
+    offsets = []
+
+    async def get(url, params, **kwargs):
+        offsets.append(params["offset"])
+        page = CITATIONS[params["offset"] : params["offset"] + params["limit"]]
+        data = [{"citingPaper": paper} for paper in page]
+        return httpx.Response(
+            200, json={"data": data}, request=httpx.Request("GET", url)
+        )
+
+    monkeypatch.setattr(PaperBatchFetcher, "PAGE_SIZE", 2)
+    monkeypatch.setattr(semantic_scholar, "max_concurrency", 2)
+    monkeypatch.setattr(semantic_scholar, "get", get)
+    return offsets
+
+
+def deep_fetch(top_k: int, targets: dict[str, int] | None = None) -> list[str]:
+    fetcher = PaperBatchFetcher(cache=None, mirror=None)
+    paper = asyncio.run(
+        fetcher.fetch_deep("seed", len(CITATIONS), "citations", top_k, targets)
+    )
+    return [related["paperId"] for related in paper["citations"]]
+
+
+def test_fetch_deep_keeps_the_top_k_of_every_page(monkeypatch):
+    offsets = stub_pages(monkeypatch)
+    assert deep_fetch(3) == ["p0", "p1", "p2"]
+    # Two waves of two pages
+    assert sorted(offsets) == [0, 2, 4, 6]
+
+
+def test_fetch_deep_stops_once_no_target_can_enter_the_top_k(monkeypatch):
+    offsets = stub_pages(monkeypatch)
+    # The graph's other paper (cited 50 times) cannot beat the k-th of the first wave
+    assert deep_fetch(2, {"seed": 1000, "p5": 50}) == ["p0", "p1"]
+    assert sorted(offsets) == [0, 2]
+
+    offsets.clear()
+    # An unseen paper cited more than the k-th keeps the paging going
+    assert deep_fetch(2, {"elsewhere": 95}) == ["p0", "p1"]
+    assert sorted(offsets) == [0, 2, 4, 6]
+
+
+def stub_stream(monkeypatch) -> list[str]:
+    """Stream batch responses one paper per chunk, recording the streamed IDs."""
+    sent = []
+
+    @asynccontextmanager
+    async def stream(method, url, **kwargs):
+        async def body():
+            yield b"["
+            for i, paper_id in enumerate(kwargs["json"]["ids"]):
+                sent.append(paper_id)
+                paper = None if paper_id == "missing" else {"paperId": paper_id}
+                yield (b"," if i else b"") + json.dumps(paper).encode()
+            yield b"]"
+
+        request = httpx.Request(method, url)
+        yield httpx.Response(200, content=body(), request=request)
+
+    monkeypatch.setattr(semantic_scholar, "stream", stream)
+    return sent
+
+
+def test_iter_batched_yields_cached_papers_before_streamed_ones(monkeypatch, tmp_path):
+    sent = stub_stream(monkeypatch)
+    cache = PaperCache(str(tmp_path / "cache.sqlite3"), ttl=60, relation_ttl=60)
+    fetcher = PaperBatchFetcher(cache=cache, mirror=None)
+    cache.set_many({"a": {"paperId": "a"}}, "none", fetcher.signatures["none"])
+
+    async def main() -> list[str]:
+        ids = ["x", "a", "y", "missing", "x"]
+        return [
+            paper["paperId"] async for paper in fetcher.iter_batched(ids, key="none")
+        ]
+
+    # Unknown papers are skipped, and streamed papers are cached as they arrive
+    assert asyncio.run(main()) == ["a", "x", "y"]
+    assert sent == ["x", "y", "missing"]
+    assert set(cache.get_many(["x", "y"], "none", fetcher.signatures)) == {"x", "y"}
+
+
+def test_iter_batched_is_bounded_by_its_queue(monkeypatch):
+    sent = stub_stream(monkeypatch)
+    fetcher = PaperBatchFetcher(cache=None, mirror=None)
+    ids = [f"p{i}" for i in range(50)]
+
+    async def main() -> int:
+        papers = fetcher.iter_batched(ids, batch_size=5, key="none")
+        await anext(papers)
+        await asyncio.sleep(0.01)
+        streamed = len(sent)
+        await papers.aclose()
+        return streamed
+
+    # Ten batches stream concurrently, but stop once the queue of five is full
+    assert asyncio.run(main()) <= 1 + 5 + 2 * 10
@@ -1,3 +1,5 @@
+import json
+
 from fastapi.testclient import TestClient
 from app.main import app
 
@@ -39,3 +41,85 @@ def test_graph(user_id_token):
     assert response.status_code == 200
     assert response.json()["citation_graph"] is not None
     assert response.json()["reference_graph"] is not None
+
+
+def test_graph_depth_out_of_range(user_id_token):
+    headers = {
+        "content-type": "application/json; charset=UTF-8",
+        "Authorization": f"Bearer {user_id_token}",
+    }
+    payload = {"id": "43f52802fc640cb74e9c742fb6f1d272cd17cec6", "title": ""}
+    response = client.post(
+        "/graph/", headers=headers, json=payload, params={"depth": 0}
+    )
+    assert response.status_code == 422
+
+
+def test_library_graph(user_id_token):
+    headers = {"Authorization": f"Bearer {user_id_token}"}
+    response = client.get("/graph/library", headers=headers)
+    assert response.status_code == 200
+    nodes = response.json()["citation_graph"]["nodes"]
+    assert all("in_library" in node for node in nodes)
+
+
+def test_graph_stream(user_id_token):
+    headers = {
+        "content-type": "application/json; charset=UTF-8",
+        "Authorization": f"Bearer {user_id_token}",
+    }
+    payload = {"id": "43f52802fc640cb74e9c742fb6f1d272cd17cec6", "title": ""}
+    with client.stream(
+        "POST", "/graph/stream", headers=headers, json=payload
+    ) as response:
+        assert response.status_code == 200
+        frames = [json.loads(line) for line in response.iter_lines() if line]
+    assert frames[0]["event"] == "delta"
+    assert frames[-1]["event"] == "summary"
+    nodes = sum(
+        len(frame["nodes"])
+        for frame in frames
+        if frame["event"] == "delta" and frame["graph"] == "citation_graph"
+    )
+    assert nodes == frames[-1]["citation_graph"]["nodes"]
+
+
+def test_graph_estimate(user_id_token):
+    headers = {
+        "content-type": "application/json; charset=UTF-8",
+        "Authorization": f"Bearer {user_id_token}",
+    }
+    payload = {"id": "43f52802fc640cb74e9c742fb6f1d272cd17cec6", "title": ""}
+    response = client.post(
+        "/graph/estimate", headers=headers, json=payload, params={"depth": 2}
+    )
+    assert response.status_code == 200
+    assert response.json()["estimate"]["requests"] >= 0
+    assert response.json()["params"]["depth"] <= 2
+
+
+def test_graph_batch(user_id_token):
+    headers = {
+        "content-type": "application/json; charset=UTF-8",
+        "Authorization": f"Bearer {user_id_token}",
+    }
+    payload = {"id": "43f52802fc640cb74e9c742fb6f1d272cd17cec6", "title": ""}
+    response = client.post("/graph/batch", headers=headers, json=[payload, payload])
+    assert response.status_code == 200
+    graphs = response.json()
+    assert len(graphs) == 2
+    assert graphs[0] == graphs[1]
+    assert graphs[0]["citation_graph"]["nodes"]
+
+
+def test_graph_path(user_id_token):
+    headers = {
+        "content-type": "application/json; charset=UTF-8",
+        "Authorization": f"Bearer {user_id_token}",
+    }
+    paper = {"id": "43f52802fc640cb74e9c742fb6f1d272cd17cec6", "title": ""}
+    response = client.post(
+        "/graph/path", headers=headers, json={"source": paper, "target": paper}
+    )
+    assert response.status_code == 200
+    assert [node["id"] for node in response.json()["nodes"]] == [paper["id"]]
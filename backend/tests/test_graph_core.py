@@ -0,0 +1,34 @@
+from app.utils.graph_core import GraphCore, top_cited
+
+
+def paper(paper_id: str, citations: int) -> dict:
+    return {"paperId": paper_id, "title": paper_id, "citationCount": citations}
+
+
+def test_graph_core_interns_nodes_and_dedupes_edges():
+    core = GraphCore()
+    a, b = core.add_node(paper("a", 3)), core.add_node(paper("b", 5))
+    assert core.add_node(paper("a", 3)) == a
+    assert core.add_edge(a, b)
+    assert not core.add_edge(a, b)
+    offsets, indices = core.to_csr()
+    assert offsets.tolist() == [0, 1, 1] and indices.tolist() == [b]
+    graph = core.to_directed_graph()
+    assert [node.id for node in graph.nodes] == ["a", "b"]
+    assert [(edge.source, edge.target) for edge in graph.edges] == [("a", "b")]
+    assert graph.max_citations == 5
+
+
+def test_top_cited():
+    papers = [paper("a", 1), paper("b", 7), {"paperId": "c", "citationCount": None}]
+    assert [p["paperId"] for p in top_cited(papers, 2)] == ["b", "a"]
+    assert [p["paperId"] for p in top_cited(papers)] == ["b", "a", "c"]
+
+
+def test_graph_core_models_from_offset():
+    core = GraphCore()
+    a, b, c = (core.add_node(paper(name, 1)) for name in "abc")
+    core.add_edge(a, b)
+    core.add_edge(b, c)
+    assert [node.id for node in core.node_models(2)] == ["c"]
+    assert [(edge.source, edge.target) for edge in core.edge_models(1)] == [("b", "c")]
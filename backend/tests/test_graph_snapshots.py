@@ -0,0 +1,32 @@
+from app.database.graph_snapshots import GraphSnapshotStore
+from app.schemas.graph import DirectedGraph, GraphResponse, Node
+from app.schemas.papers import Paper
+
+
+def test_graph_snapshot_round_trip(tmp_path):
+    store = GraphSnapshotStore(str(tmp_path / "snapshots.sqlite3"), ttl=60)
+    graph = DirectedGraph(
+        nodes=[Node(id="a", detail=Paper(id="a", title="A paper"))],
+        edges=[],
+        max_citations=0,
+    )
+    graphs = GraphResponse(citation_graph=graph, reference_graph=graph)
+    key = store.key("a", 20, True, 1)
+    assert store.get(key) is None
+    store.put(key, graphs)
+    snapshot, refreshed_at = store.get(key)
+    assert snapshot == graphs
+    store.touch(key)
+    assert store.get(key)[1] >= refreshed_at
+    assert (
+        GraphSnapshotStore(str(tmp_path / "snapshots.sqlite3"), ttl=0).get(key) is None
+    )
+
+
+def test_graph_snapshot_store_opens_lazily(tmp_path):
+    path = tmp_path / "snapshots.sqlite3"
+    store = GraphSnapshotStore(str(path), ttl=60)
+    assert not path.exists()
+    # Opened on first use when the app has not opened it at startup
+    assert not store.exists("a")
+    assert path.exists()
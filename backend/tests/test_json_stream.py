@@ -0,0 +1,38 @@
+import asyncio
+
+import httpx
+
+from app.utils.json_stream import iter_json_array
+
+
+def chunked_response(chunks: list[bytes], sent: list[bytes]) -> httpx.Response:
+    async def body():
+        for chunk in chunks:
+            sent.append(chunk)
+            yield chunk
+
+    return httpx.Response(200, content=body(), request=httpx.Request("POST", "/"))
+
+
+def test_iter_json_array_yields_items_as_they_arrive():
+    # Items split across chunks, including inside a string and a number
+    chunks = [
+        b'[{"paperId": "a", "score": 1.',
+        b'5}, null, {"paperId": "b',
+        b'"}',
+        b"]",
+    ]
+    sent = []
+
+    async def main() -> list:
+        items = []
+        async for item in iter_json_array(chunked_response(chunks, sent)):
+            # The first item is decoded before the rest of the body is received
+            items.append((item, len(sent)))
+        return items
+
+    assert asyncio.run(main()) == [
+        ({"paperId": "a", "score": 1.5}, 2),
+        (None, 2),
+        ({"paperId": "b"}, 3),
+    ]
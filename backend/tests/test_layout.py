@@ -0,0 +1,37 @@
+import numpy as np
+
+from app.schemas.graph import DirectedGraph, Edge, Node
+from app.schemas.papers import Paper
+from app.utils.layout import force_layout, layout_graph
+
+
+def graph(ids: list[str], edges: list[tuple[str, str]]) -> DirectedGraph:
+    return DirectedGraph(
+        nodes=[Node(id=i, detail=Paper(id=i, title=i)) for i in ids],
+        edges=[Edge(source=source, target=target) for source, target in edges],
+        max_citations=0,
+    )
+
+
+def test_force_layout_pulls_neighbours_together():
+    # Two triangles joined by a single edge
+    sources = np.array([0, 1, 2, 3, 4, 5, 2])
+    targets = np.array([1, 2, 0, 4, 5, 3, 3])
+    positions = force_layout(6, sources, targets)
+    distance = np.linalg.norm(positions[:, None] - positions[None], axis=2)
+    assert distance[0, 1] < distance[0, 4]
+    assert np.all(distance[~np.eye(6, dtype=bool)] > 0)
+
+
+def test_layout_graph_starts_from_previous_layout():
+    previous = layout_graph(graph(["a", "b", "c"], [("a", "b"), ("b", "c")]))
+    assert all(node.position is not None for node in previous.nodes)
+    grown = layout_graph(
+        graph(["a", "b", "c", "d"], [("a", "b"), ("b", "c"), ("c", "d")]), previous
+    )
+    before = {node.id: node.position for node in previous.nodes}
+    for node in grown.nodes[:3]:
+        shift = np.hypot(
+            node.position.x - before[node.id].x, node.position.y - before[node.id].y
+        )
+        assert shift < 20
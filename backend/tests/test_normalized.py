@@ -0,0 +1,41 @@
+from app.schemas.graph import DirectedGraph, Edge, GraphResponse, Node
+from app.schemas.papers import Paper
+from app.utils.normalized import normalize_graphs
+
+
+def node(paper_id: str, **fields) -> Node:
+    detail = Paper(id=paper_id, title=paper_id, abstract="abstract", **fields)
+    return Node(id=paper_id, detail=detail)
+
+
+def graphs() -> GraphResponse:
+    return GraphResponse(
+        citation_graph=DirectedGraph(
+            nodes=[node("a"), node("b")],
+            edges=[Edge(source="a", target="b")],
+            max_citations=0,
+        ),
+        reference_graph=DirectedGraph(
+            nodes=[node("a", tldr="summary"), node("c")],
+            edges=[Edge(source="c", target="a")],
+            max_citations=0,
+        ),
+    )
+
+
+def test_normalize_graphs_shares_papers():
+    normalized = normalize_graphs(graphs())
+    assert list(normalized.papers) == ["a", "b", "c"]
+    # The copy with a TLDR is kept
+    assert normalized.papers["a"].tldr == "summary"
+    assert [node.id for node in normalized.reference_graph.nodes] == ["a", "c"]
+    assert normalized.reference_graph.edges == graphs().reference_graph.edges
+
+
+def test_normalize_graphs_slim():
+    normalized = normalize_graphs(graphs(), slim=True)
+    assert normalized.slim
+    assert all(
+        paper.abstract is None and paper.tldr is None
+        for paper in normalized.papers.values()
+    )
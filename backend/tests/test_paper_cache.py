@@ -0,0 +1,37 @@
+from app.database.paper_cache import PaperCache
+
+SIGNATURES = {"both": "b", "citations": "c", "references": "r", "none": "n"}
+
+
+def test_paper_cache_round_trip(tmp_path):
+    cache = PaperCache(str(tmp_path / "cache.sqlite3"), ttl=60, relation_ttl=60)
+    paper = {"paperId": "abc", "title": "A paper", "citations": [], "references": []}
+    cache.set_many({"DOI:10.1/abc": paper}, "both", "b")
+    # Served by canonical ID and alias, and narrower modes drop unused lists
+    assert cache.get_many(["abc"], "both", SIGNATURES)["abc"] == paper
+    assert "references" not in cache.get_many(["abc"], "citations", SIGNATURES)["abc"]
+    assert cache.get_many(["DOI:10.1/abc"], "none", SIGNATURES)["DOI:10.1/abc"] == {
+        "paperId": "abc",
+        "title": "A paper",
+    }
+    assert cache.get_many(["missing"], "both", SIGNATURES) == {}
+
+
+def test_paper_cache_respects_ttl_and_signature(tmp_path):
+    cache = PaperCache(str(tmp_path / "cache.sqlite3"), ttl=60, relation_ttl=0)
+    cache.set_many({"abc": {"paperId": "abc"}}, "citations", "c")
+    assert cache.get_many(["abc"], "citations", SIGNATURES) == {}
+    assert cache.get_many(["abc"], "citations", SIGNATURES, allow_stale=True)
+    assert cache.get_many(["abc"], "none", {**SIGNATURES, "citations": "changed"}) == {}
+
+
+def test_paper_cache_opens_lazily(tmp_path):
+    path = tmp_path / "cache.sqlite3"
+    cache = PaperCache(str(path), ttl=60, relation_ttl=60)
+    assert not path.exists()
+    # Opened on first use when the app has not opened it at startup
+    assert cache.get_many(["abc"], "none", SIGNATURES) == {}
+    assert path.exists()
+    cache.close()
+    cache.set_many({"abc": {"paperId": "abc"}}, "none", "n")
+    assert cache.get_many(["abc"], "none", SIGNATURES) == {"abc": {"paperId": "abc"}}
@@ -0,0 +1,41 @@
+from app.utils.paper import PaperColumns, parse_paper_detail
+
+
+def paper(paper_id: str, author: str, venue: str | None = None) -> dict:
+    return {
+        "paperId": paper_id,
+        "title": paper_id,
+        "authors": [{"name": author}],
+        "publicationVenue": venue and {"name": venue},
+        "externalIds": {"DOI": f"10.0/{paper_id}"},
+        "tldr": {"text": "summary"},
+        "citationCount": 3,
+    }
+
+
+def test_paper_columns_match_parse_paper_detail():
+    papers = [
+        paper("a", "Ada", "Nature"),
+        paper("b", "Ada"),
+        {"paperId": "c"},
+        # A venue and an author without a name
+        {"paperId": "d", "publicationVenue": {"id": "v"}, "authors": [{}]},
+    ]
+    columns = PaperColumns(papers)
+    expected = [parse_paper_detail(raw) for raw in papers]
+    for detail in expected:
+        detail.pop("url")
+    assert columns.rows() == expected
+    assert columns["journal"][3] is None and columns["authors"][3] == [""]
+    assert [p.id for p in columns.to_papers([2, 0])] == ["c", "a"]
+    # Repeated author names share a single string
+    assert columns["authors"][0][0] is columns["authors"][1][0]
+
+
+def test_paper_columns_skip_repeated_and_excluded_papers():
+    columns = PaperColumns(
+        [paper("a", "Ada"), paper("b", "Bob")], unique=True, exclude=["a"]
+    )
+    columns.extend([paper("b", "Bob"), paper("c", "Cy")])
+    assert columns["id"] == ["b", "c"]
+    assert columns.index == {"b": 0, "c": 1}
@@ -0,0 +1,30 @@
+import asyncio
+
+import httpx
+
+from app.database.paper_cache import PaperCache
+from app.semantic_scholar import semantic_scholar
+from app.services import papers
+from app.services.graph import PaperBatchFetcher
+
+
+def test_paper_details_of_an_uncached_paper(monkeypatch, tmp_path):
+    cache = PaperCache(str(tmp_path / "cache.sqlite3"), ttl=60, relation_ttl=60)
+    monkeypatch.setattr(papers, "PaperBatchFetcher", lambda: PaperBatchFetcher(cache))
+    requests = []
+
+    async def post(url, params, json, **kwargs):
+        requests.append(params["fields"].split(","))
+        paper = {"paperId": "abc", "title": "A paper", "abstract": "An abstract"}
+        if "tldr" in requests[-1]:
+            paper["tldr"] = {"model": "tldr@v2.0.0", "text": "A summary"}
+        return httpx.Response(200, json=[paper], request=httpx.Request("POST", url))
+
+    monkeypatch.setattr(semantic_scholar, "post", post)
+    details = asyncio.run(papers.get_paper_details_service(["abc", "abc"]))
+    assert [detail.model_dump() for detail in details] == [
+        {"id": "abc", "abstract": "An abstract", "tldr": "A summary"}
+    ]
+    # Served from the cache the second time
+    assert asyncio.run(papers.get_paper_details_service(["abc"])) == details
+    assert len(requests) == 1
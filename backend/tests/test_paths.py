@@ -0,0 +1,47 @@
+import asyncio
+
+from app.services.paths import find_paths
+
+# a <- b <- c <- d: each paper is cited by the next one, and e also cites a and d
+CITED_BY = {"a": ["b", "e"], "b": ["c"], "c": ["d"], "d": ["e"], "e": []}
+
+
+def paper(paper_id: str) -> dict:
+    return {
+        "paperId": paper_id,
+        "title": paper_id,
+        "citations": [{"paperId": citing} for citing in CITED_BY[paper_id]],
+        "references": [
+            {"paperId": cited}
+            for cited, citing in CITED_BY.items()
+            if paper_id in citing
+        ],
+    }
+
+
+class Fetcher:
+    def __init__(self):
+        self.fetched = []
+
+    async def fetch_batched(self, paper_ids: list[str], key="both") -> list[dict]:
+        self.fetched += paper_ids
+        return [paper(paper_id) for paper_id in paper_ids]
+
+
+def test_find_paths_returns_shortest_paths():
+    fetcher = Fetcher()
+    graph = asyncio.run(find_paths(fetcher, paper("b"), paper("d"), 4, 100, 10))
+    # b - a - e - d and b - c - d: only the latter is shortest
+    assert [node.id for node in graph.nodes] == ["b", "c", "d"]
+    assert {(edge.source, edge.target) for edge in graph.edges} == {
+        ("b", "c"),
+        ("c", "d"),
+    }
+    # Both levels came from the input papers, which are not fetched again
+    assert fetcher.fetched == []
+
+
+def test_find_paths_respects_depth():
+    assert (
+        asyncio.run(find_paths(Fetcher(), paper("b"), paper("d"), 1, 100, 10)) is None
+    )
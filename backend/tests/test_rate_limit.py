@@ -0,0 +1,62 @@
+import asyncio
+import time
+
+from app.utils.rate_limit import AdaptiveRateLimiter, parse_retry_after
+
+
+def limiter(**kwargs) -> AdaptiveRateLimiter:
+    return AdaptiveRateLimiter(
+        **{"rate": 4.0, "capacity": 2, "min_rate": 1.0, "max_rate": 5.0, **kwargs}
+    )
+
+
+def test_rate_decreases_multiplicatively_and_increases_additively():
+    bucket = limiter(increase_step=0.5)
+    bucket.on_rate_limited(retry_after=0)
+    assert bucket.rate == 2.0
+    bucket.on_rate_limited(retry_after=0)
+    bucket.on_rate_limited(retry_after=0)
+    assert bucket.rate == 1.0  # clamped to min_rate
+    for _ in range(3):
+        bucket.on_success()
+    assert bucket.rate == 2.5
+    for _ in range(10):
+        bucket.on_success()
+    assert bucket.rate == 5.0  # clamped to max_rate
+    assert (bucket.throttled, bucket.succeeded) == (3, 13)
+
+
+def test_burst_then_waits_for_refill():
+    bucket = limiter(rate=10.0)
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == 0.0
+    # The bucket is empty: the third caller waits for one token to accrue
+    assert 0.05 < bucket.reserve() <= 0.1
+    assert not bucket.try_acquire()
+
+
+def test_retry_after_blocks_all_callers():
+    bucket = limiter(rate=100.0, capacity=10)
+    assert bucket.on_rate_limited(retry_after=0.1) >= 0.099
+    # Tokens are left, but every caller is held back until the block expires
+    assert not bucket.try_acquire()
+
+    async def acquire_all() -> list[float]:
+        start = time.monotonic()
+
+        async def acquire() -> float:
+            await bucket.acquire()
+            return time.monotonic() - start
+
+        return await asyncio.gather(*(acquire() for _ in range(3)))
+
+    assert min(asyncio.run(acquire_all())) >= 0.09
+    assert bucket.try_acquire()
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after("-1") == 0.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
@@ -0,0 +1,103 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+from fastapi import HTTPException
+
+from app.semantic_scholar import SemanticScholarClient, semantic_scholar
+from app.services.recommended import fetch_semantic_scholar_recommendations
+from app.utils.rate_limit import AdaptiveRateLimiter
+from app.utils.resilience import CircuitBreaker, CircuitOpenError, LatencyTracker
+
+
+def test_circuit_breaker_opens_and_recovers():
+    breaker = CircuitBreaker(error_rate=0.5, min_requests=4, window=4, cooldown=0.05)
+    for success in (True, False, True, False):
+        assert breaker.allow()
+        breaker.record(success)
+    assert breaker.status == "open"
+    assert not breaker.allow()
+    assert breaker.retry_after() == 1
+    time.sleep(0.06)
+    assert breaker.status == "half_open"
+    assert breaker.allow()  # the single probe
+    assert not breaker.allow()
+    breaker.record(True)
+    assert breaker.status == "closed"
+    assert breaker.state()["opened"] == 1
+
+
+def test_latency_tracker_percentile():
+    tracker = LatencyTracker(window=100, min_samples=10)
+    for i in range(9):
+        tracker.record(i / 10)
+    assert tracker.percentile(95) is None
+    tracker.record(10.0)
+    assert tracker.percentile(50) == 0.4
+    assert tracker.percentile(95) == 10.0
+
+
+def test_recommendations_fail_fast_while_the_breaker_is_open(monkeypatch):
+    async def rejected(*args, **kwargs):
+        raise CircuitOpenError(retry_after=7)
+
+    monkeypatch.setattr(semantic_scholar, "post", rejected)
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(fetch_semantic_scholar_recommendations([]))
+    assert error.value.status_code == 503
+    assert error.value.headers == {"Retry-After": "7"}
+
+
+def mock_client(handler, **kwargs) -> SemanticScholarClient:
+    """A client whose pooled connection is served by a handler, once created."""
+    client = SemanticScholarClient(
+        max_concurrency=4,
+        limiter=AdaptiveRateLimiter(rate=100, capacity=10, min_rate=1, max_rate=100),
+        **kwargs,
+    )
+    client._ensure_client()
+    client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return client
+
+
+def test_rate_limited_hedge_does_not_beat_a_slower_success():
+    async def handler(request):
+        calls.append(request)
+        if len(calls) == 1:
+            await asyncio.sleep(0.05)
+            return httpx.Response(200)
+        return httpx.Response(429)
+
+    async def main() -> httpx.Response:
+        client = mock_client(handler, hedge_percentile=50, hedge_min_delay=0.01)
+        tracker = client._tracker("GET", "https://api.test/paper/search")
+        for _ in range(tracker.min_samples):
+            tracker.record(0.001)
+        response = await client._send_hedged(
+            client._client, "GET", "https://api.test/paper/search", {}
+        )
+        assert (client.hedged, client.hedge_wins) == (1, 0)
+        return response
+
+    calls = []
+    assert asyncio.run(main()).status_code == 200
+    assert len(calls) == 2
+
+
+def test_stream_error_while_reading_is_counted_once():
+    async def body():
+        yield b"["
+        raise httpx.ReadError("connection reset")
+
+    async def main():
+        client = mock_client(lambda request: httpx.Response(200, content=body()))
+        with pytest.raises(httpx.ReadError):
+            async with client.stream(
+                "POST", "https://api.test/paper/batch"
+            ) as response:
+                async for _ in response.aiter_bytes():
+                    pass
+        return client.breaker.state()["recent_requests"]
+
+    assert asyncio.run(main()) == 1
@@ -0,0 +1,65 @@
+import asyncio
+
+import pytest
+
+from app.utils.singleflight import SingleFlight
+
+
+def test_concurrent_callers_share_one_execution():
+    flights = SingleFlight()
+    calls = []
+
+    async def work() -> int:
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return 42
+
+    async def main() -> list[int]:
+        results = await asyncio.gather(*(flights.do("key", work) for _ in range(5)))
+        assert flights.in_flight() == 0
+        # Nothing is cached once the computation is done
+        results.append(await flights.do("key", work))
+        return results
+
+    assert asyncio.run(main()) == [42] * 6
+    assert len(calls) == 2
+    assert flights.shared == 4
+
+
+def test_cancelled_waiter_does_not_cancel_the_shared_task():
+    flights = SingleFlight()
+    finished = []
+
+    async def work() -> str:
+        await asyncio.sleep(0.02)
+        finished.append(1)
+        return "done"
+
+    async def main() -> str:
+        first = asyncio.ensure_future(flights.do("key", work))
+        second = asyncio.ensure_future(flights.do("key", work))
+        await asyncio.sleep(0)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(main()) == "done"
+    assert finished == [1]
+
+
+def test_exception_reaches_every_waiter():
+    flights = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.01)
+        raise ValueError("upstream failed")
+
+    async def main() -> list:
+        return await asyncio.gather(
+            *(flights.do("key", work) for _ in range(3)), return_exceptions=True
+        )
+
+    errors = asyncio.run(main())
+    assert all(isinstance(error, ValueError) for error in errors)
+    assert flights.in_flight() == 0
@@ -1,13 +1,20 @@
 """Interface to backend REST API for fetching citation/reference graphs."""
 
+import json
+from collections.abc import Iterator
+
+import msgpack
 import requests
 
 import streamlit as st
 
 from src.api.auth import check_id_token
 
+# Compact graph encoding, preferred over JSON when the backend supports it
+COMPACT_MEDIA_TYPE = "application/x-msgpack"
+
 
-def get_graph_for_paper(selected_paper: dict) -> dict | None:
+def get_graph_for_paper(selected_paper: dict, depth: int = 1) -> dict | None:
     """
     Retrieves the citation and reference graphs for the selected paper.
 
@@ -16,50 +23,373 @@ def get_graph_for_paper(selected_paper: dict) -> dict | None:
 
     Args:
         selected_paper (dict): the paper used to build the graph
+        depth (int): number of hops to expand the graph from the selected paper
 
     Returns:
-        dict | None: The raw citation/reference graph data, and the parsed cytoscape-compatible versions,
-            or None if the backend request fails.
+        dict | None: The shared paper table, the id-only citation/reference graphs and
+            their parsed cytoscape-compatible versions, or None if the backend request fails.
     """
     # check and refresh id_token if necessary
     check_id_token()
     # backend POST request
-    url = f"{st.secrets['backend']['url']}/graph"
+    url = f"{st.secrets['backend']['url']}/graph/normalized"
     token = st.session_state.id_token
     headers = {
         "content-type": "application/json; charset=UTF-8",
+        "accept": f"{COMPACT_MEDIA_TYPE}, application/json",
         "Authorization": f"Bearer {token}",
     }
     try:
         # Perform POST request to fetch graph data
-        response = requests.post(url, headers=headers, json=selected_paper, timeout=60)
+        response = requests.post(
+            url,
+            headers=headers,
+            json=selected_paper,
+            params={"depth": depth, "layout": True},
+            timeout=60 * depth,
+        )
         # Handle errors
         if response.status_code != 200:
             st.error("Unable to fetch citation graphs.")
             return None
         # Process graph data
+        return with_cytoscape_elements(decode_graph_response(response))
+    except requests.exceptions.RequestException:
+        st.error("Unable to fetch citation graphs.")
+    return None
+
+
+def stream_graph_for_paper(selected_paper: dict, depth: int = 1) -> Iterator[dict]:
+    """
+    Streams the citation and reference graphs for the selected paper as they are built.
+
+    The backend first sends the selected paper and its direct neighbours, then
+    appends further levels and the edges between existing nodes as they are
+    fetched. Each yielded result holds the graphs received so far.
+
+    Args:
+        selected_paper (dict): the paper used to build the graph
+        depth (int): number of hops to expand the graph from the selected paper
+
+    Yields:
+        dict: The paper table and the graphs received so far, and the parsed
+            cytoscape-compatible versions (same format as `get_graph_for_paper`).
+            Nothing more is yielded if the backend request fails.
+    """
+    # check and refresh id_token if necessary
+    check_id_token()
+    # backend POST request
+    url = f"{st.secrets['backend']['url']}/graph/stream"
+    token = st.session_state.id_token
+    headers = {
+        "content-type": "application/json; charset=UTF-8",
+        "Authorization": f"Bearer {token}",
+    }
+    graphs = {
+        "papers": {},
+        "citation_graph": {"nodes": [], "edges": [], "max_citations": 0},
+        "reference_graph": {"nodes": [], "edges": [], "max_citations": 0},
+    }
+    try:
+        with requests.post(
+            url,
+            headers=headers,
+            json=selected_paper,
+            params={"depth": depth, "layout": True},
+            stream=True,
+            timeout=60 * depth,
+        ) as response:
+            # Handle errors
+            if response.status_code != 200:
+                st.error("Unable to fetch citation graphs.")
+                return
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                frame = json.loads(line)
+                if frame["event"] == "error":
+                    st.error("Unable to fetch citation graphs.")
+                    return
+                if frame["event"] == "summary":
+                    return
+                graph = graphs[frame["graph"]]
+                if frame["event"] == "layout":
+                    # Place the nodes at their precomputed positions
+                    for node in graph["nodes"]:
+                        node["position"] = frame["positions"].get(node["id"])
+                else:
+                    # Append the new nodes and edges to their graph, and their
+                    # papers to the shared table
+                    graph["nodes"].extend(
+                        normalize_graph(frame, graphs["papers"])["nodes"]
+                    )
+                    graph["edges"].extend(frame["edges"])
+                    graph["max_citations"] = frame["max_citations"]
+                yield with_cytoscape_elements(graphs)
+    except requests.exceptions.RequestException:
+        st.error("Unable to fetch citation graphs.")
+
+
+def get_graph_for_library(depth: int = 1) -> dict | None:
+    """
+    Retrieves the merged citation and reference graphs of the user's whole library.
+
+    Args:
+        depth (int): number of hops to expand the graph from the library papers
+
+    Returns:
+        dict | None: The shared paper table, the id-only citation/reference graphs and
+            their parsed cytoscape-compatible versions, or None if the backend request fails.
+    """
+    # check and refresh id_token if necessary
+    check_id_token()
+    # backend GET request
+    url = f"{st.secrets['backend']['url']}/graph/library/normalized"
+    token = st.session_state.id_token
+    headers = {
+        "content-type": "application/json; charset=UTF-8",
+        "accept": f"{COMPACT_MEDIA_TYPE}, application/json",
+        "Authorization": f"Bearer {token}",
+    }
+    try:
+        response = requests.get(
+            url,
+            headers=headers,
+            params={"depth": depth, "layout": True, "slim": True},
+            timeout=120 * depth,
+        )
+        # Handle errors
+        if response.status_code != 200:
+            st.error("Unable to fetch library graphs.")
+            return None
+        # Process graph data
+        return with_cytoscape_elements(decode_graph_response(response))
+    except requests.exceptions.RequestException:
+        st.error("Unable to fetch library graphs.")
+    return None
+
+
+def get_graph_communities(selected_paper: dict | None, depth: int = 1) -> dict | None:
+    """
+    Retrieves the coarse community views of the citation and reference graphs,
+    with one node per community of densely connected papers.
+
+    Args:
+        selected_paper (dict | None): the paper used to build the graph, or None
+            for the merged graph of the user's whole library
+        depth (int): number of hops to expand the graph
+
+    Returns:
+        dict | None: The raw community graphs, and the parsed cytoscape-compatible versions,
+            or None if the backend request fails.
+    """
+    # check and refresh id_token if necessary
+    check_id_token()
+    token = st.session_state.id_token
+    headers = {
+        "content-type": "application/json; charset=UTF-8",
+        "Authorization": f"Bearer {token}",
+    }
+    params = {"depth": depth, "layout": True}
+    try:
+        if selected_paper is None:
+            url = f"{st.secrets['backend']['url']}/graph/library/communities"
+            response = requests.get(
+                url, headers=headers, params=params, timeout=120 * depth
+            )
+        else:
+            url = f"{st.secrets['backend']['url']}/graph/communities"
+            response = requests.post(
+                url,
+                headers=headers,
+                json=selected_paper,
+                params=params,
+                timeout=60 * depth,
+            )
+        # Handle errors
+        if response.status_code != 200:
+            st.error("Unable to fetch graph communities.")
+            return None
         response = response.json()
-        citation_graph = parse_graph_to_cytoscape_elements(response["citation_graph"])
-        reference_graph = parse_graph_to_cytoscape_elements(response["reference_graph"])
-        result = {
+        return {
             "citation_graph": response["citation_graph"],
             "reference_graph": response["reference_graph"],
-            "citation_graph_cytoscape": citation_graph,
-            "reference_graph_cytoscape": reference_graph,
+            "citation_graph_cytoscape": parse_communities_to_cytoscape_elements(
+                response["citation_graph"]
+            ),
+            "reference_graph_cytoscape": parse_communities_to_cytoscape_elements(
+                response["reference_graph"]
+            ),
         }
-        return result
     except requests.exceptions.RequestException:
-        st.error("Unable to fetch citation graphs.")
+        st.error("Unable to fetch graph communities.")
+    return None
+
+
+def get_community(
+    selected_paper: dict | None, graph_key: str, community: int, depth: int = 1
+) -> dict | None:
+    """
+    Retrieves the member papers of one community of a graph (see `get_graph_communities`).
+
+    Args:
+        selected_paper (dict | None): the paper used to build the graph, or None
+            for the merged graph of the user's whole library
+        graph_key (str): either 'citation_graph' or 'reference_graph'
+        community (int): the community's id
+        depth (int): number of hops to expand the graph
+
+    Returns:
+        dict | None: The papers of the members, their id-only graph and its parsed
+            cytoscape-compatible version, or None if the backend request fails.
+    """
+    # check and refresh id_token if necessary
+    check_id_token()
+    token = st.session_state.id_token
+    headers = {
+        "content-type": "application/json; charset=UTF-8",
+        "Authorization": f"Bearer {token}",
+    }
+    params = {"depth": depth, "layout": True}
+    path = f"communities/{graph_key.removesuffix('_graph')}/{community}"
+    try:
+        if selected_paper is None:
+            url = f"{st.secrets['backend']['url']}/graph/library/{path}"
+            response = requests.get(
+                url, headers=headers, params=params, timeout=120 * depth
+            )
+        else:
+            url = f"{st.secrets['backend']['url']}/graph/{path}"
+            response = requests.post(
+                url,
+                headers=headers,
+                json=selected_paper,
+                params=params,
+                timeout=60 * depth,
+            )
+        # Handle errors
+        if response.status_code != 200:
+            st.error("Unable to fetch community.")
+            return None
+        papers = {}
+        graph = normalize_graph(response.json(), papers)
+        return {
+            "papers": papers,
+            "graph": graph,
+            "cytoscape": parse_graph_to_cytoscape_elements(graph, papers),
+        }
+    except requests.exceptions.RequestException:
+        st.error("Unable to fetch community.")
     return None
 
 
-def parse_graph_to_cytoscape_elements(graph: dict) -> list[dict]:
+def decode_graph_response(response: requests.Response) -> dict:
+    """
+    Helper function for decoding a normalized graph response from the backend,
+    either JSON or the compact MessagePack encoding.
+
+    In both, papers are sent once in a shared table. In the compact encoding,
+    the table holds rows of values in `fields` order, aligned with `ids`; each
+    graph lists its nodes as row numbers and its edges as positions in its
+    node list.
+
+    Args:
+        response (requests.Response): The backend response
+
+    Returns:
+        dict: The paper table (keyed by paper id) and the citation and reference
+            graphs, whose nodes only hold their id, library flag and position
+    """
+    if not response.headers.get("content-type", "").startswith(COMPACT_MEDIA_TYPE):
+        return response.json()
+    data = msgpack.unpackb(response.content)
+    fields, ids = data["fields"], data["ids"]
+    papers = {}
+    # a paper whose copies differ in both graphs has several rows: as in the
+    # JSON response, keep the copy with a TLDR
+    for paper_id, row in zip(ids, data["papers"]):
+        paper = {"id": paper_id, **dict(zip(fields, row))}
+        if paper_id not in papers or (
+            not papers[paper_id].get("tldr") and paper.get("tldr")
+        ):
+            papers[paper_id] = paper
+    result = {"papers": papers}
+    for key in ("citation_graph", "reference_graph"):
+        graph = data[key]
+        in_library = set(graph["in_library"])
+        positions = graph["positions"]
+        nodes = [
+            {
+                "id": ids[row],
+                "in_library": i in in_library,
+                "position": {"x": positions[2 * i], "y": positions[2 * i + 1]}
+                if positions is not None
+                else None,
+            }
+            for i, row in enumerate(graph["nodes"])
+        ]
+        edges = [
+            {"source": nodes[source]["id"], "target": nodes[target]["id"]}
+            for source, target in zip(graph["sources"], graph["targets"])
+        ]
+        result[key] = {
+            "nodes": nodes,
+            "edges": edges,
+            "max_citations": graph["max_citations"],
+            "analytics": graph["analytics"],
+        }
+    return result
+
+
+def normalize_graph(graph: dict, papers: dict) -> dict:
+    """
+    Helper function that moves the paper details of a graph's nodes into a shared
+    paper table, so that each paper is kept once.
+
+    Args:
+        graph (dict): A graph whose nodes hold their paper's details
+        papers (dict): The paper table, keyed by paper id, updated in place
+
+    Returns:
+        dict: The graph, whose nodes only hold their id, library flag and position
+    """
+    nodes = []
+    for node in graph["nodes"]:
+        paper = papers.get(node["id"])
+        # as in the backend, prefer the copy of a paper that has its TLDR
+        if paper is None or (not paper.get("tldr") and node["detail"].get("tldr")):
+            papers[node["id"]] = node["detail"]
+        nodes.append(
+            {
+                "id": node["id"],
+                "in_library": node.get("in_library", False),
+                "position": node.get("position"),
+            }
+        )
+    return {**graph, "nodes": nodes}
+
+
+def with_cytoscape_elements(graphs: dict) -> dict:
+    """Helper function that adds the cytoscape elements of both graphs to a response."""
+    return {
+        **graphs,
+        "citation_graph_cytoscape": parse_graph_to_cytoscape_elements(
+            graphs["citation_graph"], graphs["papers"]
+        ),
+        "reference_graph_cytoscape": parse_graph_to_cytoscape_elements(
+            graphs["reference_graph"], graphs["papers"]
+        ),
+    }
+
+
+def parse_graph_to_cytoscape_elements(graph: dict, papers: dict) -> list[dict]:
     """
     Helper function for parsing the graph data from the backend into the format
     expected by cytoscape.
 
     Args:
-        graph (dict): The graph returned by the PaperRef backend, list of nodes/edges
+        graph (dict): The normalized graph returned by the PaperRef backend, list of nodes/edges
+        papers (dict): The paper table of the graph, keyed by paper id
 
     Returns:
         list[dict]: A list of cytoscape elements (nodes and edges) to render
@@ -67,7 +397,7 @@ def parse_graph_to_cytoscape_elements(graph: dict) -> list[dict]:
     elements = []
     # Process nodes from the citation graph
     for node in graph["nodes"]:
-        detail = node["detail"]
+        detail = papers[node["id"]]
         # Filter out None values and build the data dictionary for the Cytoscape element
         node_data = {key: value for key, value in detail.items() if value is not None}
         authors = node_data["authors"]
@@ -78,8 +408,13 @@ def parse_graph_to_cytoscape_elements(graph: dict) -> list[dict]:
         year = str(node_data.get("year", ""))
         node_data["label"] = ", ".join([first_author, year]) if year else first_author
         node_data["id"] = node["id"]  # Ensure the node ID is included
+        node_data["in_library"] = node.get("in_library", False)
         # Cytoscape element for the node
-        elements.append({"data": node_data, "selectable": True, "selected": False})
+        element = {"data": node_data, "selectable": True, "selected": False}
+        if node.get("position"):
+            # Precomputed by the backend, for the preset layout
+            element["position"] = node["position"]
+        elements.append(element)
     # Process edges from the citation graph
     for edge in graph["edges"]:
         elements.append(
@@ -92,3 +427,53 @@ def parse_graph_to_cytoscape_elements(graph: dict) -> list[dict]:
             }
         )
     return elements
+
+
+def parse_communities_to_cytoscape_elements(graph: dict) -> list[dict]:
+    """
+    Helper function for parsing a coarse community graph from the backend into
+    the format expected by cytoscape, with one node per community.
+
+    Args:
+        graph (dict): The community graph returned by the PaperRef backend
+
+    Returns:
+        list[dict]: A list of cytoscape elements (nodes and edges) to render
+    """
+    elements = []
+    for community in graph["communities"]:
+        representative = community["representative"]
+        authors = representative["authors"]
+        first_author = authors[0].split(" ")[-1] if authors else ""
+        if community["merged"]:
+            label = f"Other ({community['size']})"
+        else:
+            label = f"{first_author} et al. ({community['size']})"
+        node_data = {
+            "id": f"community-{community['id']}",
+            "community": community["id"],
+            "label": label,
+            "size": community["size"],
+            "citation_count": community["citation_count"],
+            "in_library": community["in_library"],
+        }
+        if representative.get("year") is not None:
+            node_data["year"] = representative["year"]
+        element = {"data": node_data, "selectable": True, "selected": False}
+        if community.get("position"):
+            element["position"] = community["position"]
+        elements.append(element)
+    for edge in graph["edges"]:
+        source = f"community-{edge['source']}"
+        target = f"community-{edge['target']}"
+        elements.append(
+            {
+                "data": {
+                    "source": source,
+                    "target": target,
+                    "id": f"{source}-{target}",
+                    "weight": edge["weight"],
+                }
+            }
+        )
+    return elements
@@ -8,7 +8,7 @@ import streamlit as st
 from src.api.auth import check_id_token
 
 
-def get_library() -> pd.DataFrame:
+def get_library(light: bool = False) -> pd.DataFrame:
     """
     Loads the user's paper library from the backend as a pandas `DataFrame`.
 
@@ -16,6 +16,10 @@ def get_library() -> pd.DataFrame:
     processes the response, and returns a DataFrame with paper details.
     It checks and refreshes the user's `id_token` before making the request.
 
+    Args:
+        light (bool): leave out the abstracts and TLDRs, fetched on selection
+            instead (see `with_details`)
+
     Returns:
         pd.DataFrame: A DataFrame containing the papers' details, or an empty DataFrame if no papers are found.
     """
@@ -29,7 +33,9 @@ def get_library() -> pd.DataFrame:
         "Authorization": f"Bearer {token}",
     }
     try:
-        response = requests.get(url, headers=headers, timeout=10)
+        response = requests.get(
+            url, headers=headers, params={"light": light}, timeout=10
+        )
         if response.status_code == 200:
             response = response.json()
             if not response:
@@ -45,6 +51,66 @@ def get_library() -> pd.DataFrame:
     return None
 
 
+def get_paper_details(paper_ids: list[str]) -> dict[str, dict] | None:
+    """
+    Fetches the abstracts and TLDRs of papers from a light listing.
+
+    Args:
+        paper_ids (list[str]): The IDs of the papers
+
+    Returns:
+        dict[str, dict] | None: The abstract and TLDR of each paper found, keyed by
+            paper ID, or None if the request fails.
+    """
+    # check and refresh id_token if necessary
+    check_id_token()
+    # backend POST request
+    url = f"{st.secrets['backend']['url']}/library/papers/details"
+    token = st.session_state.id_token
+    headers = {
+        "content-type": "application/json; charset=UTF-8",
+        "Authorization": f"Bearer {token}",
+    }
+    try:
+        response = requests.post(url, headers=headers, json=paper_ids, timeout=10)
+        if response.status_code == 200:
+            return {details["id"]: details for details in response.json()}
+        else:
+            st.error(response.json().get("detail", "Unable to load paper details."))
+    except requests.exceptions.RequestException:
+        st.error("Unable to load paper details.")
+    return None
+
+
+def with_details(paper: dict) -> dict:
+    """
+    Fills in the abstract and TLDR of a paper from a light listing, fetching them
+    from the backend the first time the paper is shown and keeping them in
+    session state.
+
+    Args:
+        paper (dict): The paper
+
+    Returns:
+        dict: The paper, with its abstract and TLDR if known
+    """
+    if paper.get("abstract") or paper.get("tldr"):
+        return paper
+    cache = st.session_state.setdefault("paper_details", {})
+    if paper["id"] not in cache:
+        details = get_paper_details([paper["id"]])
+        if details is None:
+            return paper
+        # remember papers without details too, so they are not requested again
+        cache[paper["id"]] = details.get(paper["id"], {})
+    details = cache[paper["id"]]
+    return {
+        **paper,
+        "abstract": details.get("abstract"),
+        "tldr": details.get("tldr"),
+    }
+
+
 def add_paper(paper: dict) -> bool:
     """
     Adds a single paper to the user's library.
@@ -125,7 +191,10 @@ def get_recommendations() -> list[dict] | None:
         "Authorization": f"Bearer {token}",
     }
     try:
-        response = requests.get(url, headers=headers, timeout=120)
+        # only the listed columns are shown, so leave out abstracts and TLDRs
+        response = requests.get(
+            url, headers=headers, params={"light": True}, timeout=120
+        )
         if response.status_code == 200:
             response = response.json()
             df = pd.DataFrame(
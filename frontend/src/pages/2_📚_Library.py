@@ -4,7 +4,7 @@ import streamlit as st
 st.set_page_config(page_title="Paper Library", page_icon="📚", layout="wide")
 
 from src.api.auth import check_cookie
-from src.api.library import get_library, delete_paper
+from src.api.library import get_library, delete_paper, with_details
 from src.components.paper_display import display_paper_sidebar
 from src.utils.papers import (
     format_title,
@@ -34,7 +34,7 @@ if not st.session_state.get("authenticated", False):
 
 # Get library from backend
 if not st.session_state.get("library_loaded", False):
-    papers_df = get_library()
+    papers_df = get_library(light=True)
     print(papers_df.to_dict())
     st.session_state["papers_df"] = papers_df
     st.session_state["library_loaded"] = True
@@ -94,8 +94,9 @@ if event.selection.rows:
 # If a paper is selected, display its details in the sidebar
 if st.session_state.get("selected_paper", None):
     with st.sidebar:
+        # abstracts and TLDRs are left out of the library listing until selected
         display_paper_sidebar(
-            st.session_state.selected_paper,
+            with_details(st.session_state.selected_paper),
             on_remove=lambda p=st.session_state.selected_paper: delete_paper(p["id"]),
             button_key=f"selected_{st.session_state.selected_paper['id']}",
         )
@@ -8,8 +8,16 @@ st.set_page_config(page_title="Citation Graph", page_icon="💠", layout="wide")
 from st_cytoscape import cytoscape
 
 from src.api.auth import check_cookie
-from src.api.library import get_library
-from src.api.graph import get_graph_for_paper
+from src.api.library import get_library, with_details
+from src.api.graph import (
+    get_community,
+    get_graph_communities,
+    get_graph_for_library,
+    stream_graph_for_paper,
+)
+
+# larger graphs are shown as communities, expanded one at a time
+MAX_RENDERED_NODES = 200
 
 
 # add logo to top left corner
@@ -30,7 +38,7 @@ if not st.session_state.get("authenticated", False):
 
 # load paper library if not in session_state
 if st.session_state.get("papers_df", None) is None:
-    st.session_state.papers_df = get_library()
+    st.session_state.papers_df = get_library(light=True)
 
 
 # inject markdown for custom page styling
@@ -64,85 +72,189 @@ st.markdown(
 )
 
 
+def graph_stylesheet(elements: list[dict]) -> list[dict]:
+    """Helper function that builds the cytoscape stylesheet for a graph's elements."""
+    # compute max and min publication date in graph
+    years = [node["data"].get("year", datetime.now().year) for node in elements]
+    min_year = min(years)
+    max_year = max(years)
+    # compute max and min citation count in graph
+    citations = [node["data"].get("citation_count", 0) for node in elements]
+    min_citations = min(citations)
+    max_citations = max(citations)
+    # aggregated edge weights of community graphs
+    weights = [edge["data"].get("weight", 1) for edge in elements]
+    max_weight = max(weights)
+    return [
+        {
+            "selector": "node",
+            "style": {
+                "label": "data(label)",
+                "color": "#fff",
+                "font-size": "4px",
+                "text-valign": "center",
+                "text-halign": "center",
+                "height": f"mapData(citation_count, {min_citations}, {max_citations}, 10px, 120px)",
+                "width": f"mapData(citation_count, {min_citations}, {max_citations}, 10px, 120px)",
+                "background-color": "#30c9bc",
+                "background-opacity": f"mapData(year, {min_year}, {max_year}, 0.1, 1)",
+                "border-color": "#fff",
+                "border-width": "0.5px",
+            },
+        },
+        {
+            "selector": "node[?in_library]",
+            "style": {"background-color": "#f5a623", "border-width": "1.5px"},
+        },
+        {
+            "selector": "edge",
+            "style": {"width": 0.25, "line-color": "#ccc", "line-opacity": 0.5},
+        },
+        {
+            "selector": "edge[weight]",
+            "style": {"width": f"mapData(weight, 1, {max(max_weight, 2)}, 0.5, 4)"},
+        },
+    ]
+
+
+def graph_layout(elements: list[dict]) -> dict:
+    """Helper function that picks the cytoscape layout for a graph's elements."""
+    nodes = [element for element in elements if "source" not in element["data"]]
+    if nodes and all("position" in node for node in nodes):
+        # positions precomputed by the backend display instantly and stay stable
+        return {"name": "preset", "fit": True}
+    return {
+        "name": "fcose",
+        "fit": True,
+        "animate": True,
+        "pan": {"x": "200px", "y": "200px"},
+    }
+
+
+def save_graph(data: dict):
+    """Helper function that saves graph data to session state."""
+    # papers are kept once, in a table shared by both graphs
+    st.session_state.graph_papers = data["papers"]
+    st.session_state.citation_graph = data["citation_graph"]
+    st.session_state.citation_graph_cytoscape = data["citation_graph_cytoscape"]
+    st.session_state.reference_graph = data["reference_graph"]
+    st.session_state.reference_graph_cytoscape = data["reference_graph_cytoscape"]
+    # community views of the previous graph no longer apply
+    st.session_state.communities = None
+    st.session_state.community_members = {}
+
+
+def community_elements(graph_key: str) -> list[dict]:
+    """Helper function that returns the community view of a graph too large to render."""
+    source = st.session_state.graph_source
+    if st.session_state.get("communities") is None:
+        st.session_state.communities = get_graph_communities(
+            source["paper"], depth=source["depth"]
+        )
+    communities = st.session_state.communities
+    if communities is None:
+        return []
+    coarse = communities[f"{graph_key}_cytoscape"]
+    labels = {
+        element["data"]["community"]: element["data"]["label"]
+        for element in coarse
+        if "community" in element["data"]
+    }
+    community = st.selectbox(
+        label="Community:",
+        options=[None, *labels],
+        format_func=lambda c: "All communities" if c is None else labels[c],
+        key=f"{graph_key}_community",
+    )
+    if community is None:
+        return coarse
+    members = st.session_state.community_members
+    if (graph_key, community) not in members:
+        members[graph_key, community] = get_community(
+            source["paper"], graph_key, community, depth=source["depth"]
+        )
+    return (
+        members[graph_key, community]["cytoscape"]
+        if members[graph_key, community]
+        else []
+    )
+
+
 # top-of-page selector for configuring citation graph
 with st.container(key="search_container"):
-    col1, col2, col3 = st.columns([0.6, 0.15, 0.25], vertical_alignment="bottom")
+    col1, col2, col3, col4 = st.columns(
+        [0.5, 0.1, 0.15, 0.25], vertical_alignment="bottom"
+    )
     # select the paper for the citation graph
     options = st.session_state.get("papers_df").rename(
         columns={"DOI": "doi", "Title": "title"}
     )
     options = options.to_dict(orient="records")
+    # build one merged graph of the whole library instead of a single paper
+    whole_library = col1.toggle("Whole library")
     selected_paper = col1.selectbox(
-        label="Select paper:", options=options, format_func=lambda row: row["title"]
+        label="Select paper:",
+        options=options,
+        format_func=lambda row: row["title"],
+        disabled=whole_library,
     )
+    # number of hops to expand the graph from the selected paper
+    depth = col2.selectbox(label="Depth:", options=[1, 2, 3])
     # button to build graph
-    if col2.button(label="Build", use_container_width=True):
+    graph_stream = None
+    if col3.button(label="Build", use_container_width=True):
+        # remember what the graph was built from, to fetch its communities
+        st.session_state.graph_source = {
+            "paper": None if whole_library else selected_paper,
+            "depth": depth,
+        }
         # load graph from backend
-        data = get_graph_for_paper(selected_paper)
-        # save graph data to session state
-        st.session_state.citation_graph = data["citation_graph"]
-        st.session_state.citation_graph_cytoscape = data["citation_graph_cytoscape"]
-        st.session_state.reference_graph = data["reference_graph"]
-        st.session_state.reference_graph_cytoscape = data["reference_graph_cytoscape"]
+        if whole_library:
+            # save graph data to session state
+            save_graph(get_graph_for_library(depth=depth))
+        else:
+            # paper graphs are streamed and rendered below as they grow
+            graph_stream = stream_graph_for_paper(selected_paper, depth=depth)
     # radio selector to toggle between citation graph or reference graph
-    graph_type = col3.radio("Graph type:", ["Citations", "References"], horizontal=True)
+    graph_type = col4.radio("Graph type:", ["Citations", "References"], horizontal=True)
     graph_key = "citation_graph" if graph_type == "Citations" else "reference_graph"
 
 # graph container
 with st.container(key="graph_container"):
+    if graph_stream is not None:
+        # preview the graph while it is streamed
+        preview = st.empty()
+        for frame, data in enumerate(graph_stream):
+            save_graph(data)
+            if len(data[graph_key]["nodes"]) > MAX_RENDERED_NODES:
+                # too large to preview, shown as communities once complete
+                continue
+            elements = data[f"{graph_key}_cytoscape"]
+            with preview.container():
+                cytoscape(
+                    elements,
+                    graph_stylesheet(elements),
+                    key=f"graph_preview_{frame}",
+                    height="600px",
+                    width="100%",
+                    layout=graph_layout(elements),
+                )
+        preview.empty()
     if st.session_state.get(graph_key, None):
-        # compute max and min publication date in graph
-        years = [
-            node["data"].get("year", datetime.now().year)
-            for node in st.session_state.get(f"{graph_key}_cytoscape")
-        ]
-        min_year = min(years)
-        max_year = max(years)
-        # compute max and min citation count in graph
-        citations = [
-            node["data"].get("citation_count", 0)
-            for node in st.session_state.get(f"{graph_key}_cytoscape")
-        ]
-        min_citations = min(citations)
-        max_citations = max(citations)
-        # graph styling
-        stylesheet = [
-            {
-                "selector": "node",
-                "style": {
-                    "label": "data(label)",
-                    "color": "#fff",
-                    "font-size": "4px",
-                    "text-valign": "center",
-                    "text-halign": "center",
-                    "height": f"mapData(citation_count, {min_citations}, {max_citations}, 10px, 120px)",
-                    "width": f"mapData(citation_count, {min_citations}, {max_citations}, 10px, 120px)",
-                    "background-color": "#30c9bc",
-                    "background-opacity": f"mapData(year, {min_year}, {max_year}, 0.1, 1)",
-                    "border-color": "#fff",
-                    "border-width": "0.5px",
-                },
-            },
-            {
-                "selector": "edge",
-                "style": {"width": 0.25, "line-color": "#ccc", "line-opacity": 0.5},
-            },
-        ]
-        # cytoscape graph object
-        st.session_state.graph_selection = cytoscape(
-            st.session_state.get(f"{graph_key}_cytoscape"),
-            stylesheet,
-            key="graph",
-            height="600px",
-            width="100%",
-            selection_type="single",
-            layout={
-                "name": "fcose",
-                "fit": True,
-                "animate": True,
-                "pan": {"x": "200px", "y": "200px"},
-            },
-        )
+        elements = st.session_state.get(f"{graph_key}_cytoscape")
+        if len(st.session_state.get(graph_key)["nodes"]) > MAX_RENDERED_NODES:
+            elements = community_elements(graph_key)
+        if elements:
+            # cytoscape graph object
+            st.session_state.graph_selection = cytoscape(
+                elements,
+                graph_stylesheet(elements),
+                key="graph",
+                height="600px",
+                width="100%",
+                selection_type="single",
+                layout=graph_layout(elements),
+            )
 
 
 def clean_title(text: str):
@@ -163,13 +275,27 @@ with st.sidebar:
     # paper description
     if st.session_state.get("graph_selection", None) is not None:
         selected_nodes = st.session_state.graph_selection["nodes"]
-        if len(selected_nodes) > 0:
-            node_id = selected_nodes[0]
-            node_detail = [
-                node["detail"]
-                for node in st.session_state.get(graph_key)["nodes"]
-                if node["id"] == node_id
+        if (
+            len(selected_nodes) > 0
+            and selected_nodes[0].startswith("community-")
+            and st.session_state.get("communities")
+        ):
+            community_id = int(selected_nodes[0].removeprefix("community-"))
+            community = [
+                community
+                for community in st.session_state.communities[graph_key]["communities"]
+                if community["id"] == community_id
             ][0]
+            # display community summary
+            st.markdown(f"### Community of {community['size']} papers")
+            st.markdown(f"{community['citation_count']} Citations in total")
+            representative = community["representative"]
+            st.markdown(f"Most cited: _{clean_title(representative['title'])}_")
+            st.caption("Select the community above the graph to expand it.")
+        elif len(selected_nodes) > 0:
+            node_id = selected_nodes[0]
+            # slim graphs leave out abstracts and TLDRs until a paper is selected
+            node_detail = with_details(st.session_state.graph_papers[node_id])
             # display title
             title = clean_title(node_detail["title"])
             st.markdown(f"### {title}")